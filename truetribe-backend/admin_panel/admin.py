@@ -44,16 +44,19 @@ class CustomUserAdmin(admin.ModelAdmin):
         self.message_user(request, f"Unbanned {queryset.count()} users")
     
     def verify_users(self, request, queryset):
-        from trust_system.models import TrustScore
+        from trust_system.models import TrustAction
         
         for user in queryset:
             user.is_verified = True
-            user.save()
+            user.save(update_fields=['is_verified'])
             
             # Boost trust score
-            trust_score, created = TrustScore.objects.get_or_create(user=user)
-            trust_score.verification_bonus += 15.0
-            trust_score.calculate_final_score()
+            TrustAction.objects.create(
+                user=user,
+                action_type='verification',
+                score_change=15.0,
+                description=f"Verified by admin {request.user.username}"
+            )
             
             AdminAction.objects.create(
                 admin=request.user,
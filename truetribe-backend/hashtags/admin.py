@@ -0,0 +1,20 @@
+from django.contrib import admin
+from .models import Hashtag, TaggedItem, Mention
+
+@admin.register(Hashtag)
+class HashtagAdmin(admin.ModelAdmin):
+    list_display = ['name', 'posts_count', 'videos_count', 'last_used_at', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['posts_count', 'videos_count', 'last_used_at', 'created_at']
+
+@admin.register(TaggedItem)
+class TaggedItemAdmin(admin.ModelAdmin):
+    list_display = ['hashtag', 'target_type', 'target_id', 'created_at']
+    list_filter = ['target_type']
+    search_fields = ['hashtag__name', 'target_id']
+
+@admin.register(Mention)
+class MentionAdmin(admin.ModelAdmin):
+    list_display = ['user', 'author', 'target_type', 'target_id', 'created_at']
+    list_filter = ['target_type']
+    search_fields = ['user__username', 'author__username', 'target_id']
@@ -0,0 +1,96 @@
+import re
+import unicodedata
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from posts.models import Post, Comment
+from videos.models import Video
+from utils import counters
+from utils.events import publish
+from .models import Hashtag, Mention, TaggedItem
+
+User = get_user_model()
+
+# A tag or mention must start the text or follow a non-word character
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]{1,150})')
+
+# Model -> (target type, text fields, Hashtag counter to keep)
+TAGGED_MODELS = {
+    Post: ('post', ('content',), 'posts_count'),
+    Video: ('video', ('title', 'description'), 'videos_count'),
+    Comment: ('comment', ('content',), None),
+}
+
+def normalize_tag(tag):
+    return unicodedata.normalize('NFKC', tag).casefold()
+
+def extract_hashtags(text):
+    tags = (normalize_tag(tag) for tag in HASHTAG_RE.findall(text))
+    # Purely numeric tags (#1) are usually not meant as tags
+    return list(dict.fromkeys(tag for tag in tags if not tag.isdigit()))
+
+def extract_mentions(text):
+    return list(dict.fromkeys(username.rstrip('.') for username in MENTION_RE.findall(text)))
+
+def text_of(instance):
+    _, fields, _ = TAGGED_MODELS[type(instance)]
+    return '\n'.join(getattr(instance, field) for field in fields)
+
+def sync_hashtags(target_type, target_id, created_at, names, counter):
+    existing = dict(TaggedItem.objects.filter(
+        target_type=target_type, target_id=target_id
+    ).values_list('hashtag__name', 'hashtag_id'))
+    added = [name for name in names if name not in existing]
+    removed = [hashtag_id for name, hashtag_id in existing.items() if name not in names]
+    
+    if added:
+        Hashtag.objects.bulk_create([Hashtag(name=name) for name in added], ignore_conflicts=True)
+        hashtag_ids = list(Hashtag.objects.filter(name__in=added).values_list('id', flat=True))
+        TaggedItem.objects.bulk_create([
+            TaggedItem(hashtag_id=hashtag_id, target_type=target_type, target_id=target_id, created_at=created_at)
+            for hashtag_id in hashtag_ids
+        ], ignore_conflicts=True)
+        Hashtag.objects.filter(id__in=hashtag_ids).update(last_used_at=timezone.now())
+        if counter:
+            for hashtag_id in hashtag_ids:
+                counters.increment(Hashtag, hashtag_id, counter)
+    if removed:
+        TaggedItem.objects.filter(target_type=target_type, target_id=target_id, hashtag_id__in=removed).delete()
+        if counter:
+            for hashtag_id in removed:
+                counters.decrement(Hashtag, hashtag_id, counter)
+
+def sync_mentions(target_type, target_id, author_id, usernames, notify=True):
+    users = dict(User.objects.filter(username__in=usernames).exclude(id=author_id).values_list('id', 'username'))
+    existing = set(Mention.objects.filter(
+        target_type=target_type, target_id=target_id
+    ).values_list('user_id', flat=True))
+    Mention.objects.filter(target_type=target_type, target_id=target_id).exclude(user_id__in=users).delete()
+    
+    added = [user_id for user_id in users if user_id not in existing]
+    if not added:
+        return
+    mentions = Mention.objects.bulk_create([
+        Mention(user_id=user_id, author_id=author_id, target_type=target_type, target_id=target_id)
+        for user_id in added
+    ])
+    # Users are only notified the first time a piece of content mentions them
+    if notify:
+        publish('mention.created', mention_ids=[str(mention.id) for mention in mentions])
+
+def sync(instance, update_fields=None, notify=True):
+    target_type, fields, counter = TAGGED_MODELS[type(instance)]
+    if update_fields is not None and not set(update_fields) & set(fields):
+        return
+    text = text_of(instance)
+    sync_hashtags(target_type, instance.id, instance.created_at, extract_hashtags(text), counter)
+    sync_mentions(target_type, instance.id, instance.author_id, extract_mentions(text), notify)
+
+def remove(instance):
+    target_type, _, counter = TAGGED_MODELS[type(instance)]
+    items = TaggedItem.objects.filter(target_type=target_type, target_id=instance.id)
+    if counter:
+        for hashtag_id in items.values_list('hashtag_id', flat=True):
+            counters.decrement(Hashtag, hashtag_id, counter)
+    items.delete()
+    Mention.objects.filter(target_type=target_type, target_id=instance.id).delete()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from hashtags import extraction
+from hashtags.models import Hashtag
+
+class Command(BaseCommand):
+    help = 'Extract hashtags and mentions from existing posts, videos and comments and recount tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model in extraction.TAGGED_MODELS:
+            processed = 0
+            last_id = None
+            while True:
+                objects = model.objects.order_by('id')
+                if last_id is not None:
+                    objects = objects.filter(id__gt=last_id)
+                batch = list(objects[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                with transaction.atomic():
+                    for instance in batch:
+                        # Existing content should not notify anyone
+                        extraction.sync(instance, notify=False)
+                processed += len(batch)
+                self.stdout.write(f'Extracted tags from {processed} {model._meta.verbose_name_plural}')
+        
+        # Counters may have drifted or been buffered; recount from TaggedItem
+        updated = []
+        for hashtag in Hashtag.objects.annotate(
+            post_items=Count('items', filter=Q(items__target_type='post')),
+            video_items=Count('items', filter=Q(items__target_type='video'))
+        ).iterator(chunk_size=batch_size):
+            if (hashtag.posts_count, hashtag.videos_count) != (hashtag.post_items, hashtag.video_items):
+                hashtag.posts_count, hashtag.videos_count = hashtag.post_items, hashtag.video_items
+                updated.append(hashtag)
+        Hashtag.objects.bulk_update(updated, ['posts_count', 'videos_count'], batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt tag index, corrected {len(updated)} tag counts'))
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:50
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Hashtag',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('videos_count', models.PositiveIntegerField(default=0)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-last_used_at'], name='hashtags_ha_last_us_cc1095_idx'), models.Index(fields=['-posts_count'], name='hashtags_ha_posts_c_1c60cb_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target_type', models.CharField(choices=[('post', 'Post'), ('video', 'Video'), ('comment', 'Comment')], max_length=20)),
+                ('target_id', models.UUIDField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='hashtags_me_user_id_ce92d5_idx'), models.Index(fields=['target_type', 'target_id'], name='hashtags_me_target__56f063_idx')],
+                'unique_together': {('user', 'target_type', 'target_id')},
+            },
+        ),
+        migrations.CreateModel(
+            name='TaggedItem',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target_type', models.CharField(choices=[('post', 'Post'), ('video', 'Video'), ('comment', 'Comment')], max_length=20)),
+                ('target_id', models.UUIDField()),
+                ('created_at', models.DateTimeField()),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='hashtags.hashtag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', 'target_type', '-created_at', '-id'], name='hashtags_ta_hashtag_42b629_idx'), models.Index(fields=['target_type', 'target_id'], name='hashtags_ta_target__2a1339_idx')],
+                'unique_together': {('hashtag', 'target_type', 'target_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+import uuid
+
+User = get_user_model()
+
+TARGET_TYPES = [
+    ('post', 'Post'),
+    ('video', 'Video'),
+    ('comment', 'Comment'),
+]
+
+class Hashtag(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=100, unique=True)  # normalized, see hashtags.extraction
+    posts_count = models.PositiveIntegerField(default=0)
+    videos_count = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['-last_used_at']),
+            models.Index(fields=['-posts_count']),
+        ]
+
+class TaggedItem(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='items')
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPES)
+    target_id = models.UUIDField()
+    created_at = models.DateTimeField()  # of the tagged object, for tag pages
+    
+    class Meta:
+        unique_together = ('hashtag', 'target_type', 'target_id')
+        indexes = [
+            models.Index(fields=['hashtag', 'target_type', '-created_at', '-id']),
+            models.Index(fields=['target_type', 'target_id']),
+        ]
+
+class Mention(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentions')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPES)
+    target_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('user', 'target_type', 'target_id')
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['target_type', 'target_id']),
+        ]
@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from .models import Hashtag
+
+class HashtagSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Hashtag
+        fields = ['id', 'name', 'posts_count', 'videos_count', 'last_used_at', 'created_at']
+        read_only_fields = fields
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('', views.HashtagListView.as_view(), name='hashtags'),
+    path('<str:name>/', views.HashtagDetailView.as_view(), name='hashtag-detail'),
+    path('<str:name>/posts/', views.TaggedContentView.as_view(target_type='post'), name='hashtag-posts'),
+    path('<str:name>/videos/', views.TaggedContentView.as_view(target_type='video'), name='hashtag-videos'),
+]
@@ -0,0 +1,52 @@
+from rest_framework import generics, permissions
+from django.shortcuts import get_object_or_404
+from posts.models import Post
+from posts.serializers import PostSerializer
+from videos.models import Video
+from videos.serializers import VideoSerializer
+from utils.pagination import KeysetPagination
+from .extraction import normalize_tag
+from .models import Hashtag, TaggedItem
+from .serializers import HashtagSerializer
+
+class HashtagListView(generics.ListAPIView):
+    serializer_class = HashtagSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        if self.request.query_params.get('sort') == 'popular':
+            return Hashtag.objects.order_by('-posts_count', 'id')
+        return Hashtag.objects.filter(last_used_at__isnull=False).order_by('-last_used_at', 'id')
+
+class HashtagDetailView(generics.RetrieveAPIView):
+    serializer_class = HashtagSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        return get_object_or_404(Hashtag, name=normalize_tag(self.kwargs['name']))
+
+class TaggedContentView(generics.ListAPIView):
+    # Newest tagged posts or videos, paged over the (hashtag, target_type, created_at) index
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    target_type = None
+    
+    def get_serializer_class(self):
+        return PostSerializer if self.target_type == 'post' else VideoSerializer
+    
+    def get_queryset(self):
+        hashtag = get_object_or_404(Hashtag, name=normalize_tag(self.kwargs['name']))
+        return TaggedItem.objects.filter(hashtag=hashtag, target_type=self.target_type)
+    
+    def list(self, request, *args, **kwargs):
+        items = self.paginate_queryset(self.get_queryset())
+        if self.target_type == 'post':
+            objects = Post.objects.select_related('author')
+        else:
+            objects = Video.objects.select_related('author').filter(is_public=True)
+        found = objects.in_bulk([item.target_id for item in items])
+        serializer = self.get_serializer(
+            [found[item.target_id] for item in items if item.target_id in found],
+            many=True
+        )
+        return self.get_paginated_response(serializer.data)
@@ -0,0 +1,78 @@
+import json
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.utils import timezone
+from utils import fanout
+from .rooms import broadcast, call_store, group_name, rooms
+
+class LiveStreamConsumer(AsyncWebsocketConsumer):
+    async def connect(self):
+        self.stream_id = self.scope['url_route']['kwargs']['stream_id']
+        self.room_group_name = group_name(self.stream_id)
+        self.user = self.scope['user']
+        
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        
+        room = await rooms.join(self.stream_id, self.channel_name, self.user)
+        if room is None:
+            await self.close()
+            return
+        self.joined = True
+        
+        await fanout.group_add(
+            self.channel_layer,
+            self.room_group_name,
+            self.channel_name
+        )
+        await self.accept()
+        
+        # Catch the new viewer up on the room
+        await self.send(text_data=json.dumps({
+            'type': 'room_state',
+            'viewers_count': await call_store('total_viewers', str(self.stream_id)),
+            'recent_chat': await call_store('recent_chat', str(self.stream_id))
+        }))
+    
+    async def disconnect(self, close_code):
+        if getattr(self, 'joined', False):
+            await fanout.group_discard(
+                self.channel_layer,
+                self.room_group_name,
+                self.channel_name
+            )
+            await rooms.leave(self.stream_id, self.channel_name)
+    
+    async def receive(self, text_data):
+        data = json.loads(text_data)
+        message_type = data.get('type', 'chat_message')
+        
+        if message_type == 'chat_message':
+            content = str(data.get('content', '')).strip()[:500]
+            if not content:
+                return
+            
+            if not await call_store('allow_chat', str(self.stream_id), str(self.user.id)):
+                await self.send(text_data=json.dumps({
+                    'type': 'error',
+                    'error': 'You are sending messages too quickly'
+                }))
+                return
+            
+            entry = {
+                'user_id': str(self.user.id),
+                'username': self.user.username,
+                'content': content,
+                'created_at': timezone.now().isoformat()
+            }
+            await call_store('add_chat', str(self.stream_id), entry)
+            await broadcast(self.stream_id, {'type': 'chat_message', 'message': entry})
+    
+    async def live_event(self, event):
+        # Serialized once by the sender, see utils.fanout
+        await self.send(text_data=event['text'])
+    
+    async def stream_closed(self, event):
+        await self.send(text_data=event['text'])
+        await rooms.discard(self.stream_id)
+        await self.close()
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('live_streaming', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='livestream',
+            name='peak_viewers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -10,6 +10,7 @@ class LiveStream(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     is_live = models.BooleanField(default=False)
-    viewers_count = models.PositiveIntegerField(default=0)
+    viewers_count = models.PositiveIntegerField(default=0)  # checkpointed from live_streaming.rooms
+    peak_viewers_count = models.PositiveIntegerField(default=0)
     started_at = models.DateTimeField(auto_now_add=True)
     ended_at = models.DateTimeField(null=True, blank=True)
\ No newline at end of file
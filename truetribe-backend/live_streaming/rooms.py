@@ -0,0 +1,278 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Greatest
+from utils import fanout
+from utils.redis_client import get_redis
+from utils.unique_viewers import record_many
+from .models import LiveStream
+
+# Identifies this worker's share of a room in Redis
+WORKER_ID = uuid.uuid4().hex
+
+def group_name(stream_id):
+    return f'live_{stream_id}'
+
+class LocalRoomStore:
+    # Room state for a single worker
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.viewers = defaultdict(int)
+        self.peaks = defaultdict(int)
+        self.chat = defaultdict(lambda: deque(maxlen=settings.LIVE_CHAT_BUFFER_SIZE))
+        self.rates = defaultdict(deque)
+        self.checkpoints = {}
+
+    def set_viewers(self, stream_id, count):
+        with self.lock:
+            self.viewers[stream_id] = count
+            self.peaks[stream_id] = max(self.peaks[stream_id], count)
+            return count
+
+    def total_viewers(self, stream_id):
+        with self.lock:
+            return self.viewers[stream_id]
+
+    def peak(self, stream_id):
+        with self.lock:
+            return self.peaks[stream_id]
+
+    def add_chat(self, stream_id, entry):
+        with self.lock:
+            self.chat[stream_id].append(entry)
+
+    def recent_chat(self, stream_id):
+        with self.lock:
+            return list(self.chat[stream_id])
+
+    def allow_chat(self, stream_id, user_id):
+        # Sliding window per user
+        now = time.monotonic()
+        with self.lock:
+            sent = self.rates[(stream_id, user_id)]
+            while sent and now - sent[0] >= settings.LIVE_CHAT_RATE_WINDOW:
+                sent.popleft()
+            if len(sent) >= settings.LIVE_CHAT_RATE_LIMIT:
+                return False
+            sent.append(now)
+            return True
+
+    def claim_checkpoint(self, stream_id, interval):
+        now = time.monotonic()
+        with self.lock:
+            last = self.checkpoints.get(stream_id)
+            if last is not None and now - last < interval * 0.9:
+                return False
+            self.checkpoints[stream_id] = now
+            return True
+
+    def close(self, stream_id):
+        with self.lock:
+            for state in (self.viewers, self.peaks, self.chat, self.checkpoints):
+                state.pop(stream_id, None)
+            for key in [key for key in self.rates if key[0] == stream_id]:
+                del self.rates[key]
+
+class RedisRoomStore:
+    """
+    Room state shared by all workers.
+
+    Each worker publishes its own viewer count with a heartbeat on every join,
+    leave and checkpoint tick, so counts from a crashed worker stop being
+    included once the heartbeat goes stale.
+    """
+
+    def key(self, stream_id, name):
+        return f'live:{stream_id}:{name}'
+
+    def stale_after(self):
+        return settings.LIVE_CHECKPOINT_INTERVAL * 3
+
+    def set_viewers(self, stream_id, count):
+        now = time.time()
+        pipe = get_redis().pipeline()
+        for name, value in (('viewers', count), ('heartbeats', now)):
+            key = self.key(stream_id, name)
+            pipe.hset(key, WORKER_ID, value)
+            # Rooms nobody reports on any more disappear on their own
+            pipe.expire(key, int(self.stale_after()) + 1)
+        pipe.execute()
+        total = self.total_viewers(stream_id)
+        get_redis().zadd('live:peaks', {str(stream_id): total}, gt=True)
+        return total
+
+    def total_viewers(self, stream_id):
+        pipe = get_redis().pipeline()
+        pipe.hgetall(self.key(stream_id, 'viewers'))
+        pipe.hgetall(self.key(stream_id, 'heartbeats'))
+        viewers, heartbeats = pipe.execute()
+        stale_before = time.time() - self.stale_after()
+        return sum(
+            int(count) for worker, count in viewers.items()
+            if float(heartbeats.get(worker, 0)) >= stale_before
+        )
+
+    def peak(self, stream_id):
+        return int(get_redis().zscore('live:peaks', str(stream_id)) or 0)
+
+    def add_chat(self, stream_id, entry):
+        key = self.key(stream_id, 'chat')
+        pipe = get_redis().pipeline()
+        pipe.lpush(key, json.dumps(entry))
+        pipe.ltrim(key, 0, settings.LIVE_CHAT_BUFFER_SIZE - 1)
+        pipe.execute()
+
+    def recent_chat(self, stream_id):
+        entries = get_redis().lrange(self.key(stream_id, 'chat'), 0, settings.LIVE_CHAT_BUFFER_SIZE - 1)
+        return [json.loads(entry) for entry in reversed(entries)]
+
+    def allow_chat(self, stream_id, user_id):
+        window = settings.LIVE_CHAT_RATE_WINDOW
+        key = self.key(stream_id, f'rate:{user_id}:{int(time.time() // window)}')
+        pipe = get_redis().pipeline()
+        pipe.incr(key)
+        pipe.expire(key, int(window) + 1)
+        sent, _ = pipe.execute()
+        return sent <= settings.LIVE_CHAT_RATE_LIMIT
+
+    def claim_checkpoint(self, stream_id, interval):
+        # One worker per interval writes the checkpoint
+        return bool(get_redis().set(self.key(stream_id, 'checkpoint'), WORKER_ID, nx=True, px=int(interval * 900)))
+
+    def close(self, stream_id):
+        client = get_redis()
+        client.delete(*[self.key(stream_id, name) for name in ('viewers', 'heartbeats', 'chat', 'checkpoint')])
+        client.zrem('live:peaks', str(stream_id))
+
+_store = None
+
+def get_room_store():
+    global _store
+    if _store is None:
+        if settings.LIVE_ROOM_BACKEND == 'redis':
+            _store = RedisRoomStore()
+        else:
+            _store = LocalRoomStore()
+    return _store
+
+def call_store(method, *args):
+    return sync_to_async(getattr(get_room_store(), method), thread_sensitive=False)(*args)
+
+def record_viewers(stream_id, viewers):
+    # Unique viewers buffered by a room, merged into the sketch in one write
+    if viewers:
+        record_many('live_stream', [(stream_id, viewer) for viewer in viewers])
+
+def checkpoint_stream(stream_id, viewers=()):
+    record_viewers(stream_id, viewers)
+    store = get_room_store()
+    total = store.total_viewers(stream_id)
+    peak = max(store.peak(stream_id), total)
+    LiveStream.objects.filter(id=stream_id).update(
+        viewers_count=total,
+        peak_viewers_count=Greatest(F('peak_viewers_count'), peak)
+    )
+    return total
+
+class Room:
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.channels = {}
+        self.joined = set()  # viewer ids not yet recorded as unique viewers
+        self.checkpointer = None
+
+    def take_joined(self):
+        joined, self.joined = self.joined, set()
+        return joined
+
+class RoomManager:
+    """
+    Live rooms hosted by this worker.
+
+    Joins and leaves only touch memory and the room store; viewers_count,
+    peak_viewers_count and the unique viewers who joined reach the database on
+    a LIVE_CHECKPOINT_INTERVAL timer.
+    """
+
+    def __init__(self):
+        self.rooms = {}
+
+    async def join(self, stream_id, channel_name, user):
+        stream_id = str(stream_id)
+        room = self.rooms.get(stream_id)
+        if room is None:
+            is_live = await database_sync_to_async(
+                LiveStream.objects.filter(id=stream_id, is_live=True).exists
+            )()
+            if not is_live:
+                return None
+            room = self.rooms.setdefault(stream_id, Room(stream_id))
+        room.channels[channel_name] = str(user.id)
+        room.joined.add(str(user.id))
+        await call_store('set_viewers', stream_id, len(room.channels))
+        if room.checkpointer is None or room.checkpointer.done():
+            room.checkpointer = asyncio.ensure_future(self.run_checkpoints(room))
+        return room
+
+    async def leave(self, stream_id, channel_name):
+        stream_id = str(stream_id)
+        room = self.rooms.get(stream_id)
+        if room is None:
+            return
+        room.channels.pop(channel_name, None)
+        await call_store('set_viewers', stream_id, len(room.channels))
+        if not room.channels:
+            del self.rooms[stream_id]
+            if room.checkpointer is not None:
+                room.checkpointer.cancel()
+            await database_sync_to_async(checkpoint_stream)(stream_id, room.take_joined())
+
+    async def run_checkpoints(self, room):
+        interval = settings.LIVE_CHECKPOINT_INTERVAL
+        while True:
+            await asyncio.sleep(interval)
+            # Every hosting worker refreshes its heartbeat, not just the one that checkpoints
+            await call_store('set_viewers', room.stream_id, len(room.channels))
+            # Each worker records the viewers who joined its share of the room
+            joined = room.take_joined()
+            if not await call_store('claim_checkpoint', room.stream_id, interval):
+                await database_sync_to_async(record_viewers)(room.stream_id, joined)
+                continue
+            total = await database_sync_to_async(checkpoint_stream)(room.stream_id, joined)
+            await broadcast(room.stream_id, {'type': 'viewers', 'viewers_count': total})
+
+    async def discard(self, stream_id):
+        # The stream has ended; forget this worker's share of the room
+        stream_id = str(stream_id)
+        room = self.rooms.pop(stream_id, None)
+        if room is not None:
+            if room.checkpointer is not None:
+                room.checkpointer.cancel()
+            await database_sync_to_async(record_viewers)(stream_id, room.take_joined())
+        await call_store('close', stream_id)
+
+    def close(self, stream_id):
+        # Called from the request that ends the stream
+        stream_id = str(stream_id)
+        checkpoint_stream(stream_id)
+        get_room_store().close(stream_id)
+        from channels.layers import get_channel_layer
+        async_to_sync(fanout.group_send_json)(
+            get_channel_layer(), group_name(stream_id), 'stream_closed', {'type': 'stream_ended'}
+        )
+
+    def viewer_count(self, stream_id):
+        return get_room_store().total_viewers(str(stream_id))
+
+async def broadcast(stream_id, payload):
+    from channels.layers import get_channel_layer
+    await fanout.group_send_json(get_channel_layer(), group_name(stream_id), 'live_event', payload)
+
+rooms = RoomManager()
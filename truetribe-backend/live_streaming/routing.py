@@ -1,5 +1,6 @@
 from django.urls import re_path
+from . import consumers
 
 websocket_urlpatterns = [
-    # Live streaming WebSocket patterns will be added here
-]
\ No newline at end of file
+    re_path(r'ws/live/(?P<stream_id>[0-9a-f-]+)/$', consumers.LiveStreamConsumer.as_asgi()),
+]
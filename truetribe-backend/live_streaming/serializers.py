@@ -1,11 +1,16 @@
 from rest_framework import serializers
 from .models import LiveStream
 from users.serializers import UserSerializer
+from utils.unique_viewers import unique_viewer_count
 
 class LiveStreamSerializer(serializers.ModelSerializer):
     streamer = UserSerializer(read_only=True)
+    unique_viewers = serializers.SerializerMethodField()
     
     class Meta:
         model = LiveStream
-        fields = ['id', 'streamer', 'title', 'description', 'is_live', 'viewers_count', 'started_at', 'ended_at']
-        read_only_fields = ['id', 'is_live', 'viewers_count', 'started_at', 'ended_at']
\ No newline at end of file
+        fields = ['id', 'streamer', 'title', 'description', 'is_live', 'viewers_count', 'peak_viewers_count', 'unique_viewers', 'started_at', 'ended_at']
+        read_only_fields = ['id', 'is_live', 'viewers_count', 'peak_viewers_count', 'started_at', 'ended_at']
+    
+    def get_unique_viewers(self, obj):
+        return unique_viewer_count('live_stream', obj.id)
\ No newline at end of file
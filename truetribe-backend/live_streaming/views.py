@@ -5,6 +5,7 @@ from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from .models import LiveStream
 from .serializers import LiveStreamSerializer
+from .rooms import rooms
 
 class LiveStreamListCreateView(generics.ListCreateAPIView):
     serializer_class = LiveStreamSerializer
@@ -22,13 +23,18 @@ def end_stream(request, stream_id):
     stream = get_object_or_404(LiveStream, id=stream_id, streamer=request.user)
     stream.is_live = False
     stream.ended_at = timezone.now()
-    stream.save()
+    stream.save(update_fields=['is_live', 'ended_at'])
+    # Final checkpoint, room state dropped and every viewer's socket closed
+    rooms.close(stream.id)
     return Response({'message': 'Stream ended'})
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def join_stream(request, stream_id):
     stream = get_object_or_404(LiveStream, id=stream_id)
-    stream.viewers_count += 1
-    stream.save()
-    return Response({'message': 'Joined stream'})
\ No newline at end of file
+    # Live and unique viewer counts come from the stream's WebSocket room, see live_streaming.rooms
+    return Response({
+        'message': 'Joined stream',
+        'viewers_count': rooms.viewer_count(stream.id),
+        'websocket_url': f'/ws/live/{stream.id}/'
+    })
\ No newline at end of file
@@ -3,10 +3,10 @@ from .models import MediaFile
 
 @admin.register(MediaFile)
 class MediaFileAdmin(admin.ModelAdmin):
-    list_display = ['user', 'media_type', 'file_size', 'uploaded_at']
-    list_filter = ['media_type', 'uploaded_at']
-    search_fields = ['user__username']
-    readonly_fields = ['file_size', 'uploaded_at']
+    list_display = ['user', 'media_type', 'variant', 'file_size', 'uploaded_at']
+    list_filter = ['media_type', 'variant', 'uploaded_at']
+    search_fields = ['user__username', 'source_name']
+    readonly_fields = ['file_size', 'source_name', 'variant', 'width', 'height', 'uploaded_at']
     
     def get_file_size_display(self, obj):
         size = obj.file_size
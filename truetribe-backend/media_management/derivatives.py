@@ -0,0 +1,177 @@
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import PurePosixPath
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from posts.models import Post
+from videos.models import Video
+from .models import MediaFile
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+# Model -> (image fields that get resized variants, field holding the owner's id)
+VARIANT_SOURCES = {
+    Post: (('image',), 'author_id'),
+    Video: (('thumbnail',), 'author_id'),
+    User: (('profile_picture', 'cover_photo'), 'id'),
+}
+
+# MEDIA_VARIANT_FORMAT -> (Pillow format, file extension, extra save options)
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'optimize': True, 'progressive': True}),
+}
+
+def source_names(instance, update_fields=None):
+    fields, _ = VARIANT_SOURCES[type(instance)]
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    return [getattr(instance, field).name for field in fields if getattr(instance, field)]
+
+def variant_urls(names):
+    # {source name: {variant: url}} for every variant generated so far
+    urls = {}
+    names = {name for name in names if name}
+    if names:
+        for source_name, variant, file_name in MediaFile.objects.filter(
+            source_name__in=names
+        ).exclude(variant='').values_list('source_name', 'variant', 'file'):
+            urls.setdefault(source_name, {})[variant] = default_storage.url(file_name)
+    return urls
+
+def open_image(name, image_format):
+    largest = max(settings.MEDIA_VARIANT_SIZES.values())
+    with default_storage.open(name) as f:
+        image = Image.open(f)
+        # JPEG sources are decoded at a reduced scale that still covers the largest variant
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+    if has_alpha and image_format == 'JPEG':
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+        return background
+    return image.convert('RGBA' if has_alpha else 'RGB')
+
+def store_variant(source_name, owner_id, variant, image, extension, data):
+    media = MediaFile.objects.filter(source_name=source_name, variant=variant).first()
+    if media is None:
+        media = MediaFile(user_id=owner_id, media_type='image', source_name=source_name, variant=variant)
+    elif media.file:
+        media.file.delete(save=False)
+    media.width, media.height = image.size
+    media.file_size = len(data)
+    stem = PurePosixPath(source_name).with_suffix('')
+    media.file.save(f'variants/{stem}_{variant}.{extension}', ContentFile(data), save=False)
+    media.save()
+    return media
+
+def generate_variants(source_name, owner_id):
+    if not default_storage.exists(source_name) or not User.objects.filter(id=owner_id).exists():
+        # Replaced or deleted before we got to it
+        return []
+    image_format, extension, options = FORMATS[settings.MEDIA_VARIANT_FORMAT]
+    try:
+        image = open_image(source_name, image_format)
+    except (OSError, Image.DecompressionBombError):
+        logger.warning('Cannot generate variants for %s', source_name, exc_info=True)
+        return []
+
+    # Largest first, so each smaller variant is resampled from the previous one
+    generated = []
+    for variant, size in sorted(settings.MEDIA_VARIANT_SIZES.items(), key=lambda item: -item[1]):
+        image = image.copy()
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, quality=settings.MEDIA_VARIANT_QUALITY, **options)
+        generated.append(store_variant(source_name, owner_id, variant, image, extension, buffer.getvalue()))
+    return generated
+
+def delete_variants(names):
+    for media in MediaFile.objects.filter(source_name__in=names).exclude(variant=''):
+        media.file.delete(save=False)
+        media.delete()
+
+class LocalVariantWorker:
+    # Thread pool for processes without a Celery worker; Pillow releases the
+    # GIL while decoding, resampling and encoding
+    def __init__(self):
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def submit(self, source_name, owner_id):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=settings.MEDIA_VARIANT_WORKERS, thread_name_prefix='media-variants'
+                )
+        self.executor.submit(self.run, source_name, owner_id)
+
+    def run(self, source_name, owner_id):
+        try:
+            close_old_connections()
+            generate_variants(source_name, owner_id)
+        except Exception:
+            logger.exception('Failed to generate variants for %s', source_name)
+
+_local_worker = LocalVariantWorker()
+
+def schedule(source_name, owner_id):
+    mode = settings.MEDIA_VARIANT_DISPATCH
+    if mode == 'celery':
+        from .tasks import generate_media_variants
+        generate_media_variants.delay(source_name, str(owner_id))
+    elif mode == 'sync':
+        # Resizes inline after commit; intended for tests and scripts
+        generate_variants(source_name, owner_id)
+    else:
+        _local_worker.submit(source_name, owner_id)
+
+def remember(instance, update_fields=None):
+    # Called before save so sync() can drop the variants of a replaced image
+    if type(instance) not in VARIANT_SOURCES or instance._state.adding:
+        return
+    fields, _ = VARIANT_SOURCES[type(instance)]
+    if update_fields is not None:
+        fields = [field for field in fields if field in update_fields]
+    if fields:
+        instance._previous_sources = (
+            type(instance).objects.filter(pk=instance.pk).values(*fields).first() or {}
+        )
+
+def sync(instance, update_fields=None):
+    if type(instance) not in VARIANT_SOURCES:
+        return
+    previous = instance.__dict__.pop('_previous_sources', {})
+    replaced = [
+        name for field, name in previous.items()
+        if name and name != getattr(instance, field).name
+    ]
+    if replaced:
+        transaction.on_commit(partial(delete_variants, replaced))
+    names = source_names(instance, update_fields)
+    if not names:
+        return
+    done = set(MediaFile.objects.filter(source_name__in=names).values_list('source_name', flat=True))
+    _, owner_field = VARIANT_SOURCES[type(instance)]
+    for name in names:
+        if name not in done:
+            # The uploaded file and its row have to be visible to the worker
+            transaction.on_commit(partial(schedule, name, getattr(instance, owner_field)))
+
+def remove(instance):
+    if type(instance) not in VARIANT_SOURCES:
+        return
+    names = source_names(instance)
+    if names:
+        transaction.on_commit(partial(delete_variants, names))
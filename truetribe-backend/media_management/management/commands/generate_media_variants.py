@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from media_management import derivatives
+from media_management.models import MediaFile
+
+class Command(BaseCommand):
+    help = 'Generate resized variants for existing post images, video thumbnails and profile photos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--force', action='store_true', help='Regenerate variants that already exist')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        for model, (fields, owner_field) in derivatives.VARIANT_SOURCES.items():
+            generated = 0
+            last_id = None
+            while True:
+                objects = model.objects.order_by('id').only('id', owner_field, *fields)
+                if last_id is not None:
+                    objects = objects.filter(id__gt=last_id)
+                batch = list(objects[:batch_size])
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                sources = {
+                    name: getattr(instance, owner_field)
+                    for instance in batch
+                    for name in derivatives.source_names(instance)
+                }
+                if not options['force']:
+                    done = set(MediaFile.objects.filter(
+                        source_name__in=sources
+                    ).values_list('source_name', flat=True))
+                    sources = {name: owner_id for name, owner_id in sources.items() if name not in done}
+                for name, owner_id in sources.items():
+                    if derivatives.generate_variants(name, owner_id):
+                        generated += 1
+            self.stdout.write(f'Generated variants for {generated} {model._meta.verbose_name} images')
+        self.stdout.write(self.style.SUCCESS('Media variants are up to date'))
@@ -12,9 +12,25 @@ class MediaFile(models.Model):
         ('document', 'Document'),
     ]
     
+    VARIANTS = [
+        ('thumb', 'Thumbnail'),
+        ('feed', 'Feed'),
+        ('full', 'Full'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='media_files')
     file = models.FileField(upload_to='media/')
     media_type = models.CharField(max_length=10, choices=MEDIA_TYPES)
     file_size = models.PositiveIntegerField()
-    uploaded_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    # Resized copies of an uploaded image, see media_management.derivatives
+    source_name = models.CharField(max_length=255, blank=True)
+    variant = models.CharField(max_length=10, choices=VARIANTS, blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['source_name', 'variant']),
+        ]
\ No newline at end of file
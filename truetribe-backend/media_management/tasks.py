@@ -0,0 +1,6 @@
+from celery import shared_task
+from . import derivatives
+
+@shared_task
+def generate_media_variants(source_name, owner_id):
+    derivatives.generate_variants(source_name, owner_id)
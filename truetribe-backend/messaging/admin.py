@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Conversation, Message, MessageRead, MessageReaction
+from .models import Conversation, Message, MessageRead, ConversationReadState, MessageReaction
 
 @admin.register(Conversation)
 class ConversationAdmin(admin.ModelAdmin):
@@ -20,6 +20,11 @@ class MessageReadAdmin(admin.ModelAdmin):
     list_display = ['user', 'message', 'read_at']
     list_filter = ['read_at']
 
+@admin.register(ConversationReadState)
+class ConversationReadStateAdmin(admin.ModelAdmin):
+    list_display = ['user', 'conversation', 'last_read_at', 'updated_at']
+    list_filter = ['last_read_at']
+
 @admin.register(MessageReaction)
 class MessageReactionAdmin(admin.ModelAdmin):
     list_display = ['user', 'message', 'reaction_type', 'created_at']
@@ -1,8 +1,13 @@
 import json
+import time
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message, MessageRead
+from .ingest import submit_message
+from .membership import is_member
+from utils import fanout
+from users.presence import touch, typing_broadcaster, user_connected, user_disconnected
 
 User = get_user_model()
 
@@ -17,28 +22,41 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.close()
             return
         
-        await self.channel_layer.group_add(
+        await fanout.group_add(
+            self.channel_layer,
             self.room_group_name,
             self.channel_name
         )
         await self.accept()
+        self.joined = True
+        self.touched_at = time.monotonic()
+        await database_sync_to_async(user_connected)(self.scope['user'], self.channel_name)
     
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
+        await fanout.group_discard(
+            self.channel_layer,
             self.room_group_name,
             self.channel_name
         )
+        if getattr(self, 'joined', False):
+            await typing_broadcaster.update(
+                self.channel_layer, self.room_group_name, self.conversation_id, self.scope['user'], False
+            )
+            await database_sync_to_async(user_disconnected)(self.scope['user'], self.channel_name)
     
     async def receive(self, text_data):
         data = json.loads(text_data)
         message_type = data.get('type', 'chat_message')
+        await self.touch()
         
         if message_type == 'chat_message':
             content = data['content']
             message = await self.create_message(content)
             
-            await self.channel_layer.group_send(
+            await fanout.group_send_json(
+                self.channel_layer,
                 self.room_group_name,
+                'chat_message',
                 {
                     'type': 'chat_message',
                     'message': {
@@ -55,48 +73,38 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 }
             )
         elif message_type == 'typing':
-            await self.channel_layer.group_send(
+            # Coalesced per conversation, see users.presence.TypingBroadcaster
+            await typing_broadcaster.update(
+                self.channel_layer,
                 self.room_group_name,
-                {
-                    'type': 'typing_indicator',
-                    'user_id': str(self.scope['user'].id),
-                    'username': self.scope['user'].username,
-                    'is_typing': data.get('is_typing', False)
-                }
+                self.conversation_id,
+                self.scope['user'],
+                data.get('is_typing', False)
             )
     
     async def chat_message(self, event):
+        # Serialized once by the sender, see utils.fanout
+        await self.send(text_data=event['text'])
+    
+    async def typing_indicator(self, event):
+        user_id = str(self.scope['user'].id)
         await self.send(text_data=json.dumps({
-            'type': 'chat_message',
-            'message': event['message']
+            'type': 'typing_indicator',
+            'typing': [typist for typist in event['typing'] if typist['user_id'] != user_id]
         }))
     
-    async def typing_indicator(self, event):
-        if str(self.scope['user'].id) != event['user_id']:
-            await self.send(text_data=json.dumps({
-                'type': 'typing_indicator',
-                'user_id': event['user_id'],
-                'username': event['username'],
-                'is_typing': event['is_typing']
-            }))
+    async def touch(self):
+        # Only hop to a thread when a last_active write may be due; touch()
+        # still dedupes against this user's other connections
+        now = time.monotonic()
+        if now - self.touched_at >= settings.PRESENCE_LAST_SEEN_INTERVAL:
+            self.touched_at = now
+            await database_sync_to_async(touch)(self.scope['user'].id)
     
     @database_sync_to_async
     def is_conversation_participant(self):
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            return conversation.participants.filter(id=self.scope['user'].id).exists()
-        except Conversation.DoesNotExist:
-            return False
+        return is_member(self.conversation_id, self.scope['user'])
     
-    @database_sync_to_async
-    def create_message(self, content):
-        conversation = Conversation.objects.get(id=self.conversation_id)
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=self.scope['user'],
-            content=content,
-            message_type='text'
-        )
-        conversation.updated_at = message.created_at
-        conversation.save()
-        return message
\ No newline at end of file
+    async def create_message(self, content):
+        # Batched with other inbound messages; returns once the batch has committed
+        return await submit_message(self.conversation_id, self.scope['user'], content)
\ No newline at end of file
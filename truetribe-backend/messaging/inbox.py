@@ -0,0 +1,106 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from .models import ConversationReadState, InboxEntry, Message
+from .receipts import mark_read, read_cursor, unread_count
+
+def message_snapshot(message):
+    sender = message.sender
+    return {
+        'id': str(message.id),
+        'sender': {
+            'id': str(sender.id),
+            'username': sender.username,
+            'profile_picture': sender.profile_picture.url if sender.profile_picture else None
+        },
+        'content': message.content,
+        'message_type': message.message_type,
+        'is_edited': message.is_edited,
+        'created_at': message.created_at.isoformat()
+    }
+
+def latest_message(conversation_id, exclude=None):
+    messages = Message.objects.filter(conversation_id=conversation_id).select_related('sender')
+    if exclude is not None:
+        messages = messages.exclude(id=exclude.id)
+    return messages.order_by('-created_at', '-id').first()
+
+def add_participants(conversation, user_ids):
+    latest = latest_message(conversation.id)
+    InboxEntry.objects.bulk_create([
+        InboxEntry(
+            user_id=user_id,
+            conversation=conversation,
+            last_message=latest,
+            last_message_preview=message_snapshot(latest) if latest else None,
+            last_message_at=latest.created_at if latest else conversation.created_at,
+            unread_count=unread_count(conversation.id, user_id, read_cursor(conversation.id, user_id)) if latest else 0
+        )
+        for user_id in user_ids
+    ], ignore_conflicts=True)
+
+def remove_participants(conversation, user_ids=None):
+    entries = InboxEntry.objects.filter(conversation=conversation)
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    entries.delete()
+
+def message_created(message):
+    messages_created([message])
+
+def messages_created(messages):
+    by_conversation = defaultdict(list)
+    for message in messages:
+        by_conversation[message.conversation_id].append(message)
+
+    with transaction.atomic():
+        for conversation_id, batch in by_conversation.items():
+            batch.sort(key=lambda message: message.created_at)
+            latest = batch[-1]
+            # A sender has read everything up to their own last message, so
+            # their counter restarts from the messages that came after it
+            last_sent = {}
+            for position, message in enumerate(batch):
+                last_sent[message.sender_id] = (position, message)
+            InboxEntry.objects.filter(conversation_id=conversation_id).update(
+                last_message=latest,
+                last_message_preview=message_snapshot(latest),
+                last_message_at=latest.created_at,
+                unread_count=Case(
+                    *[
+                        When(user_id=sender_id, then=Value(len(batch) - position - 1))
+                        for sender_id, (position, _) in last_sent.items()
+                    ],
+                    default=F('unread_count') + len(batch)
+                )
+            )
+            for _, message in last_sent.values():
+                mark_read(conversation_id, message.sender, message)
+
+def message_edited(message):
+    InboxEntry.objects.filter(last_message=message).update(last_message_preview=message_snapshot(message))
+
+def message_deleted(message):
+    # Called before the row is deleted
+    with transaction.atomic():
+        read_by = ConversationReadState.objects.filter(
+            conversation_id=message.conversation_id,
+            last_read_at__gte=message.created_at
+        ).values('user_id')
+        InboxEntry.objects.filter(
+            conversation_id=message.conversation_id,
+            unread_count__gt=0
+        ).exclude(user_id=message.sender_id).exclude(user_id__in=read_by).update(
+            unread_count=F('unread_count') - 1
+        )
+        previous = latest_message(message.conversation_id, exclude=message)
+        InboxEntry.objects.filter(last_message=message).update(
+            last_message=previous,
+            last_message_preview=message_snapshot(previous) if previous else None,
+            last_message_at=previous.created_at if previous else message.conversation.created_at
+        )
+
+def conversation_read(conversation, user):
+    with transaction.atomic():
+        mark_read(conversation, user)
+        InboxEntry.objects.filter(conversation=conversation, user=user, unread_count__gt=0).update(unread_count=0)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+from collections import defaultdict
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from .models import Conversation, Message
+from . import inbox
+
+logger = logging.getLogger(__name__)
+
+def persist(messages):
+    # One INSERT for the batch and one updated_at bump per conversation
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        latest = defaultdict(lambda: None)
+        for message in messages:
+            current = latest[message.conversation_id]
+            if current is None or message.created_at > current:
+                latest[message.conversation_id] = message.created_at
+        for conversation_id, created_at in latest.items():
+            Conversation.objects.filter(id=conversation_id).update(updated_at=created_at)
+        inbox.messages_created(messages)
+
+def persist_each(messages):
+    # Fallback after a failed batch: only the offending messages are rejected
+    errors = {}
+    for i, message in enumerate(messages):
+        try:
+            persist([message])
+        except (DataError, IntegrityError) as e:
+            errors[i] = e
+    return errors
+
+class MessageIngest:
+    """
+    Per-process queue for chat messages arriving over WebSockets.
+
+    Messages from every consumer on the event loop are collected for up to
+    CHAT_INGEST_BATCH_WINDOW seconds and written in one transaction. Each
+    submitter is resumed once the batch has committed.
+    """
+
+    def __init__(self):
+        self.loop = None
+        self.queue = None
+        self.worker = None
+
+    def ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop or self.worker is None or self.worker.done():
+            self.loop = loop
+            self.queue = asyncio.Queue()
+            self.worker = loop.create_task(self.run())
+
+    async def submit(self, message):
+        self.ensure_worker()
+        future = self.loop.create_future()
+        self.queue.put_nowait((message, future))
+        return await future
+
+    async def collect(self):
+        batch = [await self.queue.get()]
+        deadline = self.loop.time() + settings.CHAT_INGEST_BATCH_WINDOW
+        while len(batch) < settings.CHAT_INGEST_MAX_BATCH:
+            timeout = deadline - self.loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def run(self):
+        while True:
+            batch = await self.collect()
+            messages = [message for message, _ in batch]
+            errors = {}
+            try:
+                try:
+                    await database_sync_to_async(persist)(messages)
+                except (DataError, IntegrityError):
+                    logger.warning('Chat batch of %d rejected, retrying one by one', len(messages))
+                    errors = await database_sync_to_async(persist_each)(messages)
+            except Exception as e:
+                logger.exception('Failed to persist %d chat messages', len(messages))
+                errors = {i: e for i in range(len(batch))}
+            for i, (message, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if i in errors:
+                    future.set_exception(errors[i])
+                else:
+                    future.set_result(message)
+
+_ingest = MessageIngest()
+
+async def submit_message(conversation_id, sender, content, message_type='text'):
+    message = Message(
+        conversation_id=conversation_id,
+        sender=sender,
+        content=content,
+        message_type=message_type
+    )
+    return await _ingest.submit(message)
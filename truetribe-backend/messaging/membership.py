@@ -0,0 +1,169 @@
+import logging
+import threading
+import time
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from utils.redis_client import get_redis
+from .models import Conversation
+
+logger = logging.getLogger(__name__)
+
+# Stored alongside the member ids so an empty set still counts as cached
+EMPTY_MARKER = '-'
+INVALIDATION_CHANNEL = 'conversation:members:invalidate'
+
+# Replace the member set only if no invalidation bumped the version since the
+# caller read it, so a fill loaded before a change cannot outlive it
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+class MembershipCache:
+    """
+    Participant ids per conversation.
+
+    With the redis backend, lookups go to an in-process TTL cache first, then
+    a shared Redis set, and only fall back to the participants table on a
+    miss. Participant changes delete the Redis set and are broadcast over
+    pub/sub so every process drops its local entry; the local tier is only
+    used while this process is subscribed. Both tiers are filled only if no
+    invalidation arrived while the participants were being read. The local
+    backend has no way to reach other processes, so it reads the participants
+    table every time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.local = {}
+        self.subscribed = False
+        self.listener = None
+        self.generation = 0  # bumped by every invalidation this process sees
+        self.store_script = None
+
+    def redis_key(self, conversation_id):
+        return f'conversation:{conversation_id}:members'
+
+    def version_key(self, conversation_id):
+        return f'conversation:{conversation_id}:members:version'
+
+    def members(self, conversation_id):
+        conversation_id = str(conversation_id)
+        if settings.MEMBERSHIP_BACKEND != 'redis':
+            return self.load_database(conversation_id)
+
+        self.ensure_listener()
+        now = time.monotonic()
+        with self.lock:
+            cached = self.local.get(conversation_id) if self.subscribed else None
+            generation = self.generation
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        members, version = self.load_redis(conversation_id)
+        if members is None:
+            members = self.load_database(conversation_id)
+            self.store_redis(conversation_id, members, version)
+
+        with self.lock:
+            if self.subscribed and self.generation == generation:
+                self.local[conversation_id] = (now + settings.MEMBERSHIP_CACHE_TTL, members)
+        return members
+
+    def ensure_listener(self):
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self.listen, name='membership-invalidation', daemon=True)
+                self.listener.start()
+
+    def listen(self):
+        while True:
+            try:
+                pubsub = get_redis().pubsub()
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                for message in pubsub.listen():
+                    with self.lock:
+                        if message['type'] == 'subscribe':
+                            # Anything cached before this point may have missed an invalidation
+                            self.local.clear()
+                            self.generation += 1
+                            self.subscribed = True
+                        elif message['type'] == 'message':
+                            self.local.pop(message['data'], None)
+                            self.generation += 1
+            except Exception:
+                logger.exception('Membership invalidation listener disconnected')
+            with self.lock:
+                self.subscribed = False
+                self.local.clear()
+            time.sleep(1)
+
+    def load_database(self, conversation_id):
+        return frozenset(
+            str(user_id) for user_id in Conversation.participants.through.objects.filter(
+                conversation_id=conversation_id
+            ).values_list('user_id', flat=True)
+        )
+
+    def load_redis(self, conversation_id):
+        # (members or None on a miss, version to fill the miss against)
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.smembers(self.redis_key(conversation_id))
+        pipe.get(self.version_key(conversation_id))
+        members, version = pipe.execute()
+        if not members:
+            return None, version or ''
+        return frozenset(members - {EMPTY_MARKER}), version or ''
+
+    def store_redis(self, conversation_id, members, version):
+        if self.store_script is None:
+            self.store_script = get_redis().register_script(STORE_SCRIPT)
+        self.store_script(
+            keys=[self.redis_key(conversation_id), self.version_key(conversation_id)],
+            args=[version, settings.MEMBERSHIP_REDIS_TTL, EMPTY_MARKER, *members],
+        )
+
+    def invalidate(self, conversation_id):
+        conversation_id = str(conversation_id)
+        with self.lock:
+            self.local.pop(conversation_id, None)
+            self.generation += 1
+        if settings.MEMBERSHIP_BACKEND == 'redis':
+            pipe = get_redis().pipeline()
+            pipe.incr(self.version_key(conversation_id))
+            # Kept far longer than any read in flight, so a stale fill never matches
+            pipe.expire(self.version_key(conversation_id), settings.MEMBERSHIP_REDIS_TTL * 2)
+            pipe.delete(self.redis_key(conversation_id))
+            pipe.publish(INVALIDATION_CHANNEL, conversation_id)
+            pipe.execute()
+
+_cache = MembershipCache()
+
+def is_member(conversation_id, user):
+    user_id = getattr(user, 'id', user)
+    return str(user_id) in _cache.members(conversation_id)
+
+def invalidate(conversation_ids):
+    conversation_ids = list(conversation_ids)
+    for conversation_id in conversation_ids:
+        _cache.invalidate(conversation_id)
+    # Again once committed, in case a reader cached the old participants meanwhile
+    transaction.on_commit(partial(invalidate_now, conversation_ids))
+
+def invalidate_now(conversation_ids):
+    for conversation_id in conversation_ids:
+        _cache.invalidate(conversation_id)
+
+def get_conversation_or_404(conversation_id, user):
+    # Authorizes against the cache, then loads the row by primary key
+    if not is_member(conversation_id, user):
+        raise Http404
+    return get_object_or_404(Conversation, id=conversation_id)
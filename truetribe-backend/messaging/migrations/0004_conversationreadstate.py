@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:16
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def seed_read_states(apps, schema_editor):
+    # Start each cursor at the newest message the user had a read receipt for
+    MessageRead = apps.get_model('messaging', 'MessageRead')
+    ConversationReadState = apps.get_model('messaging', 'ConversationReadState')
+    latest = MessageRead.objects.values('message__conversation_id', 'user_id').annotate(
+        last_read_at=Max('message__created_at')
+    ).order_by()
+    ConversationReadState.objects.bulk_create([
+        ConversationReadState(
+            conversation_id=row['message__conversation_id'],
+            user_id=row['user_id'],
+            last_read_at=row['last_read_at']
+        )
+        for row in latest.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConversationReadState',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_read_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_states', to='messaging.conversation')),
+                ('last_read_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_read_states', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('conversation', 'user')},
+            },
+        ),
+        migrations.RunPython(seed_read_states, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:17
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_inbox(apps, schema_editor):
+    Conversation = apps.get_model('messaging', 'Conversation')
+    Message = apps.get_model('messaging', 'Message')
+    ConversationReadState = apps.get_model('messaging', 'ConversationReadState')
+    InboxEntry = apps.get_model('messaging', 'InboxEntry')
+    entries = []
+    for conversation in Conversation.objects.prefetch_related('participants').iterator(chunk_size=500):
+        messages = Message.objects.filter(conversation=conversation)
+        latest = messages.select_related('sender').order_by('-created_at', '-id').first()
+        preview = None
+        if latest is not None:
+            preview = {
+                'id': str(latest.id),
+                'sender': {
+                    'id': str(latest.sender.id),
+                    'username': latest.sender.username,
+                    'profile_picture': latest.sender.profile_picture.url if latest.sender.profile_picture else None
+                },
+                'content': latest.content,
+                'message_type': latest.message_type,
+                'is_edited': latest.is_edited,
+                'created_at': latest.created_at.isoformat()
+            }
+        cursors = dict(ConversationReadState.objects.filter(
+            conversation=conversation
+        ).values_list('user_id', 'last_read_at'))
+        for user in conversation.participants.all():
+            unread = messages.exclude(sender=user)
+            if cursors.get(user.id) is not None:
+                unread = unread.filter(created_at__gt=cursors[user.id])
+            entries.append(InboxEntry(
+                user=user,
+                conversation=conversation,
+                last_message=latest,
+                last_message_preview=preview,
+                last_message_at=latest.created_at if latest else conversation.created_at,
+                unread_count=unread.count() if latest else 0
+            ))
+        if len(entries) >= 1000:
+            InboxEntry.objects.bulk_create(entries, ignore_conflicts=True)
+            entries = []
+    InboxEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_conversationreadstate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InboxEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_message_preview', models.JSONField(blank=True, null=True)),
+                ('last_message_at', models.DateTimeField()),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('conversation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='messaging.conversation')),
+                ('last_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-last_message_at', '-id'], name='messaging_i_user_id_548da5_idx')],
+                'unique_together': {('user', 'conversation')},
+            },
+        ),
+        migrations.RunPython(build_inbox, migrations.RunPython.noop),
+    ]
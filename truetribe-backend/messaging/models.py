@@ -39,6 +39,9 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['conversation', '-created_at', '-id']),
+        ]
 
 class MessageRead(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -49,6 +52,34 @@ class MessageRead(models.Model):
     class Meta:
         unique_together = ('message', 'user')
 
+class ConversationReadState(models.Model):
+    # Per-participant read cursor; everything up to last_read_at counts as read
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='read_states')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_read_states')
+    last_read_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_read_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('conversation', 'user')
+
+class InboxEntry(models.Model):
+    # Inbox projection per participant, maintained by messaging.inbox
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='inbox_entries')
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='inbox_entries')
+    last_message = models.ForeignKey(Message, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_preview = models.JSONField(null=True, blank=True)
+    last_message_at = models.DateTimeField()
+    unread_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('user', 'conversation')
+        indexes = [
+            models.Index(fields=['user', '-last_message_at', '-id']),
+        ]
+
 class MessageReaction(models.Model):
     REACTION_TYPES = [
         ('like', '👍'),
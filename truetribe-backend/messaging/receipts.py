@@ -0,0 +1,37 @@
+from django.db.models import Q
+from django.utils import timezone
+from .models import ConversationReadState, Message
+
+def read_cursor(conversation_id, user):
+    return ConversationReadState.objects.filter(
+        conversation_id=conversation_id,
+        user=user
+    ).values_list('last_read_at', flat=True).first()
+
+def unread_count(conversation_id, user, cursor=None):
+    # Range count on the (conversation, created_at) index
+    messages = Message.objects.filter(conversation_id=conversation_id).exclude(sender=user)
+    if cursor is not None:
+        messages = messages.filter(created_at__gt=cursor)
+    return messages.count()
+
+def mark_read(conversation, user, message=None):
+    conversation_id = getattr(conversation, 'id', conversation)
+    if message is None:
+        message = Message.objects.filter(conversation_id=conversation_id).order_by('-created_at', '-id').first()
+    if message is None:
+        return False
+    # The cursor only moves forward, so late or duplicate requests are no-ops
+    updated = ConversationReadState.objects.filter(
+        Q(last_read_at__isnull=True) | Q(last_read_at__lt=message.created_at),
+        conversation_id=conversation_id,
+        user=user
+    ).update(last_read_message=message, last_read_at=message.created_at, updated_at=timezone.now())
+    if updated:
+        return True
+    _, created = ConversationReadState.objects.get_or_create(
+        conversation_id=conversation_id,
+        user=user,
+        defaults={'last_read_message': message, 'last_read_at': message.created_at}
+    )
+    return created
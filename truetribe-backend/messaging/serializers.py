@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message, MessageRead, MessageReaction
+from .models import Conversation, Message, MessageReaction, InboxEntry
+from .receipts import read_cursor
 from users.serializers import UserSerializer
 
 User = get_user_model()
@@ -40,7 +41,12 @@ class MessageSerializer(serializers.ModelSerializer):
     def get_is_read(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
-            return MessageRead.objects.filter(message=obj, user=request.user).exists()
+            # One cursor lookup per conversation, shared across the page
+            cursors = self.context.setdefault('read_cursors', {})
+            if obj.conversation_id not in cursors:
+                cursors[obj.conversation_id] = read_cursor(obj.conversation_id, request.user)
+            cursor = cursors[obj.conversation_id]
+            return cursor is not None and obj.created_at <= cursor
         return False
 
 class ConversationSerializer(serializers.ModelSerializer):
@@ -56,25 +62,48 @@ class ConversationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
     
+    def get_inbox_entry(self, obj):
+        request = self.context.get('request')
+        if not request or not request.user.is_authenticated:
+            return None
+        entries = self.context.setdefault('inbox_entries', {})
+        if obj.id not in entries:
+            entries[obj.id] = InboxEntry.objects.filter(conversation=obj, user=request.user).first()
+        return entries[obj.id]
+    
     def get_last_message(self, obj):
-        last_message = obj.messages.last()
-        if last_message:
-            return MessageSerializer(last_message, context=self.context).data
+        entry = self.get_inbox_entry(obj)
+        if entry is not None:
+            return entry.last_message_preview
         return None
     
     def get_unread_count(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            user_read_messages = MessageRead.objects.filter(
-                user=request.user,
-                message__conversation=obj
-            ).values_list('message_id', flat=True)
-            
-            return obj.messages.exclude(
-                id__in=user_read_messages
-            ).exclude(sender=request.user).count()
+        entry = self.get_inbox_entry(obj)
+        if entry is not None:
+            return entry.unread_count
         return 0
 
+class InboxEntrySerializer(serializers.ModelSerializer):
+    # Same shape as ConversationSerializer, read from the inbox projection
+    id = serializers.UUIDField(source='conversation.id', read_only=True)
+    participants = UserSerializer(source='conversation.participants', many=True, read_only=True)
+    is_group = serializers.BooleanField(source='conversation.is_group', read_only=True)
+    group_name = serializers.CharField(source='conversation.group_name', read_only=True)
+    group_image = serializers.ImageField(source='conversation.group_image', read_only=True)
+    created_by = serializers.UUIDField(source='conversation.created_by_id', read_only=True)
+    created_at = serializers.DateTimeField(source='conversation.created_at', read_only=True)
+    updated_at = serializers.DateTimeField(source='conversation.updated_at', read_only=True)
+    last_message = serializers.JSONField(source='last_message_preview', read_only=True)
+    
+    class Meta:
+        model = InboxEntry
+        fields = [
+            'id', 'participants', 'is_group', 'group_name', 'group_image',
+            'created_by', 'created_at', 'updated_at', 'last_message', 'unread_count',
+            'last_message_at'
+        ]
+        read_only_fields = fields
+
 class MessageCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Message
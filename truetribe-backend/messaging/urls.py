@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path('conversations/', views.ConversationListCreateView.as_view(), name='conversations'),
     path('conversations/<uuid:conversation_id>/messages/', views.MessageListCreateView.as_view(), name='messages'),
+    path('conversations/<uuid:conversation_id>/read/', views.mark_messages_read, name='mark-messages-read'),
 ]
\ No newline at end of file
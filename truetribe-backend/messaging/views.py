@@ -1,22 +1,33 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
-from .models import Conversation, Message, MessageRead, MessageReaction
-from .serializers import ConversationSerializer, MessageSerializer, MessageCreateSerializer
+from .models import Conversation, Message, MessageReaction, InboxEntry
+from .serializers import ConversationSerializer, InboxEntrySerializer, MessageSerializer, MessageCreateSerializer
+from utils.pagination import InboxPagination, MessageHistoryPagination
+from . import inbox
+from .membership import get_conversation_or_404, is_member
 
 User = get_user_model()
 
 class ConversationListCreateView(generics.ListCreateAPIView):
-    serializer_class = ConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = InboxPagination
+    
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return InboxEntrySerializer
+        return ConversationSerializer
     
     def get_queryset(self):
-        return Conversation.objects.filter(
-            participants=self.request.user
-        ).prefetch_related('participants', 'messages')
+        # Served from the per-user inbox projection, see messaging.inbox
+        return InboxEntry.objects.filter(
+            user=self.request.user
+        ).select_related('conversation').prefetch_related('conversation__participants')
     
     def perform_create(self, serializer):
         participant_id = self.request.data.get('participant')
@@ -29,35 +40,31 @@ class ConversationDetailView(generics.RetrieveAPIView):
     serializer_class = ConversationSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        return Conversation.objects.filter(participants=self.request.user)
+    def get_object(self):
+        conversation = get_conversation_or_404(self.kwargs['pk'], self.request.user)
+        self.check_object_permissions(self.request, conversation)
+        return conversation
 
 class MessageListCreateView(generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageHistoryPagination
     
     def get_queryset(self):
         conversation_id = self.kwargs['conversation_id']
-        conversation = get_object_or_404(
-            Conversation,
-            id=conversation_id,
-            participants=self.request.user
-        )
-        return Message.objects.filter(conversation=conversation).select_related('sender')
+        if not is_member(conversation_id, self.request.user):
+            raise Http404
+        return Message.objects.filter(conversation_id=conversation_id).select_related('sender')
     
     def perform_create(self, serializer):
         conversation_id = self.kwargs['conversation_id']
-        conversation = get_object_or_404(
-            Conversation,
-            id=conversation_id,
-            participants=self.request.user
-        )
+        conversation = get_conversation_or_404(conversation_id, self.request.user)
         message = serializer.save(
             conversation=conversation,
             sender=self.request.user
         )
-        conversation.updated_at = message.created_at
-        conversation.save()
+        Conversation.objects.filter(id=conversation.id).update(updated_at=message.created_at)
+        inbox.message_created(message)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -96,20 +103,10 @@ def create_conversation(request):
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def mark_messages_read(request, conversation_id):
-    conversation = get_object_or_404(
-        Conversation,
-        id=conversation_id,
-        participants=request.user
-    )
-    
-    unread_messages = Message.objects.filter(
-        conversation=conversation
-    ).exclude(sender=request.user).exclude(
-        read_by__user=request.user
-    )
+    conversation = get_conversation_or_404(conversation_id, request.user)
     
-    for message in unread_messages:
-        MessageRead.objects.get_or_create(message=message, user=request.user)
+    # Advances the user's read cursor; a single UPDATE regardless of backlog
+    inbox.conversation_read(conversation, request.user)
     
     return Response({'message': 'Messages marked as read'})
 
@@ -123,7 +120,7 @@ def react_to_message(request, message_id):
         return Response({'error': 'Invalid reaction type'}, status=status.HTTP_400_BAD_REQUEST)
     
     # Check if user is participant in conversation
-    if not message.conversation.participants.filter(id=request.user.id).exists():
+    if not is_member(message.conversation_id, request.user):
         return Response({'error': 'Not authorized'}, status=status.HTTP_403_FORBIDDEN)
     
     reaction, created = MessageReaction.objects.get_or_create(
@@ -147,7 +144,9 @@ def react_to_message(request, message_id):
 @permission_classes([permissions.IsAuthenticated])
 def delete_message(request, message_id):
     message = get_object_or_404(Message, id=message_id, sender=request.user)
-    message.delete()
+    with transaction.atomic():
+        inbox.message_deleted(message)
+        message.delete()
     return Response({'message': 'Message deleted'})
 
 @api_view(['PUT'])
@@ -165,6 +164,7 @@ def edit_message(request, message_id):
     message.content = content
     message.is_edited = True
     message.save()
+    inbox.message_edited(message)
     
     serializer = MessageSerializer(message, context={'request': request})
     return Response(serializer.data)
\ No newline at end of file
@@ -1,21 +1,26 @@
 from django.contrib import admin
 from .models import Notification
+from . import unread
 
 @admin.register(Notification)
 class NotificationAdmin(admin.ModelAdmin):
-    list_display = ['recipient', 'sender', 'notification_type', 'title', 'is_read', 'created_at']
+    list_display = ['recipient', 'sender', 'notification_type', 'title', 'actor_count', 'is_read', 'updated_at']
     list_filter = ['notification_type', 'is_read', 'created_at']
     search_fields = ['recipient__username', 'sender__username', 'title', 'message']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'updated_at']
     
     actions = ['mark_as_read', 'mark_as_unread', 'send_notification']
     
     def mark_as_read(self, request, queryset):
+        recipients = set(queryset.values_list('recipient', flat=True))
         queryset.update(is_read=True)
+        unread.reconcile(recipients)
         self.message_user(request, f"Marked {queryset.count()} notifications as read")
     
     def mark_as_unread(self, request, queryset):
+        recipients = set(queryset.values_list('recipient', flat=True))
         queryset.update(is_read=False)
+        unread.reconcile(recipients)
         self.message_user(request, f"Marked {queryset.count()} notifications as unread")
     
     def send_notification(self, request, queryset):
@@ -0,0 +1,117 @@
+from functools import partial
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from utils import fanout
+from .models import Notification
+from . import unread
+
+def group_key(notification_type, target=None):
+    # e.g. like:post:<id>; follows group per recipient only
+    if target is None:
+        return notification_type
+    kind, target_id = target
+    return f'{notification_type}:{kind}:{target_id}'
+
+def describe(actors, actor_count, verb):
+    if not actors:
+        return verb
+    if actor_count == 1:
+        return f"{actors[0]['username']} {verb}"
+    if actor_count == 2 and len(actors) > 1:
+        return f"{actors[0]['username']} and {actors[1]['username']} {verb}"
+    others = actor_count - 1
+    return f"{actors[0]['username']} and {others:,} other{'s' if others != 1 else ''} {verb}"
+
+def should_push(actor_count):
+    # Push every change up to 10 actors, then only at 20, 30 .. 100, 200 ..
+    if actor_count <= 10:
+        return True
+    step = 10 ** (len(str(actor_count)) - 1)
+    return actor_count % step == 0
+
+def notification_payload(notification):
+    return {
+        'type': 'notification',
+        'notification': {
+            'id': str(notification.id),
+            'title': notification.title,
+            'message': notification.message,
+            'type': notification.notification_type,
+            'sender': notification.sender.username if notification.sender else None,
+            'actors': notification.actors,
+            'actor_count': notification.actor_count,
+            'data': notification.data,
+            'created_at': notification.created_at.isoformat(),
+            'updated_at': notification.updated_at.isoformat()
+        }
+    }
+
+def push(notification):
+    from channels.layers import get_channel_layer
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        transaction.on_commit(partial(
+            fanout.group_send_json_sync,
+            channel_layer,
+            f'notifications_{notification.recipient_id}',
+            'notification_message',
+            notification_payload(notification)
+        ))
+
+def aggregate(recipient, sender, notification_type, title, verb, data, target=None):
+    """
+    Fold an event into the recipient's open notification for the same group.
+
+    An aggregate stays open while unread and updated within
+    NOTIFICATION_AGGREGATION_WINDOW. Repeat actors are recognised from the
+    actor sample only, so actor_count can overcount someone who drops out
+    of the sample and acts again.
+    """
+    key = group_key(notification_type, target)
+    actor = {'id': str(sender.id), 'username': sender.username}
+    now = timezone.now()
+    
+    with transaction.atomic():
+        notification = Notification.objects.select_for_update().filter(
+            recipient=recipient,
+            group_key=key,
+            is_read=False,
+            updated_at__gte=now - timedelta(seconds=settings.NOTIFICATION_AGGREGATION_WINDOW)
+        ).order_by('-updated_at').first()
+        
+        if notification is None:
+            notification = Notification.objects.create(
+                recipient=recipient,
+                sender=sender,
+                notification_type=notification_type,
+                title=title,
+                message=describe([actor], 1, verb),
+                data=data,
+                group_key=key,
+                actors=[actor],
+                actor_count=1,
+                updated_at=now
+            )
+            push(notification)
+            unread.increment(recipient.id)
+            return notification
+        
+        repeat = any(existing['id'] == actor['id'] for existing in notification.actors)
+        if not repeat:
+            notification.actor_count += 1
+        notification.actors = ([actor] + [
+            existing for existing in notification.actors if existing['id'] != actor['id']
+        ])[:settings.NOTIFICATION_ACTOR_SAMPLE_SIZE]
+        notification.sender = sender
+        notification.data = {**notification.data, **data}
+        notification.message = describe(notification.actors, notification.actor_count, verb)
+        notification.updated_at = now
+        notification.save(update_fields=[
+            'sender', 'data', 'message', 'actors', 'actor_count', 'updated_at'
+        ])
+    
+    if not repeat and should_push(notification.actor_count):
+        push(notification)
+    return notification
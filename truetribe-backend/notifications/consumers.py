@@ -2,6 +2,9 @@ import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
+from utils import fanout
+from users.presence import user_connected, user_disconnected
+from .unread import unread_count
 
 User = get_user_model()
 
@@ -11,23 +14,31 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         if self.user.is_authenticated:
             self.room_group_name = f'notifications_{self.user.id}'
             
-            await self.channel_layer.group_add(
+            await fanout.group_add(
+                self.channel_layer,
                 self.room_group_name,
                 self.channel_name
             )
             await self.accept()
+            await database_sync_to_async(user_connected)(self.user, self.channel_name)
+            
+            # Later changes are pushed, so clients do not need to poll unread-count/
+            await self.send(text_data=json.dumps({
+                'type': 'unread_count',
+                'unread_count': await database_sync_to_async(unread_count)(self.user.id)
+            }))
         else:
             await self.close()
     
     async def disconnect(self, close_code):
         if hasattr(self, 'room_group_name'):
-            await self.channel_layer.group_discard(
+            await fanout.group_discard(
+                self.channel_layer,
                 self.room_group_name,
                 self.channel_name
             )
+            await database_sync_to_async(user_disconnected)(self.user, self.channel_name)
     
     async def notification_message(self, event):
-        await self.send(text_data=json.dumps({
-            'type': 'notification',
-            'notification': event['notification']
-        }))
\ No newline at end of file
+        # Serialized once by the sender, see utils.fanout
+        await self.send(text_data=event['text'])
\ No newline at end of file
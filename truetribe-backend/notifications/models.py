@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 import uuid
 
 User = get_user_model()
@@ -25,7 +26,23 @@ class Notification(models.Model):
     message = models.TextField()
     data = models.JSONField(default=dict)  # Additional data like post_id, etc.
     is_read = models.BooleanField(default=False)
+    # Aggregation: events sharing a group_key collapse into one row, see notifications.aggregation
+    group_key = models.CharField(max_length=100, blank=True)
+    actor_count = models.PositiveIntegerField(default=1)
+    actors = models.JSONField(default=list)  # most recent actors first
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(default=timezone.now)
     
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['recipient', '-updated_at', '-id']),
+            models.Index(fields=['recipient', 'group_key', '-updated_at']),
+            models.Index(fields=['recipient'], condition=models.Q(is_read=False), name='notification_unread_idx'),
+        ]
+
+class UnreadNotificationCount(models.Model):
+    # Maintained unread counter, see notifications.unread
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_notification_count')
+    count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
\ No newline at end of file
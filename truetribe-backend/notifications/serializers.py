@@ -9,6 +9,6 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = [
             'id', 'sender', 'notification_type', 'title', 'message',
-            'data', 'is_read', 'created_at'
+            'data', 'actor_count', 'actors', 'is_read', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'actor_count', 'actors', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,6 @@
+from celery import shared_task
+from . import unread
+
+@shared_task
+def reconcile_unread_counts():
+    unread.reconcile()
@@ -1,3 +1,44 @@
-from django.test import TestCase
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from notifications import unread
+from notifications.aggregation import aggregate
+from notifications.models import Notification
 
-# Create your tests here.
+User = get_user_model()
+
+
+@override_settings(
+    CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    NOTIFICATION_COUNTER_BACKEND='database',
+)
+class AggregatePushTests(TestCase):
+    def setUp(self):
+        unread._store = None
+        self.addCleanup(setattr, unread, '_store', None)
+        self.recipient = User.objects.create_user(username='recipient', email='r@example.com', password='x')
+        self.sender = User.objects.create_user(username='sender', email='s@example.com', password='x')
+
+    def aggregate(self):
+        return aggregate(self.recipient, self.sender, 'follow', 'New follower', 'followed you', {})
+
+    @mock.patch('utils.fanout.group_send_json_sync')
+    def test_pushes_wait_for_commit(self, send):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.aggregate()
+                send.assert_not_called()
+            send.assert_not_called()
+        kinds = [call.args[3]['type'] for call in send.call_args_list]
+        self.assertEqual(sorted(kinds), ['notification', 'unread_count'])
+
+    @mock.patch('utils.fanout.group_send_json_sync')
+    def test_rollback_pushes_nothing(self, send):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.aggregate()
+                raise RuntimeError
+        self.assertEqual(callbacks, [])
+        send.assert_not_called()
+        self.assertFalse(Notification.objects.exists())
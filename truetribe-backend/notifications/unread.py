@@ -0,0 +1,157 @@
+from functools import partial
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Value
+from django.db.models.functions import Greatest
+from utils import fanout
+from utils.redis_client import get_redis
+from .models import Notification, UnreadNotificationCount
+
+REDIS_KEY = 'notifications:unread'
+
+def count_unread(user_id):
+    return Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+
+def unread_by_user(user_ids=None):
+    notifications = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        notifications = notifications.filter(recipient_id__in=user_ids)
+    return dict(notifications.values('recipient').annotate(
+        unread=Count('id')
+    ).values_list('recipient', 'unread'))
+
+class DatabaseUnreadStore:
+    transactional = True  # rolls back with the notification rows
+
+    def get(self, user_id):
+        row = UnreadNotificationCount.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+        if row is None:
+            row, _ = UnreadNotificationCount.objects.get_or_create(
+                user_id=user_id,
+                defaults={'count': count_unread(user_id)}
+            )
+            return row.count
+        return row
+
+    def add(self, user_id, delta):
+        # A missing row is seeded by get(), which already sees this change
+        UnreadNotificationCount.objects.filter(user_id=user_id).update(
+            count=Greatest(F('count') + delta, Value(0))
+        )
+        return self.get(user_id)
+
+    def reset(self, user_id):
+        UnreadNotificationCount.objects.update_or_create(user_id=user_id, defaults={'count': 0})
+        return 0
+
+    def reconcile(self, user_ids=None):
+        counts = unread_by_user(user_ids)
+        stale = UnreadNotificationCount.objects.exclude(user_id__in=counts).exclude(count=0)
+        if user_ids is not None:
+            stale = stale.filter(user_id__in=user_ids)
+        stale.update(count=0)
+        existing = {
+            row.user_id: row for row in UnreadNotificationCount.objects.filter(user_id__in=counts)
+        }
+        missing, changed = [], []
+        for user_id, unread in counts.items():
+            row = existing.get(user_id)
+            if row is None:
+                missing.append(UnreadNotificationCount(user_id=user_id, count=unread))
+            elif row.count != unread:
+                row.count = unread
+                changed.append(row)
+        UnreadNotificationCount.objects.bulk_update(changed, ['count'], batch_size=1000)
+        UnreadNotificationCount.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+
+class RedisUnreadStore:
+    # One hash field per user; missing fields are seeded from the table
+    transactional = False
+
+    def get(self, user_id):
+        client = get_redis()
+        value = client.hget(REDIS_KEY, str(user_id))
+        if value is None:
+            client.hsetnx(REDIS_KEY, str(user_id), count_unread(user_id))
+            value = client.hget(REDIS_KEY, str(user_id))
+        return int(value)
+
+    def add(self, user_id, delta):
+        client = get_redis()
+        if not client.hexists(REDIS_KEY, str(user_id)):
+            return self.get(user_id)
+        value = client.hincrby(REDIS_KEY, str(user_id), delta)
+        if value < 0:
+            client.hset(REDIS_KEY, str(user_id), 0)
+            return 0
+        return value
+
+    def reset(self, user_id):
+        get_redis().hset(REDIS_KEY, str(user_id), 0)
+        return 0
+
+    def reconcile(self, user_ids=None):
+        counts = unread_by_user(user_ids)
+        pipe = get_redis().pipeline()
+        if user_ids is None:
+            pipe.delete(REDIS_KEY)
+        elif user_ids:
+            pipe.hdel(REDIS_KEY, *[str(user_id) for user_id in user_ids])
+        if counts:
+            pipe.hset(REDIS_KEY, mapping={str(user_id): unread for user_id, unread in counts.items()})
+        pipe.execute()
+
+_store = None
+
+def get_unread_store():
+    global _store
+    if _store is None:
+        if settings.NOTIFICATION_COUNTER_BACKEND == 'redis':
+            _store = RedisUnreadStore()
+        else:
+            _store = DatabaseUnreadStore()
+    return _store
+
+def push(user_id, unread):
+    from channels.layers import get_channel_layer
+    channel_layer = get_channel_layer()
+    if channel_layer:
+        transaction.on_commit(partial(
+            fanout.group_send_json_sync,
+            channel_layer,
+            f'notifications_{user_id}',
+            'notification_message',
+            {'type': 'unread_count', 'unread_count': unread}
+        ))
+
+def unread_count(user_id):
+    return get_unread_store().get(user_id)
+
+def apply(user_id, operation, *args):
+    push(user_id, getattr(get_unread_store(), operation)(user_id, *args))
+
+def update(user_id, operation, *args):
+    if get_unread_store().transactional:
+        apply(user_id, operation, *args)
+    else:
+        # Redis is not rolled back with the notification, so count it once committed
+        transaction.on_commit(partial(apply, user_id, operation, *args))
+
+def increment(user_id):
+    update(user_id, 'add', 1)
+
+def decrement(user_id):
+    update(user_id, 'add', -1)
+
+def reset(user_id):
+    update(user_id, 'reset')
+
+def reconcile(user_ids=None):
+    # Recount everyone, or only the given users and push them their new count
+    if user_ids is None:
+        get_unread_store().reconcile()
+        return
+    user_ids = list(user_ids)
+    get_unread_store().reconcile(user_ids)
+    for user_id in user_ids:
+        push(user_id, unread_count(user_id))
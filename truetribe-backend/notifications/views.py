@@ -3,11 +3,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from .models import Notification
+from . import unread
 from .serializers import NotificationSerializer
+from utils.pagination import NotificationPagination
 
 class NotificationListView(generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
     
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user)
@@ -20,8 +23,8 @@ def mark_notification_read(request, notification_id):
         id=notification_id,
         recipient=request.user
     )
-    notification.is_read = True
-    notification.save()
+    if Notification.objects.filter(id=notification.id, is_read=False).update(is_read=True):
+        unread.decrement(request.user.id)
     return Response({'message': 'Notification marked as read'})
 
 @api_view(['POST'])
@@ -31,13 +34,10 @@ def mark_all_read(request):
         recipient=request.user,
         is_read=False
     ).update(is_read=True)
+    unread.reset(request.user.id)
     return Response({'message': 'All notifications marked as read'})
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def unread_count(request):
-    count = Notification.objects.filter(
-        recipient=request.user,
-        is_read=False
-    ).count()
-    return Response({'unread_count': count})
\ No newline at end of file
+    return Response({'unread_count': unread.unread_count(request.user.id)})
\ No newline at end of file
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from posts import timeline
+from posts.models import Post
+from users.models import Follow
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Backfill home timelines from existing posts and follow edges'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        backend = timeline.get_timeline_backend()
+        processed = 0
+        last_id = None
+        while True:
+            users = User.objects.order_by('id')
+            if last_id is not None:
+                users = users.filter(id__gt=last_id)
+            batch = list(users[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            for user in batch:
+                # Authors always see their own posts, even above the fan-out limit
+                backend.backfill(user.id, list(Post.objects.filter(
+                    author=user
+                ).order_by('-created_at')[:settings.FEED_BACKFILL_SIZE]))
+                for follow in Follow.objects.filter(follower=user).select_related('following'):
+                    timeline.backfill_author(user, follow.following)
+            processed += len(batch)
+            self.stdout.write(f'Rebuilt {processed} timelines')
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt timelines for {processed} users'))
@@ -1,17 +1,20 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Post, Comment, PostLike, CommentLike
+from .models import Post, Comment
 from users.serializers import UserSerializer
+from utils.viewer_context import ViewerContextListSerializer, ViewerContextMixin
 
 User = get_user_model()
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(ViewerContextMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
     replies_count = serializers.SerializerMethodField()
+    viewer_context_kind = 'comment'
     
     class Meta:
         model = Comment
+        list_serializer_class = ViewerContextListSerializer
         fields = [
             'id', 'author', 'content', 'likes_count', 'created_at', 
             'updated_at', 'is_liked', 'replies_count', 'parent'
@@ -19,24 +22,30 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'likes_count']
     
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return CommentLike.objects.filter(user=request.user, comment=obj).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_liked('comment', obj.id)
         return False
     
     def get_replies_count(self, obj):
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.get_replies_count('comment', obj.id)
         return obj.replies.count()
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(ViewerContextMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
     is_shared = serializers.SerializerMethodField()
     recent_comments = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
+    viewer_context_kind = 'post'
     
     class Meta:
         model = Post
+        list_serializer_class = ViewerContextListSerializer
         fields = [
-            'id', 'author', 'content', 'image', 'likes_count', 'comments_count',
+            'id', 'author', 'content', 'image', 'image_variants', 'likes_count', 'comments_count',
             'shares_count', 'is_pinned', 'created_at', 'updated_at',
             'is_liked', 'is_shared', 'recent_comments'
         ]
@@ -46,20 +55,27 @@ class PostSerializer(serializers.ModelSerializer):
         ]
     
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return PostLike.objects.filter(user=request.user, post=obj).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_liked('post', obj.id)
         return False
     
     def get_is_shared(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.shares.filter(user=request.user).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_shared('post', obj.id)
         return False
     
     def get_recent_comments(self, obj):
-        recent_comments = obj.comments.filter(parent=None)[:3]
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            recent_comments = viewer_context.get_recent_comments('post', obj.id)
+        else:
+            recent_comments = obj.comments.filter(parent=None)[:3]
         return CommentSerializer(recent_comments, many=True, context=self.context).data
+    
+    def get_image_variants(self, obj):
+        return self.media_variants_for(obj, 'image')
 
 class PostCreateSerializer(serializers.ModelSerializer):
     class Meta:
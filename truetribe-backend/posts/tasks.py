@@ -0,0 +1,6 @@
+from celery import shared_task
+from . import timeline
+
+@shared_task
+def trim_timelines():
+    timeline.trim_timelines()
@@ -0,0 +1,149 @@
+from django.conf import settings
+from django.db.models import F, Q, Count
+from users.models import Follow
+from utils.redis_client import get_redis
+from .models import Post, FeedEntry
+
+FANOUT_BATCH_SIZE = 1000
+
+def is_high_fanout_author(author):
+    # Authors above the limit are merged into feeds at read time instead of fanned out
+    return author.followers_count >= settings.FEED_FANOUT_FOLLOWER_LIMIT
+
+class DatabaseTimeline:
+    def add(self, user_ids, post):
+        entries = [
+            FeedEntry(user_id=user_id, post=post, author_id=post.author_id, created_at=post.created_at)
+            for user_id in user_ids
+        ]
+        FeedEntry.objects.bulk_create(entries, batch_size=FANOUT_BATCH_SIZE, ignore_conflicts=True)
+
+    def backfill(self, user_id, posts):
+        self.add_posts(user_id, posts)
+        self.trim(user_id)
+
+    def add_posts(self, user_id, posts):
+        entries = [
+            FeedEntry(user_id=user_id, post=post, author_id=post.author_id, created_at=post.created_at)
+            for post in posts
+        ]
+        FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+
+    def evict(self, user_id, author_id):
+        FeedEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+    def trim(self, user_id):
+        max_length = settings.FEED_MAX_LENGTH
+        cutoff = FeedEntry.objects.filter(user_id=user_id).order_by(
+            '-created_at'
+        ).values_list('created_at', flat=True)[max_length:max_length + 1]
+        cutoff = list(cutoff)
+        if cutoff:
+            FeedEntry.objects.filter(user_id=user_id, created_at__lte=cutoff[0]).delete()
+
+    def trim_all(self):
+        oversized = FeedEntry.objects.values('user').annotate(
+            entries=Count('id')
+        ).filter(entries__gt=settings.FEED_MAX_LENGTH).values_list('user', flat=True)
+        for user_id in oversized:
+            self.trim(user_id)
+
+    def queryset(self, user, merge_author_ids):
+        if merge_author_ids:
+            return Post.objects.filter(
+                Q(id__in=FeedEntry.objects.filter(user=user).values('post_id')) |
+                Q(author__in=merge_author_ids)
+            ).annotate(timeline_at=F('created_at'))
+        # Common case: a single range scan over the (user, created_at) index
+        return Post.objects.filter(feed_entries__user=user).annotate(
+            timeline_at=F('feed_entries__created_at')
+        )
+
+class RedisTimeline:
+    def key(self, user_id):
+        return f'timeline:{user_id}'
+
+    def add(self, user_ids, post):
+        client = get_redis()
+        score = post.created_at.timestamp()
+        pipe = client.pipeline(transaction=False)
+        for i, user_id in enumerate(user_ids, 1):
+            key = self.key(user_id)
+            pipe.zadd(key, {str(post.id): score})
+            pipe.zremrangebyrank(key, 0, -(settings.FEED_MAX_LENGTH + 1))
+            if i % FANOUT_BATCH_SIZE == 0:
+                pipe.execute()
+        pipe.execute()
+
+    def backfill(self, user_id, posts):
+        self.add_posts(user_id, posts)
+        self.trim(user_id)
+
+    def add_posts(self, user_id, posts):
+        mapping = {str(post.id): post.created_at.timestamp() for post in posts}
+        if mapping:
+            get_redis().zadd(self.key(user_id), mapping)
+
+    def evict(self, user_id, author_id):
+        post_ids = [
+            str(post_id) for post_id in Post.objects.filter(
+                author_id=author_id
+            ).values_list('id', flat=True)[:settings.FEED_MAX_LENGTH]
+        ]
+        if post_ids:
+            get_redis().zrem(self.key(user_id), *post_ids)
+
+    def trim(self, user_id):
+        get_redis().zremrangebyrank(self.key(user_id), 0, -(settings.FEED_MAX_LENGTH + 1))
+
+    def trim_all(self):
+        # Redis timelines are trimmed on every write
+        pass
+
+    def queryset(self, user, merge_author_ids):
+        post_ids = get_redis().zrevrange(self.key(user.id), 0, settings.FEED_MAX_LENGTH - 1)
+        condition = Q(id__in=post_ids)
+        if merge_author_ids:
+            condition |= Q(author__in=merge_author_ids)
+        return Post.objects.filter(condition).annotate(timeline_at=F('created_at'))
+
+def get_timeline_backend():
+    if settings.FEED_BACKEND == 'redis':
+        return RedisTimeline()
+    return DatabaseTimeline()
+
+def fan_out_post(post):
+    backend = get_timeline_backend()
+    # Authors always see their own posts
+    backend.add([post.author_id], post)
+    if is_high_fanout_author(post.author):
+        return
+
+    follower_ids = Follow.objects.filter(following_id=post.author_id).values_list('follower_id', flat=True)
+    batch = []
+    for follower_id in follower_ids.iterator(chunk_size=FANOUT_BATCH_SIZE):
+        batch.append(follower_id)
+        if len(batch) >= FANOUT_BATCH_SIZE:
+            backend.add(batch, post)
+            batch = []
+    if batch:
+        backend.add(batch, post)
+
+def backfill_author(user, author):
+    if is_high_fanout_author(author):
+        return
+    posts = Post.objects.filter(author=author).order_by('-created_at')[:settings.FEED_BACKFILL_SIZE]
+    get_timeline_backend().backfill(user.id, list(posts))
+
+def evict_author(user, author):
+    get_timeline_backend().evict(user.id, author.id)
+
+def trim_timelines():
+    get_timeline_backend().trim_all()
+
+def timeline_queryset(user):
+    merge_author_ids = list(Follow.objects.filter(
+        follower=user,
+        following__followers_count__gte=settings.FEED_FANOUT_FOLLOWER_LIMIT
+    ).values_list('following_id', flat=True))
+    return get_timeline_backend().queryset(user, merge_author_ids)
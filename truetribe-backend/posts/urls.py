@@ -4,6 +4,7 @@ from . import views
 urlpatterns = [
     path('', views.PostCreateView.as_view(), name='post-create'),
     path('feed/', views.PostListView.as_view(), name='post-feed'),
+    path('trending/', views.TrendingPostsView.as_view(), name='trending-posts'),
     path('stories/', views.StoriesView.as_view(), name='stories'),
     path('stories/<uuid:story_id>/view/', views.view_story, name='view-story'),
     path('<uuid:pk>/', views.PostDetailView.as_view(), name='post-detail'),
@@ -2,23 +2,29 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
 from .models import Post, Comment, PostLike, CommentLike, PostShare
 from .serializers import PostSerializer, PostCreateSerializer, CommentSerializer
-from users.models import Follow
+from .timeline import timeline_queryset
+from utils import counters
+from utils.pagination import KeysetPagination, TimelinePagination
+from utils.trending import trending_objects
 
 class PostListView(generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimelinePagination
     
     def get_queryset(self):
-        user = self.request.user
-        # Get posts from followed users and own posts
-        following_users = Follow.objects.filter(follower=user).values_list('following', flat=True)
-        queryset = Post.objects.filter(
-            Q(author__in=following_users) | Q(author=user)
-        ).select_related('author').prefetch_related('likes', 'comments')
-        return queryset
+        # Home timeline is materialized on write, see posts.timeline
+        return timeline_queryset(self.request.user).select_related('author')
+
+class TrendingPostsView(generics.ListAPIView):
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        # Ranked by decayed recent engagement, precomputed by snapshot_trending
+        return trending_objects(Post.objects.select_related('author'), 'post')
 
 class PostCreateView(generics.CreateAPIView):
     serializer_class = PostCreateSerializer
@@ -49,14 +55,11 @@ def like_post(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     like, created = PostLike.objects.get_or_create(user=request.user, post=post)
     
+    # likes_count is maintained by the PostLike signals
     if created:
-        post.likes_count += 1
-        post.save()
         return Response({'message': 'Post liked', 'liked': True})
     else:
         like.delete()
-        post.likes_count -= 1
-        post.save()
         return Response({'message': 'Post unliked', 'liked': False})
 
 @api_view(['POST'])
@@ -83,6 +86,7 @@ def view_story(request, story_id):
 class CommentListCreateView(generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         post_id = self.kwargs['post_id']
@@ -91,9 +95,8 @@ class CommentListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         post_id = self.kwargs['post_id']
         post = get_object_or_404(Post, id=post_id)
-        comment = serializer.save(author=self.request.user, post=post)
-        post.comments_count += 1
-        post.save()
+        # comments_count is maintained by the Comment signals
+        serializer.save(author=self.request.user, post=post)
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -102,13 +105,11 @@ def like_comment(request, comment_id):
     like, created = CommentLike.objects.get_or_create(user=request.user, comment=comment)
     
     if created:
-        comment.likes_count += 1
-        comment.save()
+        counters.increment(Comment, comment.id, 'likes_count')
         return Response({'message': 'Comment liked', 'liked': True})
     else:
         like.delete()
-        comment.likes_count -= 1
-        comment.save()
+        counters.decrement(Comment, comment.id, 'likes_count')
         return Response({'message': 'Comment unliked', 'liked': False})
 
 class CommentRepliesView(generics.ListCreateAPIView):
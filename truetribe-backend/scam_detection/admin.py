@@ -10,18 +10,13 @@ class ScamReportAdmin(admin.ModelAdmin):
     actions = ['verify_scam_reports', 'dismiss_scam_reports']
     
     def verify_scam_reports(self, request, queryset):
-        from trust_system.models import TrustScore, TrustAction
+        from trust_system.models import TrustAction
         
         for report in queryset:
             report.is_verified = True
             report.save()
             
-            # Penalize reported user's trust score
-            trust_score, created = TrustScore.objects.get_or_create(user=report.reported_user)
-            trust_score.penalty_score += 15.0
-            trust_score.calculate_final_score()
-            
-            # Record trust action
+            # Record trust action, which penalizes the reported user's trust score
             TrustAction.objects.create(
                 user=report.reported_user,
                 action_type='scam_detected',
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import SearchDocument
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ['target_type', 'target_id', 'author', 'title', 'is_public', 'created_at', 'updated_at']
+    list_filter = ['target_type', 'is_public']
+    search_fields = ['target_id', 'author__username', 'title']
+    readonly_fields = ['search_vector', 'updated_at']
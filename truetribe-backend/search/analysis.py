@@ -0,0 +1,61 @@
+import re
+from django.utils.html import escape
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+STOP_WORDS = frozenset('''
+a an and are as at be but by for from has have he her his i in is it its my
+of on or our she so that the their them they this to was we were what when
+which who will with you your
+'''.split())
+
+# Longest suffix first; a light stand-in for the Snowball stemmer Postgres uses
+SUFFIXES = ('ingly', 'edly', 'ings', 'ness', 'ing', 'ies', 'ied', 'es', 'ed', 'ly', 's')
+
+def stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            if suffix in ('ies', 'ied'):
+                word += 'y'
+            break
+    return word
+
+def analyze(text):
+    # Terms in document order, lower-cased, stop words dropped
+    terms = []
+    for match in WORD_RE.finditer(text.lower()):
+        word = match.group()
+        if word not in STOP_WORDS:
+            terms.append(stem(word))
+    return terms
+
+def highlight(text, terms, words=30):
+    """
+    Return an HTML-escaped snippet of text with query terms wrapped in <mark>.
+
+    The snippet starts a few words before the first match.
+    """
+    terms = set(terms)
+    tokens = list(WORD_RE.finditer(text))
+    if not tokens:
+        return escape(text[:200])
+    first = next((i for i, token in enumerate(tokens) if stem(token.group().lower()) in terms), 0)
+    start_token = max(first - 5, 0)
+    end_token = min(start_token + words, len(tokens)) - 1
+    # Keep leading and trailing punctuation when the snippet reaches either end
+    start = tokens[start_token].start() if start_token else 0
+    end = tokens[end_token].end() if end_token < len(tokens) - 1 else len(text)
+    
+    parts = ['…' if start > 0 else '']
+    position = start
+    for token in tokens[start_token:end_token + 1]:
+        parts.append(escape(text[position:token.start()]))
+        if stem(token.group().lower()) in terms:
+            parts.append(f'<mark>{escape(token.group())}</mark>')
+        else:
+            parts.append(escape(token.group()))
+        position = token.end()
+    parts.append(escape(text[position:end]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
@@ -0,0 +1,258 @@
+import math
+import threading
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import F, Q, Value
+from posts.models import Post, Comment
+from videos.models import Video
+from .analysis import analyze
+from .models import SearchDocument
+
+# BM25 parameters for the local index
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 2  # title terms count this many times towards term frequency
+
+# Model -> (target type, fields whose change requires reindexing)
+INDEXED_MODELS = {
+    Post: ('post', {'content'}),
+    Video: ('video', {'title', 'description', 'is_public'}),
+    Comment: ('comment', {'content'}),
+}
+
+def document_fields(instance):
+    if isinstance(instance, Video):
+        return {'title': instance.title, 'content': instance.description, 'is_public': instance.is_public}
+    return {'title': '', 'content': instance.content, 'is_public': True}
+
+class Segment:
+    def __init__(self):
+        self.postings = defaultdict(dict)  # term -> {doc_id: term frequency}
+        self.lengths = {}
+
+    def add(self, doc_id, frequencies, length):
+        for term, frequency in frequencies.items():
+            self.postings[term][doc_id] = frequency
+        self.lengths[doc_id] = length
+
+    def remove(self, doc_id, terms):
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.lengths.pop(doc_id, None)
+
+class LocalSearchIndex:
+    """
+    In-process BM25 index for SQLite and tests.
+
+    New documents go into a mutable buffer that is frozen into a segment once
+    it holds SEARCH_SEGMENT_SIZE documents. A document deleted or replaced
+    in a frozen segment leaves stale postings there, which are skipped until
+    segments are merged once there are more than SEARCH_MAX_SEGMENTS.
+
+    Every query first reads the SearchDocument rows written since the last
+    one, so documents saved by any process are searchable right away. Deleted
+    rows are noticed when they would be returned and are dropped then.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buffer = Segment()
+        self.segments = []
+        self.docs = {}  # doc_id -> (target_type, author_id, created_at, is_public, length, terms, segment)
+        self.versions = {}  # doc_id -> updated_at of the indexed row
+        self.watermark = None
+        self.total_length = 0
+
+    def refresh(self):
+        with self.lock:
+            rows = SearchDocument.objects.values_list(
+                'id', 'target_type', 'author_id', 'created_at', 'is_public', 'title', 'content', 'updated_at'
+            )
+            if self.watermark is not None:
+                # Overlap so rows committed slightly out of order are not skipped
+                rows = rows.filter(updated_at__gte=self.watermark - timedelta(seconds=settings.SEARCH_REFRESH_OVERLAP))
+            for *document, updated_at in rows.order_by('updated_at').iterator(chunk_size=2000):
+                if self.versions.get(document[0]) != updated_at:
+                    self._add(*document)
+                    self.versions[document[0]] = updated_at
+                self.watermark = updated_at
+
+    def _add(self, doc_id, target_type, author_id, created_at, is_public, title, content):
+        self._remove(doc_id)
+        title_terms, content_terms = analyze(title), analyze(content)
+        frequencies = Counter(content_terms)
+        for term in title_terms:
+            frequencies[term] += TITLE_BOOST
+        length = len(title_terms) + len(content_terms)
+        self.buffer.add(doc_id, frequencies, length)
+        self.docs[doc_id] = (target_type, author_id, created_at, is_public, length, set(frequencies), self.buffer)
+        self.total_length += length
+        if len(self.buffer.lengths) >= settings.SEARCH_SEGMENT_SIZE:
+            self.segments.append(self.buffer)
+            self.buffer = Segment()
+            if len(self.segments) > settings.SEARCH_MAX_SEGMENTS:
+                self._merge()
+
+    def _remove(self, doc_id):
+        self.versions.pop(doc_id, None)
+        doc = self.docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self.total_length -= doc[4]
+        if doc[6] is self.buffer:
+            self.buffer.remove(doc_id, doc[5])
+
+    def is_live(self, doc_id, segment):
+        doc = self.docs.get(doc_id)
+        return doc is not None and doc[6] is segment
+
+    def _merge(self):
+        merged = Segment()
+        for segment in self.segments:
+            for term, postings in segment.postings.items():
+                for doc_id, frequency in postings.items():
+                    if self.is_live(doc_id, segment):
+                        merged.postings[term][doc_id] = frequency
+            for doc_id, length in segment.lengths.items():
+                if self.is_live(doc_id, segment):
+                    merged.lengths[doc_id] = length
+        for doc_id in merged.lengths:
+            self.docs[doc_id] = self.docs[doc_id][:6] + (merged,)
+        self.segments = [merged]
+
+    def matches(self, doc, filters):
+        target_type, author_id, created_at, is_public = doc[:4]
+        if not is_public:
+            return False
+        if filters.get('types') and target_type not in filters['types']:
+            return False
+        if filters.get('author_id') and author_id != filters['author_id']:
+            return False
+        if filters.get('since') and created_at < filters['since']:
+            return False
+        if filters.get('until') and created_at >= filters['until']:
+            return False
+        return True
+
+    def search(self, query, terms, filters, after, limit):
+        self.refresh()
+        required = set(terms)
+        with self.lock:
+            total = len(self.docs)
+            if not total or not required:
+                return []
+            average_length = self.total_length / total or 1
+            scores = defaultdict(float)
+            matched = Counter()
+            for term in required:
+                postings = [
+                    (doc_id, frequency)
+                    for segment in self.segments + [self.buffer]
+                    for doc_id, frequency in segment.postings.get(term, {}).items()
+                    if self.is_live(doc_id, segment)
+                ]
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings:
+                    length = self.docs[doc_id][4]
+                    scores[doc_id] += idf * frequency * (K1 + 1) / (
+                        frequency + K1 * (1 - B + B * length / average_length)
+                    )
+                    matched[doc_id] += 1
+            # Every query term must match, as with websearch_to_tsquery
+            hits = [
+                (score, doc_id) for doc_id, score in scores.items()
+                if matched[doc_id] == len(required) and self.matches(self.docs[doc_id], filters)
+            ]
+        if after is not None:
+            score, doc_id = after
+            hits = [hit for hit in hits if hit[0] < score or (hit[0] == score and hit[1] > doc_id)]
+        hits.sort(key=lambda hit: (-hit[0], hit[1]))
+        while True:
+            page = hits[:limit]
+            existing = set(SearchDocument.objects.filter(
+                id__in=[doc_id for _, doc_id in page]
+            ).values_list('id', flat=True))
+            gone = {doc_id for _, doc_id in page if doc_id not in existing}
+            if not gone:
+                return [(doc_id, score) for score, doc_id in page]
+            # Deleted by some process since they were indexed
+            with self.lock:
+                for doc_id in gone:
+                    self._remove(doc_id)
+            hits = [hit for hit in hits if hit[1] not in gone]
+
+class PostgresSearchBackend:
+    # tsvector column with a GIN index added in search/0001
+    def update(self, doc_id):
+        config = settings.SEARCH_CONFIG
+        SearchDocument.objects.filter(pk=doc_id).update(
+            search_vector=SearchVector('title', weight='A', config=config) +
+            SearchVector('content', weight='B', config=config)
+        )
+
+    def search(self, query, terms, filters, after, limit):
+        ts_query = SearchQuery(query, search_type='websearch', config=settings.SEARCH_CONFIG)
+        documents = SearchDocument.objects.filter(search_vector=ts_query, is_public=True)
+        if filters.get('types'):
+            documents = documents.filter(target_type__in=filters['types'])
+        if filters.get('author_id'):
+            documents = documents.filter(author_id=filters['author_id'])
+        if filters.get('since'):
+            documents = documents.filter(created_at__gte=filters['since'])
+        if filters.get('until'):
+            documents = documents.filter(created_at__lt=filters['until'])
+        # Normalization 1 divides the rank by 1 + log(document length)
+        documents = documents.annotate(rank=SearchRank(F('search_vector'), ts_query, normalization=Value(1)))
+        if after is not None:
+            score, doc_id = after
+            documents = documents.filter(Q(rank__lt=score) | Q(rank=score, id__gt=doc_id))
+        return list(documents.order_by('-rank', 'id').values_list('id', 'rank')[:limit])
+
+_backend = None
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        backend = settings.SEARCH_BACKEND
+        if backend == 'auto':
+            backend = 'postgres' if connection.vendor == 'postgresql' else 'local'
+        _backend = PostgresSearchBackend() if backend == 'postgres' else LocalSearchIndex()
+    return _backend
+
+def index_object(instance, update_fields=None):
+    target_type, indexed_fields = INDEXED_MODELS[type(instance)]
+    if update_fields is not None and not set(update_fields) & indexed_fields:
+        return
+    fields = document_fields(instance)
+    document, _ = SearchDocument.objects.update_or_create(
+        target_type=target_type,
+        target_id=instance.id,
+        defaults={'author_id': instance.author_id, 'created_at': instance.created_at, **fields}
+    )
+    backend = get_search_backend()
+    # The local index picks the row up on its next query
+    if isinstance(backend, PostgresSearchBackend):
+        backend.update(document.id)
+
+def remove_object(instance):
+    target_type, _ = INDEXED_MODELS[type(instance)]
+    SearchDocument.objects.filter(target_type=target_type, target_id=instance.id).delete()
+
+def search(query, filters=None, after=None, limit=20):
+    """
+    Return ([(SearchDocument id, score)], analyzed query terms), best first.
+
+    after is the (score, id) of the last hit on the previous page.
+    """
+    terms = analyze(query)
+    if not terms:
+        return [], terms
+    hits = get_search_backend().search(query, terms, filters or {}, after, limit)
+    return hits, terms
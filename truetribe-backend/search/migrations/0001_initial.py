@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:46
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def index_existing_content(apps, schema_editor):
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    sources = [
+        ('post', apps.get_model('posts', 'Post'), lambda row: ('', row['content'], True), ['content']),
+        ('video', apps.get_model('videos', 'Video'), lambda row: (row['title'], row['description'], row['is_public']), ['title', 'description', 'is_public']),
+        ('comment', apps.get_model('posts', 'Comment'), lambda row: ('', row['content'], True), ['content']),
+    ]
+    for target_type, model, fields, columns in sources:
+        batch = []
+        for row in model.objects.values('id', 'author_id', 'created_at', *columns).iterator(chunk_size=2000):
+            title, content, is_public = fields(row)
+            batch.append(SearchDocument(
+                target_type=target_type,
+                target_id=row['id'],
+                author_id=row['author_id'],
+                title=title,
+                content=content,
+                is_public=is_public,
+                created_at=row['created_at']
+            ))
+            if len(batch) >= 2000:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+    
+    if schema_editor.connection.vendor == 'postgresql':
+        table = schema_editor.quote_name(SearchDocument._meta.db_table)
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = "
+            f"setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', content), 'B')"
+        )
+
+
+def create_vector_index(apps, schema_editor):
+    # GIN only exists on PostgreSQL; other databases use the in-process index in search.engine
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('search', 'SearchDocument')._meta.db_table)
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS search_document_vector_gin ON {table} USING gin (search_vector)')
+
+
+def drop_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS search_document_vector_gin')
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('posts', '0004_keyset_indexes'),
+        ('videos', '0002_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target_type', models.CharField(choices=[('post', 'Post'), ('video', 'Video'), ('comment', 'Comment')], max_length=20)),
+                ('target_id', models.UUIDField()),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('content', models.TextField(blank=True)),
+                ('is_public', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['target_type', '-created_at'], name='search_sear_target__6b4809_idx')],
+                'unique_together': {('target_type', 'target_id')},
+            },
+        ),
+        migrations.RunPython(create_vector_index, drop_vector_index),
+        migrations.RunPython(index_existing_content, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['updated_at'], name='search_sear_updated_bb8de9_idx'),
+        ),
+    ]
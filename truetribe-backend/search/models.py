@@ -0,0 +1,30 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
+
+User = get_user_model()
+
+class SearchDocument(models.Model):
+    # One row per searchable object, kept in step by search.engine
+    TARGET_TYPES = [
+        ('post', 'Post'),
+        ('video', 'Video'),
+        ('comment', 'Comment'),
+    ]
+    
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPES)
+    target_id = models.UUIDField()
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_documents')
+    title = models.CharField(max_length=200, blank=True)
+    content = models.TextField(blank=True)
+    is_public = models.BooleanField(default=True)
+    created_at = models.DateTimeField()  # of the indexed object
+    search_vector = SearchVectorField(null=True)  # PostgreSQL only
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('target_type', 'target_id')
+        indexes = [
+            models.Index(fields=['target_type', '-created_at']),
+            models.Index(fields=['updated_at']),  # incremental refresh of the local index
+        ]
@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime, time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from posts.models import Post, Comment
+from posts.serializers import PostSerializer, CommentSerializer
+from videos.models import Video
+from videos.serializers import VideoSerializer
+from . import engine
+from .analysis import highlight
+from .models import SearchDocument
+
+User = get_user_model()
+
+TARGETS = {
+    'post': (Post, PostSerializer),
+    'video': (Video, VideoSerializer),
+    'comment': (Comment, CommentSerializer),
+}
+
+def parse_when(value):
+    # Accepts a date or a datetime
+    when = parse_datetime(value) or parse_date(value)
+    if when is None:
+        raise ValueError(value)
+    if not isinstance(when, datetime):
+        when = datetime.combine(when, time.min)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+    return when
+
+def decode_cursor(encoded):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        return float(data['s']), int(data['id'])
+    except (TypeError, KeyError, ValueError, UnicodeDecodeError):
+        raise NotFound('Invalid cursor')
+
+def encode_cursor(score, doc_id):
+    data = json.dumps({'s': score, 'id': doc_id}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+def serialize_targets(documents, request):
+    # {(target type, target id): serialized object}, one query per type
+    wanted = {}
+    for document in documents:
+        wanted.setdefault(document.target_type, []).append(document.target_id)
+    serialized = {}
+    for target_type, ids in wanted.items():
+        model, serializer_class = TARGETS[target_type]
+        objects = list(model.objects.select_related('author').in_bulk(ids).values())
+        data = serializer_class(objects, many=True, context={'request': request}).data
+        for obj, item in zip(objects, data):
+            serialized[(target_type, obj.id)] = item
+    return serialized
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Query required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    filters = {}
+    types = [value for value in request.query_params.get('type', '').split(',') if value]
+    if any(value not in TARGETS for value in types):
+        return Response({'error': f"type must be one of {', '.join(TARGETS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    filters['types'] = set(types)
+    author = request.query_params.get('author')
+    if author:
+        filters['author_id'] = User.objects.filter(username=author).values_list('id', flat=True).first()
+        if filters['author_id'] is None:
+            return Response({'next': None, 'results': []})
+    try:
+        for param in ('since', 'until'):
+            if request.query_params.get(param):
+                filters[param] = parse_when(request.query_params[param])
+    except ValueError:
+        return Response({'error': 'since and until must be dates'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        page_size = min(int(request.query_params.get('page_size', settings.SEARCH_PAGE_SIZE)), settings.SEARCH_MAX_PAGE_SIZE)
+    except ValueError:
+        page_size = settings.SEARCH_PAGE_SIZE
+    cursor = request.query_params.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    
+    hits, terms = engine.search(query, filters, after, max(page_size, 1) + 1)
+    has_more = len(hits) > page_size
+    hits = hits[:page_size]
+    documents = SearchDocument.objects.in_bulk([doc_id for doc_id, _ in hits])
+    targets = serialize_targets(documents.values(), request)
+    
+    results = []
+    for doc_id, score in hits:
+        document = documents.get(doc_id)
+        target = document and targets.get((document.target_type, document.target_id))
+        if target is None:
+            # Deleted since it was indexed
+            continue
+        results.append({
+            'type': document.target_type,
+            'id': str(document.target_id),
+            'score': score,
+            'highlight': {
+                'title': highlight(document.title, terms) if document.title else '',
+                'content': highlight(document.content, terms, settings.SEARCH_SNIPPET_WORDS)
+            },
+            'object': target
+        })
+    
+    next_link = None
+    if has_more and hits:
+        next_link = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(*hits[-1][::-1]))
+    return Response({'next': next_link, 'results': results})
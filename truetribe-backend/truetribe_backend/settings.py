@@ -52,6 +52,8 @@ INSTALLED_APPS = [
     'live_streaming',
     'media_management',
     'admin_panel',
+    'search',
+    'hashtags',
     'utils',
     'user_accounts.apps.UserAccountsConfig',
 ]
@@ -154,6 +156,138 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-outbox': {
+        'task': 'utils.tasks.dispatch_outbox',
+        'schedule': 5.0,
+    },
+    'expire-upload-sessions': {
+        'task': 'videos.tasks.expire_upload_sessions',
+        'schedule': 3600.0,
+    },
+    'flush-counters': {
+        'task': 'utils.tasks.flush_counters',
+        'schedule': 5.0,
+    },
+    'flush-video-views': {
+        'task': 'videos.tasks.flush_video_views',
+        'schedule': 10.0,
+    },
+    'prune-viewer-sketches': {
+        'task': 'utils.tasks.prune_viewer_sketches',
+        'schedule': 86400.0,
+    },
+    'purge-outbox': {
+        'task': 'utils.tasks.purge_outbox',
+        'schedule': 3600.0,
+    },
+    'reconcile-unread-notifications': {
+        'task': 'notifications.tasks.reconcile_unread_counts',
+        'schedule': 3600.0,
+    },
+    'snapshot-trending': {
+        'task': 'utils.tasks.snapshot_trending',
+        'schedule': 300.0,
+    },
+    'trim-timelines': {
+        'task': 'posts.tasks.trim_timelines',
+        'schedule': 300.0,
+    },
+}
+
+# Event outbox Configuration
+OUTBOX_DISPATCH = config('OUTBOX_DISPATCH', default='local')  # 'celery', 'local' or 'sync'
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=5, cast=int)  # seconds
+OUTBOX_LEASE_TIMEOUT = config('OUTBOX_LEASE_TIMEOUT', default=300, cast=int)  # seconds before a claimed event is retried
+OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=7, cast=int)  # processed events older than this are deleted
+OUTBOX_PURGE_BATCH_SIZE = 1000
+
+# Trust score Configuration
+TRUST_SCORE_COALESCE_WINDOW = config('TRUST_SCORE_COALESCE_WINDOW', default=2, cast=float)  # seconds, 0 applies every action
+TRUST_SCORE_DECIMALS = 1  # precision of the denormalized User.trust_score
+LEADERBOARD_BACKEND = config('LEADERBOARD_BACKEND', default='redis')  # 'redis', or 'database' for development (rank is a COUNT)
+LEADERBOARD_MIN_SCORE = 80.0
+
+# Real-time fan-out Configuration
+# Sub-groups per group kind ('chat_<id>', 'live_<id>', ...); unlisted kinds are not split
+FANOUT_GROUP_SHARDS = {
+    'chat': 4,
+    'live': 16,
+}
+
+# User search Configuration
+USER_SEARCH_BACKEND = config('USER_SEARCH_BACKEND', default='auto')  # 'auto', 'postgres' or 'database'
+USER_SEARCH_LIMIT = 20
+USER_SEARCH_MAX_LIMIT = 50
+USER_SEARCH_CANDIDATES = 500  # matches ranked per query
+USER_SEARCH_MIN_FUZZY_LENGTH = 3  # shorter queries only match prefixes
+
+# Content search Configuration
+SEARCH_BACKEND = config('SEARCH_BACKEND', default='auto')  # 'auto', 'postgres' or 'local'
+SEARCH_CONFIG = 'english'  # PostgreSQL text search configuration
+SEARCH_SEGMENT_SIZE = 1000  # documents per local index segment
+SEARCH_MAX_SEGMENTS = 8  # local segments are merged beyond this
+SEARCH_REFRESH_OVERLAP = 60  # seconds re-read on each local refresh, covers late commits
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 50
+SEARCH_SNIPPET_WORDS = 30
+
+# Notification aggregation Configuration
+NOTIFICATION_AGGREGATION_WINDOW = 6 * 3600  # seconds an unread aggregate keeps absorbing new events
+NOTIFICATION_ACTOR_SAMPLE_SIZE = 3  # actors kept for "X, Y and N others"
+NOTIFICATION_COUNTER_BACKEND = config('NOTIFICATION_COUNTER_BACKEND', default='database')  # 'database' or 'redis'
+
+# Live stream room Configuration
+LIVE_ROOM_BACKEND = config('LIVE_ROOM_BACKEND', default='redis')  # 'redis', or 'local' for a single worker
+LIVE_CHAT_BUFFER_SIZE = 50  # recent chat messages replayed to new viewers
+LIVE_CHAT_RATE_LIMIT = 5  # chat messages per user per window
+LIVE_CHAT_RATE_WINDOW = 10  # seconds
+LIVE_CHECKPOINT_INTERVAL = 15  # seconds between viewer count writes to LiveStream
+
+# Presence Configuration
+PRESENCE_BACKEND = config('PRESENCE_BACKEND', default='local')  # 'local' or 'redis'
+PRESENCE_LAST_SEEN_INTERVAL = 60  # seconds between User.last_active writes per user
+PRESENCE_TTL = 3600  # seconds a Redis connection set outlives a crashed worker
+TYPING_TIMEOUT = 5.0  # seconds a typing frame keeps the indicator on
+TYPING_BROADCAST_INTERVAL = 1.0  # at most one typing update per conversation per interval
+
+# Chat ingest Configuration
+CHAT_INGEST_BATCH_WINDOW = 0.005  # seconds to gather inbound WebSocket messages into one write
+CHAT_INGEST_MAX_BATCH = 200
+
+# Conversation membership cache Configuration
+MEMBERSHIP_BACKEND = config('MEMBERSHIP_BACKEND', default='redis')  # 'redis', or 'local' to read the participants table on every check (development only)
+MEMBERSHIP_CACHE_TTL = config('MEMBERSHIP_CACHE_TTL', default=10, cast=int)  # seconds, in-process tier of the redis backend
+MEMBERSHIP_REDIS_TTL = 86400
+
+# Trending Configuration
+TRENDING_BACKEND = config('TRENDING_BACKEND', default='database')  # 'database' or 'redis'
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=6, cast=float)
+TRENDING_WINDOW_HOURS = 48  # hourly buckets older than this no longer count
+TRENDING_TOP_K = 100
+
+# Engagement counter Configuration
+COUNTER_BACKEND = config('COUNTER_BACKEND', default='direct')  # 'direct', 'local' or 'redis'
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=5, cast=int)  # seconds
+COUNTER_FLUSH_LOCK_TIMEOUT = 60  # seconds before a stuck redis flush lets another take over
+
+# Video view counting Configuration
+VIDEO_VIEW_BACKEND = config('VIDEO_VIEW_BACKEND', default='redis')  # 'redis', or 'local' for development only
+VIDEO_VIEW_DEDUP_WINDOW = config('VIDEO_VIEW_DEDUP_WINDOW', default=1800, cast=int)  # seconds
+VIDEO_VIEW_FLUSH_INTERVAL = config('VIDEO_VIEW_FLUSH_INTERVAL', default=10, cast=int)  # seconds
+VIDEO_VIEW_FLUSH_LOCK_TIMEOUT = 60  # seconds a flush may run between batches before another can take over
+
+# Unique viewer (HyperLogLog) Configuration
+UNIQUE_VIEWER_BACKEND = config('UNIQUE_VIEWER_BACKEND', default='database')  # 'database' or 'redis'
+UNIQUE_VIEWER_RETENTION_DAYS = config('UNIQUE_VIEWER_RETENTION_DAYS', default=90, cast=int)
+
+# Home timeline Configuration
+FEED_BACKEND = config('FEED_BACKEND', default='database')  # 'database' or 'redis'
+FEED_MAX_LENGTH = config('FEED_MAX_LENGTH', default=800, cast=int)
+FEED_BACKFILL_SIZE = config('FEED_BACKFILL_SIZE', default=50, cast=int)
+FEED_FANOUT_FOLLOWER_LIMIT = config('FEED_FANOUT_FOLLOWER_LIMIT', default=10000, cast=int)
 
 
 # Password validation
@@ -203,6 +337,20 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Resumable video uploads, see videos.uploads. Must share a filesystem with
+# MEDIA_ROOT so finished uploads are moved rather than copied
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default=str(BASE_DIR / 'upload_sessions'))
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+UPLOAD_SESSION_TTL = 24 * 3600  # seconds before an idle upload is discarded
+VIDEO_UPLOAD_MAX_SIZE = config('VIDEO_UPLOAD_MAX_SIZE', default=10 * 1024 ** 3, cast=int)  # 10GB
+
+# Resized image variants, see media_management.derivatives
+MEDIA_VARIANT_DISPATCH = config('MEDIA_VARIANT_DISPATCH', default='celery')  # 'celery', 'local' or 'sync'
+MEDIA_VARIANT_WORKERS = config('MEDIA_VARIANT_WORKERS', default=2, cast=int)  # local resize threads
+MEDIA_VARIANT_SIZES = {'thumb': 150, 'feed': 640, 'full': 1440}  # longest edge in pixels
+MEDIA_VARIANT_FORMAT = config('MEDIA_VARIANT_FORMAT', default='webp')  # 'webp' or 'jpeg'
+MEDIA_VARIANT_QUALITY = 80
+
 # Content type settings for file uploads
 FILE_UPLOAD_HANDLERS = [
     'django.core.files.uploadhandler.MemoryFileUploadHandler',
@@ -39,6 +39,8 @@ def api_root(request):
             'trust': '/api/v1/trust/',
             'verification': '/api/v1/verification/',
             'live': '/api/v1/live/',
+            'search': '/api/v1/search/',
+            'hashtags': '/api/v1/hashtags/',
         }
     })
 
@@ -54,6 +56,8 @@ urlpatterns = [
     path('api/v1/trust/', include('trust_system.urls')),
     path('api/v1/verification/', include('verification.urls')),
     path('api/v1/live/', include('live_streaming.urls')),
+    path('api/v1/search/', include('search.urls')),
+    path('api/v1/hashtags/', include('hashtags.urls')),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 ]
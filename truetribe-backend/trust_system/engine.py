@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+from .models import TrustScore
+from . import leaderboard
+
+User = get_user_model()
+
+ACTION_COMPONENTS = {
+    'post_like': 'activity_score',
+    'post_share': 'activity_score',
+    'comment': 'activity_score',
+    'follow': 'activity_score',
+    'verification': 'verification_bonus',
+    'report_resolved': 'community_score',
+    'report_false': 'penalty_score',
+    'spam_detected': 'penalty_score',
+    'scam_detected': 'penalty_score',
+}
+
+BONUS_COMPONENTS = ['verification_bonus', 'activity_score', 'community_score']
+
+def action_delta(action_type, score_change):
+    component = ACTION_COMPONENTS.get(action_type)
+    if component == 'penalty_score':
+        return component, abs(score_change)
+    return component, score_change
+
+def score_updates(components):
+    # Postgres and SQLite evaluate SET expressions against the old row, so the
+    # final score has to include the deltas explicitly
+    final_score = F('base_score')
+    for component in BONUS_COMPONENTS:
+        final_score = final_score + F(component)
+        if component in components:
+            final_score = final_score + components[component]
+    final_score = final_score - F('penalty_score')
+    if 'penalty_score' in components:
+        final_score = final_score - components['penalty_score']
+    updates = {component: F(component) + amount for component, amount in components.items()}
+    updates['final_score'] = Least(Greatest(final_score, Value(0.0)), Value(100.0))
+    updates['last_calculated'] = timezone.now()
+    return updates
+
+def sync_user_score(user_id, final_score):
+    # Only rewrite the denormalized column when the displayed value moves
+    score = round(final_score, settings.TRUST_SCORE_DECIMALS)
+    updated = User.objects.filter(id=user_id).exclude(trust_score=score).update(trust_score=score)
+    if updated:
+        leaderboard.update_scores({user_id: score})
+    return updated
+
+def apply_deltas(deltas):
+    """
+    Apply {user_id: {component: amount}} with one UPDATE per TrustScore row.
+    """
+    for user_id, components in deltas.items():
+        components = {component: amount for component, amount in components.items() if amount}
+        if not components:
+            continue
+        with transaction.atomic():
+            scores = TrustScore.objects.filter(user_id=user_id)
+            if not scores.update(**score_updates(components)):
+                TrustScore.objects.get_or_create(user_id=user_id)
+                scores.update(**score_updates(components))
+            final_score = scores.values_list('final_score', flat=True).get()
+            sync_user_score(user_id, final_score)
+
+class TrustScoreEngine:
+    """
+    Applies trust score deltas, coalescing bursts per user.
+
+    The first action for a user is applied straight away and opens a window;
+    further actions inside the window are summed and applied once it closes.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = defaultdict(lambda: defaultdict(float))
+        self.windows = {}
+        self.timer = None
+
+    def add(self, user_id, component, amount):
+        window = settings.TRUST_SCORE_COALESCE_WINDOW
+        if window <= 0:
+            apply_deltas({user_id: {component: amount}})
+            return
+        now = time.monotonic()
+        with self.lock:
+            opened = self.windows.get(user_id)
+            if opened is not None and now - opened < window:
+                self.pending[user_id][component] += amount
+                if self.timer is None:
+                    self.timer = threading.Timer(window, self.flush_in_background)
+                    self.timer.daemon = True
+                    self.timer.start()
+                return
+            self.windows[user_id] = now
+        apply_deltas({user_id: {component: amount}})
+
+    def flush(self):
+        now = time.monotonic()
+        window = settings.TRUST_SCORE_COALESCE_WINDOW
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            pending, self.pending = self.pending, defaultdict(lambda: defaultdict(float))
+            self.windows = {user_id: opened for user_id, opened in self.windows.items() if now - opened < window}
+        apply_deltas(pending)
+
+    def flush_in_background(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = TrustScoreEngine()
+    return _engine
+
+def adjust(user, component, amount):
+    user_id = getattr(user, 'id', user)
+    get_engine().add(user_id, component, amount)
+
+def record_action(action):
+    component, amount = action_delta(action.action_type, action.score_change)
+    if component:
+        get_engine().add(action.user_id, component, amount)
+
+def flush():
+    get_engine().flush()
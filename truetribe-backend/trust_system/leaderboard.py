@@ -0,0 +1,142 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from utils.redis_client import get_redis
+
+User = get_user_model()
+
+REDIS_KEY = 'leaderboard:trust'
+REDIS_REBUILD_KEY = 'leaderboard:trust:rebuild'
+REBUILD_BATCH_SIZE = 5000
+
+class DatabaseLeaderboard:
+    # Reads straight from User.trust_score through the (trust_score, id) index.
+    # Pages are index scans, but rank() counts every user ahead, so this is
+    # meant for development; production uses the Redis sorted set
+    ordering = ('-trust_score', 'id')
+
+    def update(self, scores):
+        pass
+
+    def remove(self, user_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def page(self, offset, limit):
+        return list(User.objects.order_by(*self.ordering).values_list('id', 'trust_score')[offset:offset + limit])
+
+    def rank(self, user_id, score):
+        ahead = User.objects.filter(Q(trust_score__gt=score) | Q(trust_score=score, id__lt=user_id))
+        return ahead.count() + 1
+
+    def around(self, user_id, score, radius):
+        above = list(User.objects.filter(
+            Q(trust_score__gt=score) | Q(trust_score=score, id__lt=user_id)
+        ).order_by('trust_score', '-id').values_list('id', 'trust_score')[:radius])
+        below = list(User.objects.filter(
+            Q(trust_score__lt=score) | Q(trust_score=score, id__gt=user_id)
+        ).order_by(*self.ordering).values_list('id', 'trust_score')[:radius])
+        return above[::-1] + [(user_id, score)] + below
+
+class RedisLeaderboard:
+    # Sorted set keyed by user id, kept in step by the trust score engine
+    def update(self, scores):
+        if scores:
+            get_redis().zadd(REDIS_KEY, {str(user_id): score for user_id, score in scores.items()})
+
+    def remove(self, user_id):
+        get_redis().zrem(REDIS_KEY, str(user_id))
+
+    def rebuild(self):
+        # Built aside and swapped in, so readers never see a partial board
+        client = get_redis()
+        client.delete(REDIS_REBUILD_KEY)
+        batch = {}
+        for user_id, score in User.objects.values_list('id', 'trust_score').iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch[str(user_id)] = score
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                client.zadd(REDIS_REBUILD_KEY, batch)
+                batch = {}
+        if batch:
+            client.zadd(REDIS_REBUILD_KEY, batch)
+        if client.exists(REDIS_REBUILD_KEY):
+            client.rename(REDIS_REBUILD_KEY, REDIS_KEY)
+
+    def page(self, offset, limit):
+        client = get_redis()
+        rows = client.zrevrange(REDIS_KEY, offset, offset + limit - 1, withscores=True)
+        if not rows and not client.exists(REDIS_KEY):
+            # First use, or Redis lost the set
+            self.rebuild()
+            rows = client.zrevrange(REDIS_KEY, offset, offset + limit - 1, withscores=True)
+        return rows
+
+    def rank(self, user_id, score):
+        client = get_redis()
+        rank = client.zrevrank(REDIS_KEY, str(user_id))
+        if rank is None:
+            # Users who have not changed score since the last rebuild
+            client.zadd(REDIS_KEY, {str(user_id): score})
+            rank = client.zrevrank(REDIS_KEY, str(user_id))
+        return rank + 1
+
+    def around(self, user_id, score, radius):
+        rank = self.rank(user_id, score) - 1
+        start = max(rank - radius, 0)
+        return get_redis().zrevrange(REDIS_KEY, start, rank + radius, withscores=True)
+
+_backend = None
+
+def get_leaderboard():
+    global _backend
+    if _backend is None:
+        if settings.LEADERBOARD_BACKEND == 'redis':
+            _backend = RedisLeaderboard()
+        else:
+            _backend = DatabaseLeaderboard()
+    return _backend
+
+def update_scores(scores):
+    get_leaderboard().update(scores)
+
+def remove_user(user_id):
+    get_leaderboard().remove(user_id)
+
+def rebuild():
+    get_leaderboard().rebuild()
+
+def build_entries(rows, first_rank):
+    # rows: ordered (user_id, score) pairs starting at first_rank
+    users = User.objects.only(
+        'id', 'username', 'is_verified', 'profile_picture'
+    ).in_bulk([user_id for user_id, _ in rows])
+    users = {str(user_id): user for user_id, user in users.items()}
+    entries = []
+    for rank, (user_id, score) in enumerate(rows, first_rank):
+        user = users.get(str(user_id))
+        if user is None:
+            continue
+        entries.append({
+            'rank': rank,
+            'username': user.username,
+            'trust_score': score,
+            'is_verified': user.is_verified,
+            'profile_picture': user.profile_picture.url if user.profile_picture else None
+        })
+    return entries
+
+def top(offset=0, limit=50):
+    return build_entries(get_leaderboard().page(offset, limit), offset + 1)
+
+def user_rank(user):
+    return get_leaderboard().rank(user.id, user.trust_score)
+
+def around_user(user, radius=5):
+    board = get_leaderboard()
+    rank = board.rank(user.id, user.trust_score)
+    rows = board.around(user.id, user.trust_score, radius)
+    ids = [str(user_id) for user_id, _ in rows]
+    position = ids.index(str(user.id)) if str(user.id) in ids else 0
+    return rank, build_entries(rows, rank - position)
@@ -0,0 +1,130 @@
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Abs
+from django.utils import timezone
+from trust_system import leaderboard
+from trust_system.engine import ACTION_COMPONENTS
+from trust_system.models import TrustScore, TrustAction, TrustBadge
+
+User = get_user_model()
+
+COMPONENTS = ['verification_bonus', 'activity_score', 'community_score', 'penalty_score']
+VERIFIED_BADGE_BONUS = 5.0
+COMMUNITY_BADGE_BONUS = 10.0
+
+def actions_for(component):
+    return [action for action, target in ACTION_COMPONENTS.items() if target == component]
+
+class Command(BaseCommand):
+    help = 'Rebuild every TrustScore from the TrustAction ledger and active badges'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--dry-run', action='store_true', help='Compute scores without writing them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if not dry_run:
+            self.create_missing_scores(batch_size)
+
+        processed = changed_users = 0
+        last_user_id = None
+        while True:
+            scores = TrustScore.objects.select_related('user').only(
+                'id', 'user_id', 'base_score', 'final_score', 'user__id', 'user__trust_score'
+            ).order_by('user_id')
+            if last_user_id is not None:
+                scores = scores.filter(user_id__gt=last_user_id)
+            batch = list(scores[:batch_size])
+            if not batch:
+                break
+            last_user_id = batch[-1].user_id
+            changed_users += self.recompute_batch(batch, dry_run)
+            processed += len(batch)
+            self.stdout.write(f'Recomputed {processed} trust scores')
+
+        if not dry_run:
+            leaderboard.rebuild()
+
+        verb = 'Would update' if dry_run else 'Updated'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {processed} trust scores, {changed_users} user scores changed'
+        ))
+
+    def create_missing_scores(self, batch_size):
+        missing = User.objects.filter(trust_score_detail__isnull=True).values_list('id', flat=True)
+        TrustScore.objects.bulk_create(
+            (TrustScore(user_id=user_id) for user_id in missing.iterator(chunk_size=batch_size)),
+            batch_size=batch_size,
+            ignore_conflicts=True
+        )
+
+    def aggregate_components(self, user_ids):
+        # One grouped query for the action ledger and one for badges per batch
+        index = {user_id: i for i, user_id in enumerate(user_ids)}
+        components = np.zeros((len(COMPONENTS), len(user_ids)))
+
+        action_totals = {
+            component: Sum('score_change', filter=Q(action_type__in=actions_for(component)))
+            for component in COMPONENTS if component != 'penalty_score'
+        }
+        action_totals['penalty_score'] = Sum(
+            Abs('score_change'), filter=Q(action_type__in=actions_for('penalty_score'))
+        )
+        rows = TrustAction.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+            **action_totals
+        ).order_by()
+        for row in rows:
+            column = index[row['user_id']]
+            for i, component in enumerate(COMPONENTS):
+                components[i, column] = row[component] or 0.0
+
+        badges = TrustBadge.objects.filter(user_id__in=user_ids, is_active=True).values('user_id').annotate(
+            verified=Count('id', filter=Q(badge_type__startswith='verified_')),
+            community=Count('id', filter=~Q(badge_type__startswith='verified_'))
+        ).order_by()
+        for row in badges:
+            column = index[row['user_id']]
+            components[0, column] += row['verified'] * VERIFIED_BADGE_BONUS
+            components[2, column] += row['community'] * COMMUNITY_BADGE_BONUS
+
+        return components
+
+    def recompute_batch(self, batch, dry_run):
+        user_ids = [score.user_id for score in batch]
+        components = self.aggregate_components(user_ids)
+        base = np.fromiter((score.base_score for score in batch), dtype=float, count=len(batch))
+        verification, activity, community, penalty = components
+        final = np.clip(base + verification + activity + community - penalty, 0.0, 100.0)
+
+        displayed = np.round(final, settings.TRUST_SCORE_DECIMALS)
+        current = np.fromiter((score.user.trust_score for score in batch), dtype=float, count=len(batch))
+        changed = np.flatnonzero(displayed != current)
+        if dry_run:
+            return len(changed)
+
+        now = timezone.now()
+        for i, score in enumerate(batch):
+            score.verification_bonus = float(verification[i])
+            score.activity_score = float(activity[i])
+            score.community_score = float(community[i])
+            score.penalty_score = float(penalty[i])
+            score.final_score = float(final[i])
+            score.last_calculated = now
+
+        users = []
+        for i in changed:
+            user = batch[i].user
+            user.trust_score = float(displayed[i])
+            users.append(user)
+
+        with transaction.atomic():
+            TrustScore.objects.bulk_update(batch, COMPONENTS + ['final_score', 'last_calculated'])
+            User.objects.bulk_update(users, ['trust_score'])
+        return len(users)
@@ -23,9 +23,9 @@ class TrustScore(models.Model):
         ))
         self.save()
         
-        # Update user's trust_score field
-        self.user.trust_score = self.final_score
-        self.user.save()
+        # Update user's trust_score field without rewriting its counters
+        from .engine import sync_user_score
+        sync_user_score(self.user_id, self.final_score)
 
 class TrustAction(models.Model):
     ACTION_TYPES = [
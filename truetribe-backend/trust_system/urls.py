@@ -6,4 +6,6 @@ urlpatterns = [
     path('score/<str:user_id>/', views.UserTrustScoreView.as_view(), name='user-trust-score-detail'),
     path('report-scam/', views.ReportScamView.as_view(), name='report-scam'),
     path('fact-check/<uuid:post_id>/', views.fact_check_post, name='fact-check'),
+    path('leaderboard/', views.trust_leaderboard, name='trust-leaderboard'),
+    path('leaderboard/me/', views.my_leaderboard_rank, name='trust-leaderboard-me'),
 ]
\ No newline at end of file
@@ -1,9 +1,11 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
 from .models import TrustScore, TrustAction, UserReport, TrustBadge
+from . import engine, leaderboard
 from .serializers import (
     TrustScoreSerializer, TrustActionSerializer, UserReportSerializer,
     UserReportCreateSerializer, TrustBadgeSerializer
@@ -52,7 +54,7 @@ def record_trust_action(request):
     if not action_type:
         return Response({'error': 'Action type required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Create trust action
+    # Create trust action; the post_save signal applies it to the trust score
     trust_action = TrustAction.objects.create(
         user=request.user,
         action_type=action_type,
@@ -60,20 +62,6 @@ def record_trust_action(request):
         description=description
     )
     
-    # Update user's trust score
-    trust_score, created = TrustScore.objects.get_or_create(user=request.user)
-    
-    if action_type in ['post_like', 'post_share', 'comment', 'follow']:
-        trust_score.activity_score += score_change
-    elif action_type == 'verification':
-        trust_score.verification_bonus += score_change
-    elif action_type in ['report_resolved']:
-        trust_score.community_score += score_change
-    elif action_type in ['spam_detected', 'scam_detected', 'report_false']:
-        trust_score.penalty_score += abs(score_change)
-    
-    trust_score.calculate_final_score()
-    
     serializer = TrustActionSerializer(trust_action)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -126,12 +114,10 @@ def award_badge(request, username):
     
     if created:
         # Award trust score bonus for badge
-        trust_score, _ = TrustScore.objects.get_or_create(user=user)
         if badge_type.startswith('verified_'):
-            trust_score.verification_bonus += 5.0
+            engine.adjust(user, 'verification_bonus', 5.0)
         else:
-            trust_score.community_score += 10.0
-        trust_score.calculate_final_score()
+            engine.adjust(user, 'community_score', 10.0)
         
         return Response({'message': 'Badge awarded successfully'})
     else:
@@ -140,18 +126,29 @@ def award_badge(request, username):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def trust_leaderboard(request):
-    top_users = User.objects.filter(
-        trust_score__gte=80.0
-    ).order_by('-trust_score')[:50]
-    
-    leaderboard = []
-    for i, user in enumerate(top_users, 1):
-        leaderboard.append({
-            'rank': i,
-            'username': user.username,
-            'trust_score': user.trust_score,
-            'is_verified': user.is_verified,
-            'profile_picture': user.profile_picture.url if user.profile_picture else None
-        })
-    
-    return Response(leaderboard)
\ No newline at end of file
+    try:
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+        limit = min(max(int(request.query_params.get('limit', 50)), 1), 100)
+    except ValueError:
+        return Response({'error': 'Invalid offset or limit'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    entries = leaderboard.top(offset, limit)
+    return Response([
+        entry for entry in entries
+        if entry['trust_score'] >= settings.LEADERBOARD_MIN_SCORE
+    ])
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def my_leaderboard_rank(request):
+    try:
+        radius = min(max(int(request.query_params.get('radius', 5)), 0), 50)
+    except ValueError:
+        return Response({'error': 'Invalid radius'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    rank, entries = leaderboard.around_user(request.user, radius)
+    return Response({
+        'rank': rank,
+        'trust_score': request.user.trust_score,
+        'entries': entries
+    })
\ No newline at end of file
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-trust_score', 'id'], name='users_user_trust_s_8ac857_idx'),
+        ),
+    ]
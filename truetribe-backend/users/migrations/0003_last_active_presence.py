@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_trust_score_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='last_active',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
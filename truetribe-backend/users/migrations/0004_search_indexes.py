@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:05
+
+from django.db import migrations
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def create_search_indexes(apps, schema_editor):
+    # Trigram and prefix indexes only exist on PostgreSQL; other databases get
+    # plain lower() indexes in 0005
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('users', 'User')._meta.db_table)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS users_user_{field}_trgm ON {table} USING gin ({field} gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS users_user_{field}_prefix ON {table} (lower({field}) text_pattern_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS users_user_{field}_trgm')
+        schema_editor.execute(f'DROP INDEX IF EXISTS users_user_{field}_prefix')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_last_active_presence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:12
+
+from django.db import migrations
+
+SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def create_lower_indexes(apps, schema_editor):
+    # Prefix ranges for users.search.DatabaseUserSearch; PostgreSQL already
+    # has its lower() prefix indexes from 0004
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('users', 'User')._meta.db_table)
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS users_user_{field}_lower ON {table} (lower({field}))'
+        )
+
+
+def drop_lower_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        return
+    for field in SEARCH_FIELDS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS users_user_{field}_lower')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_lower_indexes, drop_lower_indexes),
+    ]
@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 import uuid
 
 class User(AbstractUser):
@@ -21,10 +22,15 @@ class User(AbstractUser):
     posts_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    last_active = models.DateTimeField(auto_now=True)
+    last_active = models.DateTimeField(default=timezone.now)  # maintained by users.presence
     
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
+    
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-trust_score', 'id']),
+        ]
 
 class Follow(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
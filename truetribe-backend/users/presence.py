@@ -0,0 +1,235 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from utils import fanout
+from utils.redis_client import get_redis
+
+User = get_user_model()
+
+class LocalPresenceStore:
+    # Presence for a single process; fine for development and one ASGI worker
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.channels = defaultdict(set)
+        self.touched = {}
+        self.typing = defaultdict(dict)
+        self.emitted = {}
+
+    def connect(self, user_id, channel_name):
+        with self.lock:
+            first = not self.channels[user_id]
+            self.channels[user_id].add(channel_name)
+        return first
+
+    def disconnect(self, user_id, channel_name):
+        with self.lock:
+            self.channels[user_id].discard(channel_name)
+            if self.channels[user_id]:
+                return False
+            del self.channels[user_id]
+        return True
+
+    def online(self, user_ids):
+        with self.lock:
+            return {user_id for user_id in user_ids if self.channels.get(user_id)}
+
+    def claim_touch(self, user_id, interval):
+        now = time.time()
+        with self.lock:
+            last = self.touched.get(user_id)
+            if last is not None and now - last < interval:
+                return False
+            self.touched[user_id] = now
+        return True
+
+    def set_typing(self, conversation_id, user_id, username, expires):
+        with self.lock:
+            if expires is None:
+                self.typing[conversation_id].pop(user_id, None)
+            else:
+                self.typing[conversation_id][user_id] = (expires, username)
+
+    def typists(self, conversation_id, now):
+        with self.lock:
+            typing = self.typing[conversation_id]
+            for user_id in [user_id for user_id, (expires, _) in typing.items() if expires <= now]:
+                del typing[user_id]
+            return dict(typing)
+
+    def last_emit(self, conversation_id):
+        with self.lock:
+            return self.emitted.get(conversation_id, (0, None))
+
+    def record_emit(self, conversation_id, now, signature):
+        with self.lock:
+            self.emitted[conversation_id] = (now, signature)
+
+class RedisPresenceStore:
+    # Shared across ASGI processes
+    def channels_key(self, user_id):
+        return f'presence:channels:{user_id}'
+
+    def connect(self, user_id, channel_name):
+        key = self.channels_key(user_id)
+        pipe = get_redis().pipeline()
+        pipe.sadd(key, channel_name)
+        pipe.scard(key)
+        pipe.expire(key, settings.PRESENCE_TTL)
+        _, count, _ = pipe.execute()
+        return count == 1
+
+    def disconnect(self, user_id, channel_name):
+        key = self.channels_key(user_id)
+        pipe = get_redis().pipeline()
+        pipe.srem(key, channel_name)
+        pipe.scard(key)
+        _, count = pipe.execute()
+        return count == 0
+
+    def online(self, user_ids):
+        user_ids = list(user_ids)
+        pipe = get_redis().pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.exists(self.channels_key(user_id))
+        return {user_id for user_id, exists in zip(user_ids, pipe.execute()) if exists}
+
+    def claim_touch(self, user_id, interval):
+        return bool(get_redis().set(f'presence:touched:{user_id}', 1, nx=True, ex=max(int(interval), 1)))
+
+    def set_typing(self, conversation_id, user_id, username, expires):
+        key = f'typing:{conversation_id}'
+        client = get_redis()
+        if expires is None:
+            client.hdel(key, user_id)
+            return
+        pipe = client.pipeline()
+        pipe.hset(key, user_id, json.dumps([expires, username]))
+        pipe.expire(key, int(settings.TYPING_TIMEOUT) + 1)
+        pipe.execute()
+
+    def typists(self, conversation_id, now):
+        key = f'typing:{conversation_id}'
+        client = get_redis()
+        typing, expired = {}, []
+        for user_id, value in client.hgetall(key).items():
+            expires, username = json.loads(value)
+            if expires <= now:
+                expired.append(user_id)
+            else:
+                typing[user_id] = (expires, username)
+        if expired:
+            client.hdel(key, *expired)
+        return typing
+
+    def last_emit(self, conversation_id):
+        value = get_redis().get(f'typing:emitted:{conversation_id}')
+        if value is None:
+            return 0, None
+        emitted_at, signature = json.loads(value)
+        return emitted_at, signature
+
+    def record_emit(self, conversation_id, now, signature):
+        get_redis().set(
+            f'typing:emitted:{conversation_id}',
+            json.dumps([now, signature]),
+            ex=int(settings.TYPING_TIMEOUT) + 1
+        )
+
+_store = None
+
+def get_presence_store():
+    global _store
+    if _store is None:
+        if settings.PRESENCE_BACKEND == 'redis':
+            _store = RedisPresenceStore()
+        else:
+            _store = LocalPresenceStore()
+    return _store
+
+def touch(user_id, force=False):
+    # Writes last_active at most once per PRESENCE_LAST_SEEN_INTERVAL per user
+    user_id = str(user_id)
+    if force or get_presence_store().claim_touch(user_id, settings.PRESENCE_LAST_SEEN_INTERVAL):
+        User.objects.filter(id=user_id).update(last_active=timezone.now())
+
+def user_connected(user, channel_name):
+    became_online = get_presence_store().connect(str(user.id), channel_name)
+    touch(user.id, force=became_online)
+    return became_online
+
+def user_disconnected(user, channel_name):
+    went_offline = get_presence_store().disconnect(str(user.id), channel_name)
+    if went_offline:
+        touch(user.id, force=True)
+    return went_offline
+
+def online_user_ids(user_ids):
+    online = get_presence_store().online(str(user_id) for user_id in user_ids)
+    return {user_id for user_id in user_ids if str(user_id) in online}
+
+def is_online(user_id):
+    return bool(online_user_ids([user_id]))
+
+class TypingBroadcaster:
+    """
+    Coalesces typing frames per conversation.
+
+    Frames only update state (each one extends the user's expiry); the set of
+    typing users is broadcast at most once per TYPING_BROADCAST_INTERVAL, and
+    again when someone's indicator expires.
+    """
+
+    def __init__(self):
+        self.pending = {}
+
+    async def update(self, channel_layer, group_name, conversation_id, user, is_typing):
+        expires = time.time() + settings.TYPING_TIMEOUT if is_typing else None
+        await sync_to_async(get_presence_store().set_typing, thread_sensitive=False)(
+            str(conversation_id), str(user.id), user.username, expires
+        )
+        self.schedule(channel_layer, group_name, conversation_id, 0)
+
+    def schedule(self, channel_layer, group_name, conversation_id, delay):
+        if conversation_id in self.pending:
+            return
+        loop = asyncio.get_running_loop()
+        self.pending[conversation_id] = loop.call_later(
+            delay,
+            lambda: asyncio.ensure_future(self.flush(channel_layer, group_name, conversation_id))
+        )
+
+    async def flush(self, channel_layer, group_name, conversation_id):
+        self.pending.pop(conversation_id, None)
+        store = get_presence_store()
+        now = time.time()
+        typists = await sync_to_async(store.typists, thread_sensitive=False)(str(conversation_id), now)
+        signature = sorted(typists)
+        emitted_at, last_signature = await sync_to_async(store.last_emit, thread_sensitive=False)(str(conversation_id))
+
+        interval = settings.TYPING_BROADCAST_INTERVAL
+        if signature != last_signature:
+            wait = emitted_at + interval - now
+            if wait > 0:
+                self.schedule(channel_layer, group_name, conversation_id, wait)
+                return
+            await sync_to_async(store.record_emit, thread_sensitive=False)(str(conversation_id), now, signature)
+            await fanout.group_send(channel_layer, group_name, {
+                'type': 'typing_indicator',
+                'typing': [
+                    {'user_id': user_id, 'username': username}
+                    for user_id, (_, username) in sorted(typists.items())
+                ]
+            })
+
+        if typists:
+            # Come back when the next indicator runs out
+            next_expiry = min(expires for expires, _ in typists.values())
+            self.schedule(channel_layer, group_name, conversation_id, max(next_expiry - now, interval))
+
+typing_broadcaster = TypingBroadcaster()
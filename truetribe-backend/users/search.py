@@ -0,0 +1,163 @@
+import math
+import re
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Concat, Greatest, Least, Ln, Lower
+from django.db.models.lookups import Exact, StartsWith
+
+User = get_user_model()
+
+# Ranking weights; each component is normalised to 0..1. Popularity adds less
+# than the gap between two match tiers, so it only orders users within a tier
+QUALITY_WEIGHT = 1.0
+TRUST_WEIGHT = 0.06
+FOLLOWERS_WEIGHT = 0.03
+FOLLOWERS_SCALE = math.log1p(10 ** 6)  # a million followers scores 1.0
+
+# Match quality tiers, mirrored by both backends
+EXACT_USERNAME = 1.0
+USERNAME_PREFIX = 0.9
+FULL_NAME_PREFIX = 0.8
+NAME_PREFIX = 0.7
+FUZZY = 0.6  # multiplied by trigram similarity
+
+def normalize(query):
+    return ' '.join(query.lower().lstrip('@').split())
+
+def trigrams(text):
+    # Same padding as pg_trgm: two spaces before each word, one after
+    grams = set()
+    for word in re.findall(r'\w+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def match_quality(query, username, first_name, last_name):
+    username, first_name, last_name = username.lower(), first_name.lower(), last_name.lower()
+    if username == query:
+        return EXACT_USERNAME
+    if username.startswith(query):
+        return USERNAME_PREFIX
+    if ' ' in query and f'{first_name} {last_name}'.startswith(query):
+        return FULL_NAME_PREFIX
+    if first_name.startswith(query) or last_name.startswith(query):
+        return NAME_PREFIX
+    grams = trigrams(query)
+    return FUZZY * max(similarity(grams, trigrams(value)) for value in (username, first_name, last_name))
+
+def rank_score(quality, trust_score, followers_count):
+    return (
+        quality * QUALITY_WEIGHT +
+        trust_score / 100 * TRUST_WEIGHT +
+        min(math.log1p(followers_count) / FOLLOWERS_SCALE, 1.0) * FOLLOWERS_WEIGHT
+    )
+
+def prefix_range(field, prefix):
+    # lower(field) >= prefix AND < prefix with its last character bumped,
+    # a range scan on the lower() indexes added in users/0005
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}_lower__gte': prefix, f'{field}_lower__lt': upper})
+
+def candidates(query, prefix, fuzzy=None):
+    """
+    Primary keys of up to USER_SEARCH_CANDIDATES matches, best tier first.
+
+    Each tier is a small indexed query ordered by the column it scans, so a
+    very common prefix cannot crowd out the exact username or push better
+    tiers past the cap; trigram matches only fill whatever room is left.
+    """
+    users = User.objects.filter(is_active=True).annotate(
+        username_lower=Lower('username'),
+        first_name_lower=Lower('first_name'),
+        last_name_lower=Lower('last_name')
+    )
+    tiers = [(Q(username_lower=query), None), (prefix('username', query), 'username_lower')]
+    for token in query.split():
+        tiers.append((prefix('first_name', token), 'first_name_lower'))
+        tiers.append((prefix('last_name', token), 'last_name_lower'))
+    if fuzzy is not None:
+        tiers.append((fuzzy, None))
+    pks = []
+    for match, order in tiers:
+        remaining = settings.USER_SEARCH_CANDIDATES - len(pks)
+        if remaining <= 0:
+            break
+        tier = users.filter(match).exclude(pk__in=pks)
+        if order:
+            tier = tier.order_by(order)
+        pks.extend(tier.values_list('pk', flat=True)[:remaining])
+    return pks
+
+class DatabaseUserSearch:
+    """
+    Prefix search for databases without pg_trgm, such as SQLite.
+
+    Candidates come straight from the table, so every worker sees signups
+    and renames immediately. There is no fuzzy matching; queries only match
+    username and name prefixes.
+    """
+
+    def search(self, query, limit):
+        users = User.objects.filter(pk__in=candidates(query, prefix_range))
+        scored = [
+            (rank_score(match_quality(query, user.username, user.first_name, user.last_name),
+                        user.trust_score, user.followers_count), user)
+            for user in users
+        ]
+        scored.sort(key=lambda item: (-item[0], str(item[1].id)))
+        return [user for _, user in scored[:limit]]
+
+class PostgresUserSearch:
+    # Candidates come from the pg_trgm and lower() prefix indexes added in users/0004
+    def search(self, query, limit):
+        username, first_name, last_name = Lower('username'), Lower('first_name'), Lower('last_name')
+        fuzzy = None
+        if len(query) >= settings.USER_SEARCH_MIN_FUZZY_LENGTH:
+            fuzzy = Q(TrigramWordSimilar(F('username'), query)) | Q(TrigramWordSimilar(F('first_name'), query)) | \
+                Q(TrigramWordSimilar(F('last_name'), query))
+        pks = candidates(query, lambda field, value: Q(StartsWith(Lower(field), value)), fuzzy)
+        
+        quality = Case(
+            When(Exact(username, query), then=Value(EXACT_USERNAME)),
+            When(StartsWith(username, query), then=Value(USERNAME_PREFIX)),
+            When(StartsWith(Lower(Concat('first_name', Value(' '), 'last_name')), query), then=Value(FULL_NAME_PREFIX)),
+            When(StartsWith(first_name, query) | StartsWith(last_name, query), then=Value(NAME_PREFIX)),
+            default=Greatest(
+                TrigramWordSimilarity(query, 'username'),
+                TrigramWordSimilarity(query, 'first_name'),
+                TrigramWordSimilarity(query, 'last_name')
+            ) * FUZZY,
+            output_field=FloatField()
+        )
+        return list(User.objects.filter(pk__in=pks).annotate(
+            search_rank=quality * QUALITY_WEIGHT +
+            F('trust_score') / 100.0 * TRUST_WEIGHT +
+            Least(Ln(F('followers_count') + 1.0) / FOLLOWERS_SCALE, Value(1.0)) * FOLLOWERS_WEIGHT
+        ).order_by('-search_rank', 'id')[:limit])
+
+_backend = None
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        backend = settings.USER_SEARCH_BACKEND
+        if backend == 'auto':
+            backend = 'postgres' if connection.vendor == 'postgresql' else 'database'
+        _backend = PostgresUserSearch() if backend == 'postgres' else DatabaseUserSearch()
+    return _backend
+
+def search_users(query, limit=None):
+    query = normalize(query)
+    if not query:
+        return []
+    limit = max(1, min(limit or settings.USER_SEARCH_LIMIT, settings.USER_SEARCH_MAX_LIMIT))
+    return get_search_backend().search(query, limit)
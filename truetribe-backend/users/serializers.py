@@ -1,43 +1,63 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Follow, Block
+from .models import Follow
+from utils.viewer_context import ViewerContextListSerializer, ViewerContextMixin
 
 User = get_user_model()
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(ViewerContextMixin, serializers.ModelSerializer):
     followers_count = serializers.ReadOnlyField()
     following_count = serializers.ReadOnlyField()
     posts_count = serializers.ReadOnlyField()
     is_following = serializers.SerializerMethodField()
     is_blocked = serializers.SerializerMethodField()
     avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
+    cover_photo_variants = serializers.SerializerMethodField()
+    is_online = serializers.SerializerMethodField()
+    viewer_context_kind = 'user'
     
     class Meta:
         model = User
+        list_serializer_class = ViewerContextListSerializer
         fields = [
             'id', 'username', 'email', 'first_name', 'last_name', 'bio',
-            'profile_picture', 'avatar', 'cover_photo', 'website', 'location', 'birth_date',
+            'profile_picture', 'avatar', 'avatar_variants', 'cover_photo', 'cover_photo_variants',
+            'website', 'location', 'birth_date',
             'is_verified', 'is_private', 'trust_score', 'followers_count',
             'following_count', 'posts_count', 'created_at', 'last_active',
-            'is_following', 'is_blocked'
+            'is_following', 'is_blocked', 'is_online'
         ]
-        read_only_fields = ['id', 'created_at', 'trust_score', 'is_verified']
+        read_only_fields = ['id', 'created_at', 'trust_score', 'is_verified', 'last_active']
     
     def get_avatar(self, obj):
         if obj.profile_picture:
-            return obj.profile_picture.url
+            # Small enough for lists and comment threads; the original until it is resized
+            return self.media_variants_for(obj, 'profile_picture').get('thumb') or obj.profile_picture.url
         return None
     
+    def get_avatar_variants(self, obj):
+        return self.media_variants_for(obj, 'profile_picture')
+    
+    def get_cover_photo_variants(self, obj):
+        return self.media_variants_for(obj, 'cover_photo')
+    
     def get_is_following(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Follow.objects.filter(follower=request.user, following=obj).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_following(obj.id)
         return False
     
     def get_is_blocked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return Block.objects.filter(blocker=request.user, blocked=obj).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_blocked(obj.id)
+        return False
+    
+    def get_is_online(self, obj):
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_online(obj.id)
         return False
 
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -87,4 +107,9 @@ class FollowSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Follow
-        fields = ['id', 'follower', 'following', 'created_at']
\ No newline at end of file
+        list_serializer_class = ViewerContextListSerializer
+        fields = ['id', 'follower', 'following', 'created_at']
+    
+    def prime_viewer_context(self, viewer_context, follows):
+        users = [follow.follower for follow in follows] + [follow.following for follow in follows]
+        viewer_context.prime_users(users)
\ No newline at end of file
@@ -1,3 +1,35 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from users import search
 
-# Create your tests here.
+User = get_user_model()
+
+
+@override_settings(USER_SEARCH_BACKEND='database', USER_SEARCH_CANDIDATES=500)
+class UserSearchCandidateTests(TestCase):
+    def setUp(self):
+        search._backend = None
+        self.addCleanup(setattr, search, '_backend', None)
+
+    def test_common_prefix_keeps_best_matches(self):
+        # Name matches created first would fill an unordered candidate set
+        User.objects.bulk_create([
+            User(username=f'x{i:03d}', email=f'x{i}@example.com', first_name='Sam', followers_count=10 ** 6)
+            for i in range(600)
+        ])
+        User.objects.bulk_create([
+            User(username=f'sam{i:03d}', email=f'sam{i}@example.com')
+            for i in range(600)
+        ])
+        exact = User.objects.create_user(username='sam', email='sam@example.com', password='x')
+
+        pks = search.candidates('sam', search.prefix_range)
+        self.assertEqual(len(pks), 500)
+        self.assertEqual(pks[0], exact.pk)
+        usernames = dict(User.objects.filter(pk__in=pks).values_list('pk', 'username'))
+        self.assertEqual([usernames[pk] for pk in pks[1:]], [f'sam{i:03d}' for i in range(499)])
+
+        results = [user.username for user in search.search_users('sam', 20)]
+        self.assertEqual(results[0], 'sam')
+        self.assertTrue(all(username.startswith('sam') for username in results))
+        self.assertEqual(len(results), 20)
@@ -6,6 +6,8 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from .models import Follow, Block
 from .serializers import UserSerializer, UserProfileSerializer, FollowSerializer
+from posts.timeline import backfill_author, evict_author
+from .search import search_users
 
 User = get_user_model()
 
@@ -13,15 +15,15 @@ class UserSearchView(generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        query = self.request.query_params.get('q', '')
-        if query:
-            return User.objects.filter(
-                Q(username__icontains=query) | 
-                Q(first_name__icontains=query) | 
-                Q(last_name__icontains=query)
-            )
-        return User.objects.none()
+    def list(self, request, *args, **kwargs):
+        # Ranked typeahead results, see users.search
+        try:
+            limit = max(int(request.query_params.get('limit', 0)), 0)
+        except ValueError:
+            limit = 0
+        users = search_users(request.query_params.get('q', ''), limit)
+        serializer = self.get_serializer(users, many=True)
+        return Response({'results': serializer.data})
 
 class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserProfileSerializer
@@ -59,11 +61,9 @@ def follow_user(request, username):
         following=user_to_follow
     )
     
+    # Follower counts are maintained by the Follow signals
     if created:
-        user_to_follow.followers_count += 1
-        user_to_follow.save()
-        request.user.following_count += 1
-        request.user.save()
+        backfill_author(request.user, user_to_follow)
         return Response({'message': 'User followed successfully'})
     else:
         return Response({'error': 'Already following this user'}, status=status.HTTP_400_BAD_REQUEST)
@@ -76,10 +76,7 @@ def unfollow_user(request, username):
     try:
         follow = Follow.objects.get(follower=request.user, following=user_to_unfollow)
         follow.delete()
-        user_to_unfollow.followers_count -= 1
-        user_to_unfollow.save()
-        request.user.following_count -= 1
-        request.user.save()
+        evict_author(request.user, user_to_unfollow)
         return Response({'message': 'User unfollowed successfully'})
     except Follow.DoesNotExist:
         return Response({'error': 'Not following this user'}, status=status.HTTP_400_BAD_REQUEST)
@@ -119,6 +116,8 @@ def block_user(request, username):
             Q(follower=request.user, following=user_to_block) |
             Q(follower=user_to_block, following=request.user)
         ).delete()
+        evict_author(request.user, user_to_block)
+        evict_author(user_to_block, request.user)
         return Response({'message': 'User blocked successfully'})
     else:
         return Response({'error': 'User already blocked'}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -5,4 +5,5 @@ class UtilsConfig(AppConfig):
     name = 'utils'
     
     def ready(self):
-        import utils.signals
\ No newline at end of file
+        import utils.signals
+        import utils.event_handlers
\ No newline at end of file
@@ -0,0 +1,195 @@
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+import redis
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from utils.redis_client import get_redis
+
+LOCAL_SHARDS = 16
+REDIS_DIRTY_KEY = 'counters:dirty'
+REDIS_FLUSHING_KEY = 'counters:flushing'  # hashes taken by a flush that has not committed yet
+REDIS_FLUSH_LOCK_KEY = 'counters:flush_lock'
+
+logger = logging.getLogger(__name__)
+
+# Move a counter hash aside for flushing, merging it into a batch left behind by
+# a failed flush, and return everything waiting to be applied
+TAKE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    if redis.call('EXISTS', KEYS[3]) == 1 then
+        local pending = redis.call('HGETALL', KEYS[2])
+        for i = 1, #pending, 2 do
+            redis.call('HINCRBY', KEYS[3], pending[i], pending[i + 1])
+        end
+        redis.call('DEL', KEYS[2])
+    else
+        redis.call('RENAME', KEYS[2], KEYS[3])
+    end
+end
+redis.call('SREM', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[4], ARGV[1])
+return redis.call('HGETALL', KEYS[3])
+"""
+
+def model_label(model):
+    return model._meta.label_lower
+
+def apply_deltas(deltas):
+    """
+    Apply {(model label, field, pk): delta} as single-column UPDATEs.
+
+    Rows sharing a delta are updated together, counters never drop below zero
+    and no other column (updated_at included) is touched.
+    """
+    grouped = defaultdict(list)
+    for (label, field, pk), delta in deltas.items():
+        if delta:
+            grouped[(label, field, delta)].append(pk)
+    for (label, field, delta), pks in grouped.items():
+        model = apps.get_model(label)
+        model.objects.filter(pk__in=pks).update(**{field: Greatest(F(field) + delta, Value(0))})
+
+class DirectCounterBackend:
+    def add(self, model, pk, field, delta):
+        apply_deltas({(model_label(model), field, pk): delta})
+
+    def flush(self):
+        pass
+
+class LocalCounterBackend:
+    """
+    Buffers deltas in lock-striped in-process shards.
+
+    A daemon thread flushes them every COUNTER_FLUSH_INTERVAL and once more
+    when the process exits, so a counter that goes quiet is still written.
+    Deltas from a failed flush go back into the shards for the next one.
+    """
+
+    def __init__(self):
+        self.shards = [({}, threading.Lock()) for _ in range(LOCAL_SHARDS)]
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def add(self, model, pk, field, delta):
+        key = (model_label(model), field, pk)
+        self.merge(key, delta)
+        if self.thread is None:
+            with self.lock:
+                if self.thread is None:
+                    self.thread = threading.Thread(target=self.run, name='counter-flusher', daemon=True)
+                    self.thread.start()
+                    atexit.register(self.flush)
+
+    def merge(self, key, delta):
+        counts, lock = self.shards[hash(key) % LOCAL_SHARDS]
+        with lock:
+            counts[key] = counts.get(key, 0) + delta
+
+    def run(self):
+        while True:
+            time.sleep(settings.COUNTER_FLUSH_INTERVAL)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush counters')
+
+    def flush(self):
+        deltas = defaultdict(int)
+        for counts, lock in self.shards:
+            with lock:
+                pending = dict(counts)
+                counts.clear()
+            for key, delta in pending.items():
+                deltas[key] += delta
+        if not deltas:
+            return
+        try:
+            with transaction.atomic():
+                apply_deltas(deltas)
+        except Exception:
+            for key, delta in deltas.items():
+                self.merge(key, delta)
+            raise
+
+class RedisCounterBackend:
+    # Buffers deltas in Redis hashes, drained by the flush_counters task
+    def __init__(self):
+        self.take_script = None
+
+    def hash_key(self, label, field):
+        return f'counters:{label}:{field}'
+
+    def add(self, model, pk, field, delta):
+        label = model_label(model)
+        key = self.hash_key(label, field)
+        pipe = get_redis().pipeline(transaction=False)
+        pipe.hincrby(key, str(pk), delta)
+        pipe.sadd(REDIS_DIRTY_KEY, f'{label}:{field}')
+        pipe.execute()
+
+    def flush(self):
+        client = get_redis()
+        # Overlapping flushes would apply the same batch twice
+        lock = client.lock(REDIS_FLUSH_LOCK_KEY, timeout=settings.COUNTER_FLUSH_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            return
+        try:
+            self.drain(client)
+        finally:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                logger.warning('Counter flush outlived its lock')
+
+    def drain(self, client):
+        if self.take_script is None:
+            self.take_script = client.register_script(TAKE_SCRIPT)
+        deltas = {}
+        members = client.sunion(REDIS_DIRTY_KEY, REDIS_FLUSHING_KEY)
+        for member in members:
+            label, field = member.rsplit(':', 1)
+            key = self.hash_key(label, field)
+            pending = self.take_script(
+                keys=[REDIS_DIRTY_KEY, key, f'{key}:flushing', REDIS_FLUSHING_KEY], args=[member]
+            )
+            for pk, delta in zip(pending[::2], pending[1::2]):
+                deltas[(label, field, pk)] = int(delta)
+        # The taken hashes are only dropped once the deltas have committed
+        with transaction.atomic():
+            apply_deltas(deltas)
+        if members:
+            pipe = client.pipeline()
+            for member in members:
+                label, field = member.rsplit(':', 1)
+                pipe.delete(f'{self.hash_key(label, field)}:flushing')
+            pipe.srem(REDIS_FLUSHING_KEY, *members)
+            pipe.execute()
+
+_backend = None
+
+def get_counter_backend():
+    global _backend
+    if _backend is None:
+        if settings.COUNTER_BACKEND == 'redis':
+            _backend = RedisCounterBackend()
+        elif settings.COUNTER_BACKEND == 'local':
+            _backend = LocalCounterBackend()
+        else:
+            _backend = DirectCounterBackend()
+    return _backend
+
+def increment(model, pk, field, delta=1):
+    get_counter_backend().add(model, pk, field, delta)
+
+def decrement(model, pk, field, delta=1):
+    get_counter_backend().add(model, pk, field, -delta)
+
+def flush_counters():
+    get_counter_backend().flush()
@@ -0,0 +1,133 @@
+from django.contrib.auth import get_user_model
+from posts.models import Post, Comment
+from videos.models import Video
+from trust_system.models import TrustAction
+from notifications.aggregation import aggregate
+from hashtags.models import Mention
+from posts.timeline import fan_out_post
+from . import trending
+from .events import subscribe
+
+User = get_user_model()
+
+@subscribe('post.liked')
+def on_post_liked(post_id, user_id):
+    post = Post.objects.select_related('author').filter(id=post_id).first()
+    user = User.objects.filter(id=user_id).first()
+    if post is None or user is None:
+        return
+    
+    trending.record('post', post.id, 'like')
+    
+    if user != post.author:
+        aggregate(
+            post.author, user, 'like', 'New Like', 'liked your post',
+            {'post_id': str(post.id)}, target=('post', post.id)
+        )
+    
+    TrustAction.objects.create(
+        user=user,
+        action_type='post_like',
+        score_change=0.5,
+        description='Liked a post'
+    )
+
+@subscribe('comment.created')
+def on_comment_created(comment_id):
+    comment = Comment.objects.select_related('author', 'post__author').filter(id=comment_id).first()
+    if comment is None:
+        return
+    
+    trending.record('post', comment.post_id, 'comment')
+    
+    if comment.author != comment.post.author:
+        aggregate(
+            comment.post.author, comment.author, 'comment', 'New Comment', 'commented on your post',
+            {'post_id': str(comment.post.id), 'comment_id': str(comment.id)}, target=('post', comment.post.id)
+        )
+    
+    TrustAction.objects.create(
+        user=comment.author,
+        action_type='comment',
+        score_change=1.0,
+        description='Added a comment'
+    )
+
+@subscribe('follow.created')
+def on_follow_created(follower_id, following_id):
+    follower = User.objects.filter(id=follower_id).first()
+    following = User.objects.filter(id=following_id).first()
+    if follower is None or following is None:
+        return
+    
+    aggregate(
+        following, follower, 'follow', 'New Follower', 'started following you',
+        {'user_id': str(follower.id)}
+    )
+    
+    TrustAction.objects.create(
+        user=follower,
+        action_type='follow',
+        score_change=0.5,
+        description='Followed a user'
+    )
+
+@subscribe('post.created')
+def on_post_created(post_id):
+    post = Post.objects.select_related('author').filter(id=post_id).first()
+    if post is None:
+        return
+    
+    # Push the post into followers' home timelines
+    fan_out_post(post)
+    
+    TrustAction.objects.create(
+        user=post.author,
+        action_type='post_like',
+        score_change=2.0,
+        description='Created a post'
+    )
+
+@subscribe('video.liked')
+def on_video_liked(video_id, user_id):
+    video = Video.objects.select_related('author').filter(id=video_id).first()
+    user = User.objects.filter(id=user_id).first()
+    if video is None or user is None:
+        return
+    
+    trending.record('video', video.id, 'like')
+    
+    if user != video.author:
+        aggregate(
+            video.author, user, 'like', 'Video Liked', 'liked your video',
+            {'video_id': str(video.id)}, target=('video', video.id)
+        )
+
+@subscribe('post.shared')
+def on_post_shared(post_id):
+    trending.record('post', post_id, 'share')
+
+@subscribe('video.shared')
+def on_video_shared(video_id):
+    trending.record('video', video_id, 'share')
+
+@subscribe('video_comment.created')
+def on_video_comment_created(video_id):
+    trending.record('video', video_id, 'comment')
+
+@subscribe('mention.created')
+def on_mention_created(mention_ids):
+    for mention in Mention.objects.select_related('user', 'author').filter(id__in=mention_ids):
+        if mention.target_type == 'comment':
+            post_id = Comment.objects.filter(id=mention.target_id).values_list('post_id', flat=True).first()
+            if post_id is None:
+                continue
+            data = {'post_id': str(post_id), 'comment_id': str(mention.target_id)}
+        else:
+            data = {f'{mention.target_type}_id': str(mention.target_id)}
+        
+        aggregate(
+            mention.user, mention.author, 'mention', 'New Mention',
+            f'mentioned you in a {mention.target_type}',
+            data, target=(mention.target_type, mention.target_id)
+        )
@@ -0,0 +1,118 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from utils.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = defaultdict(list)
+
+def subscribe(event_type):
+    def decorator(handler):
+        _handlers[event_type].append(handler)
+        return handler
+    return decorator
+
+def publish(event_type, **payload):
+    # Written in the caller's transaction; consumers run only after it commits
+    event = OutboxEvent.objects.create(event_type=event_type, payload=payload)
+    transaction.on_commit(schedule_dispatch)
+    return event
+
+def handle_event(event):
+    for handler in _handlers.get(event.event_type, []):
+        handler(**event.payload)
+
+def claim_pending(batch_size):
+    # Lease a batch in a short transaction so handlers never hold it open
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(OutboxEvent.objects.select_for_update(skip_locked=True).filter(
+            Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+            processed_at__isnull=True
+        ).order_by('id').values_list('id', flat=True)[:batch_size])
+        OutboxEvent.objects.filter(id__in=ids).update(
+            locked_until=now + timedelta(seconds=settings.OUTBOX_LEASE_TIMEOUT)
+        )
+    return list(OutboxEvent.objects.filter(id__in=ids).order_by('id'))
+
+def process_event(event):
+    # Handler writes and the processed mark commit together; websocket pushes
+    # are sent on commit, so a failed attempt pushes nothing
+    try:
+        with transaction.atomic():
+            handle_event(event)
+            OutboxEvent.objects.filter(id=event.id).update(
+                attempts=F('attempts') + 1, last_error='', processed_at=timezone.now()
+            )
+    except Exception as e:
+        logger.exception('Outbox event %s (%s) failed', event.id, event.event_type)
+        update = {'attempts': F('attempts') + 1, 'last_error': str(e), 'locked_until': None}
+        if event.attempts + 1 >= settings.OUTBOX_MAX_ATTEMPTS:
+            update['processed_at'] = timezone.now()
+        OutboxEvent.objects.filter(id=event.id).update(**update)
+
+def dispatch_pending(batch_size=None):
+    events = claim_pending(batch_size or settings.OUTBOX_BATCH_SIZE)
+    for event in events:
+        process_event(event)
+    return len(events)
+
+def purge_processed(batch_size=None):
+    # Handled and dead events are kept for OUTBOX_RETENTION_DAYS for inspection
+    batch_size = batch_size or settings.OUTBOX_PURGE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    deleted = 0
+    while True:
+        ids = list(OutboxEvent.objects.filter(
+            processed_at__lt=cutoff
+        ).order_by('processed_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += OutboxEvent.objects.filter(id__in=ids).delete()[0]
+
+def drain():
+    while dispatch_pending() >= settings.OUTBOX_BATCH_SIZE:
+        pass
+
+class LocalOutboxWorker:
+    # Background thread that drains the outbox for the current process
+    def __init__(self):
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def notify(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='outbox-worker', daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(timeout=settings.OUTBOX_POLL_INTERVAL)
+            self.wakeup.clear()
+            try:
+                close_old_connections()
+                drain()
+            except Exception:
+                logger.exception('Outbox worker failed to drain events')
+
+_local_worker = LocalOutboxWorker()
+
+def schedule_dispatch():
+    mode = settings.OUTBOX_DISPATCH
+    if mode == 'celery':
+        from utils.tasks import dispatch_outbox
+        dispatch_outbox.delay()
+    elif mode == 'sync':
+        # Runs consumers inline after commit; intended for tests and scripts
+        drain()
+    else:
+        _local_worker.notify()
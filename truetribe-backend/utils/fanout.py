@@ -0,0 +1,47 @@
+import asyncio
+import json
+import zlib
+from asgiref.sync import async_to_sync
+from django.conf import settings
+
+def shard_count(group):
+    # Group names look like '<kind>_<id>'; the kind picks the shard count
+    kind = group.split('_', 1)[0]
+    return settings.FANOUT_GROUP_SHARDS.get(kind, 1)
+
+def shard_groups(group):
+    count = shard_count(group)
+    if count == 1:
+        return [group]
+    return [f'{group}.{shard}' for shard in range(count)]
+
+def shard_for(group, channel_name):
+    count = shard_count(group)
+    if count == 1:
+        return group
+    return f'{group}.{zlib.crc32(channel_name.encode()) % count}'
+
+async def group_add(channel_layer, group, channel_name):
+    await channel_layer.group_add(shard_for(group, channel_name), channel_name)
+
+async def group_discard(channel_layer, group, channel_name):
+    await channel_layer.group_discard(shard_for(group, channel_name), channel_name)
+
+async def group_send(channel_layer, group, event):
+    # Each sub-group is a separate, smaller send that the layer can spread out
+    await asyncio.gather(*[channel_layer.group_send(name, event) for name in shard_groups(group)])
+
+async def group_send_json(channel_layer, group, handler, payload):
+    """
+    Send payload to every member of group, serialized once.
+
+    The consumer method named by handler receives {'text': ...} and can pass
+    it straight to self.send(text_data=...).
+    """
+    await group_send(channel_layer, group, {
+        'type': handler,
+        'text': json.dumps(payload)
+    })
+
+def group_send_json_sync(channel_layer, group, handler, payload):
+    async_to_sync(group_send_json)(channel_layer, group, handler, payload)
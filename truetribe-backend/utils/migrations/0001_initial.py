@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:05
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ViewerSketch',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target_type', models.CharField(choices=[('video', 'Video'), ('live_stream', 'Live Stream')], max_length=20)),
+                ('target_id', models.UUIDField()),
+                ('bucket', models.CharField(max_length=10)),
+                ('registers', models.BinaryField()),
+                ('estimate', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('target_type', 'target_id', 'bucket')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:14
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0002_outboxevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingSnapshot',
+            fields=[
+                ('target_type', models.CharField(choices=[('post', 'Post'), ('video', 'Video')], max_length=20, primary_key=True, serialize=False)),
+                ('items', models.JSONField(default=list)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TrendingBucket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target_type', models.CharField(choices=[('post', 'Post'), ('video', 'Video')], max_length=20)),
+                ('target_id', models.UUIDField()),
+                ('hour', models.DateTimeField()),
+                ('score', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['target_type', 'hour'], name='utils_trend_target__bddae3_idx')],
+                'unique_together': {('target_type', 'target_id', 'hour')},
+            },
+        ),
+    ]
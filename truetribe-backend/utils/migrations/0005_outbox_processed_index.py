@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('utils', '0004_outbox_lease'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['processed_at'], name='outbox_processed_idx'),
+        ),
+    ]
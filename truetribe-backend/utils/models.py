@@ -0,0 +1,61 @@
+from django.db import models
+import uuid
+
+class ViewerSketch(models.Model):
+    TARGET_TYPES = [
+        ('video', 'Video'),
+        ('live_stream', 'Live Stream'),
+    ]
+    TOTAL_BUCKET = 'total'
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPES)
+    target_id = models.UUIDField()
+    bucket = models.CharField(max_length=10)  # 'total' or an ISO day (YYYY-MM-DD)
+    registers = models.BinaryField()  # HyperLogLog registers, see utils.hyperloglog
+    estimate = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ('target_type', 'target_id', 'bucket')
+
+class OutboxEvent(models.Model):
+    # Domain events written in the same transaction as the change that caused them
+    id = models.BigAutoField(primary_key=True)  # sequential, so events drain in insertion order
+    event_type = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)  # lease held by the dispatcher handling it
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(processed_at__isnull=True), name='outbox_pending_idx'),
+            models.Index(fields=['processed_at'], name='outbox_processed_idx'),
+        ]
+
+class TrendingBucket(models.Model):
+    TARGET_TYPES = [
+        ('post', 'Post'),
+        ('video', 'Video'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    target_type = models.CharField(max_length=20, choices=TARGET_TYPES)
+    target_id = models.UUIDField()
+    hour = models.DateTimeField()  # start of the hour the engagement happened in
+    score = models.FloatField(default=0.0)  # weighted engagement, decayed at read time
+    
+    class Meta:
+        unique_together = ('target_type', 'target_id', 'hour')
+        indexes = [
+            models.Index(fields=['target_type', 'hour']),
+        ]
+
+class TrendingSnapshot(models.Model):
+    # Precomputed top-K ranking, rebuilt by utils.tasks.snapshot_trending
+    target_type = models.CharField(max_length=20, choices=TrendingBucket.TARGET_TYPES, primary_key=True)
+    items = models.JSONField(default=list)  # [[target_id, score], ...] best first
+    computed_at = models.DateTimeField(auto_now=True)
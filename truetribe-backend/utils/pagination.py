@@ -0,0 +1,154 @@
+import base64
+import json
+import uuid
+from collections import OrderedDict
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque-cursor pagination keyed on (cursor_field, id).
+
+    Pages are fetched with a range condition on the composite key instead of
+    OFFSET, and no COUNT(*) is issued, so every page costs the same.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    max_page_size = 100
+    cursor_field = 'created_at'
+    # Return each page oldest-first while still walking from newest to oldest
+    chronological_pages = False
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        value, pk, reverse = self.decode_cursor(request)
+
+        # Newest first when walking forward; flipped when following a previous link
+        newer = reverse
+        if value is not None:
+            if newer:
+                queryset = queryset.filter(
+                    Q(**{f'{self.cursor_field}__gt': value}) |
+                    Q(**{self.cursor_field: value, 'pk__gt': pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{self.cursor_field}__lt': value}) |
+                    Q(**{self.cursor_field: value, 'pk__lt': pk})
+                )
+        if newer:
+            queryset = queryset.order_by(self.cursor_field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{self.cursor_field}', '-pk')
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if newer:
+            results.reverse()
+
+        # results are now newest first
+        if reverse:
+            self.has_next = value is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = value is not None
+        self.first_item = results[0] if results else None
+        self.last_item = results[-1] if results else None
+
+        if self.chronological_pages:
+            results.reverse()
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            value = parse_datetime(data['v'])
+            if value is None:
+                raise ValueError
+            # Every paginated model has a UUID primary key
+            pk = uuid.UUID(str(data['id']))
+            return value, pk, bool(data.get('r', False))
+        except (TypeError, KeyError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item, reverse):
+        data = {
+            'v': getattr(item, self.cursor_field).isoformat(),
+            'id': str(item.pk),
+        }
+        if reverse:
+            data['r'] = True
+        encoded = base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next or self.last_item is None:
+            return None
+        return self.encode_cursor(self.last_item, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first_item is None:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.first_item, reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class TimelinePagination(KeysetPagination):
+    cursor_field = 'timeline_at'
+
+
+class InboxPagination(KeysetPagination):
+    cursor_field = 'last_message_at'
+
+
+class NotificationPagination(KeysetPagination):
+    # Aggregated notifications move to the top when a new actor joins them
+    cursor_field = 'updated_at'
+
+
+class MessageHistoryPagination(KeysetPagination):
+    # Chat clients render oldest-first; "next" pages go further back in history
+    chronological_pages = True
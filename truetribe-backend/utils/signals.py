@@ -1,176 +1,158 @@
-from django.db.models.signals import post_save, post_delete
+from functools import partial
+from django.db import transaction
+from django.db.models.signals import m2m_changed, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from posts.models import Post, PostLike, Comment
-from videos.models import Video, VideoLike
+from posts.models import Post, PostLike, PostShare, Comment
+from videos.models import Video, VideoLike, VideoShare, VideoComment
 from users.models import Follow
-from trust_system.models import TrustScore, TrustAction
-from notifications.models import Notification
-
-channel_layer = get_channel_layer()
+from search import engine as search_engine
+from hashtags import extraction as hashtag_extraction
+from media_management import derivatives
+from messaging.models import Conversation
+from messaging import inbox, membership
+from trust_system.models import TrustAction
+from trust_system import engine, leaderboard
+from utils import counters
+from utils.events import publish
 
 User = get_user_model()
 
+# Counters are updated in the request; notifications, trust actions, timeline
+# fan-out and websocket pushes run from the outbox, see utils.event_handlers
+
 @receiver(post_save, sender=PostLike)
 def handle_post_like(sender, instance, created, **kwargs):
     if created:
         # Update post like count
-        instance.post.likes_count += 1
-        instance.post.save()
-        
-        # Create notification
-        if instance.user != instance.post.author:
-            notification = Notification.objects.create(
-                recipient=instance.post.author,
-                sender=instance.user,
-                notification_type='like',
-                title='New Like',
-                message=f'{instance.user.username} liked your post',
-                data={'post_id': str(instance.post.id)}
-            )
-            
-            # Send real-time notification
-            if channel_layer:
-                async_to_sync(channel_layer.group_send)(
-                    f'notifications_{instance.post.author.id}',
-                    {
-                        'type': 'notification_message',
-                        'notification': {
-                            'id': str(notification.id),
-                            'title': notification.title,
-                            'message': notification.message,
-                            'type': notification.notification_type,
-                            'sender': instance.user.username,
-                            'created_at': notification.created_at.isoformat()
-                        }
-                    }
-                )
-        
-        # Record trust action
-        TrustAction.objects.create(
-            user=instance.user,
-            action_type='post_like',
-            score_change=0.5,
-            description='Liked a post'
-        )
+        counters.increment(Post, instance.post_id, 'likes_count')
+        publish('post.liked', post_id=str(instance.post_id), user_id=str(instance.user_id))
 
 @receiver(post_delete, sender=PostLike)
 def handle_post_unlike(sender, instance, **kwargs):
     # Update post like count
-    instance.post.likes_count = max(0, instance.post.likes_count - 1)
-    instance.post.save()
+    counters.decrement(Post, instance.post_id, 'likes_count')
 
 @receiver(post_save, sender=Comment)
 def handle_comment_created(sender, instance, created, **kwargs):
     if created:
         # Update post comment count
-        instance.post.comments_count += 1
-        instance.post.save()
-        
-        # Create notification
-        if instance.author != instance.post.author:
-            Notification.objects.create(
-                recipient=instance.post.author,
-                sender=instance.author,
-                notification_type='comment',
-                title='New Comment',
-                message=f'{instance.author.username} commented on your post',
-                data={'post_id': str(instance.post.id), 'comment_id': str(instance.id)}
-            )
-        
-        # Record trust action
-        TrustAction.objects.create(
-            user=instance.author,
-            action_type='comment',
-            score_change=1.0,
-            description='Added a comment'
-        )
+        counters.increment(Post, instance.post_id, 'comments_count')
+        publish('comment.created', comment_id=str(instance.id))
+
+@receiver(post_delete, sender=Comment)
+def handle_comment_deleted(sender, instance, **kwargs):
+    counters.decrement(Post, instance.post_id, 'comments_count')
 
 @receiver(post_save, sender=Follow)
 def handle_follow_created(sender, instance, created, **kwargs):
     if created:
         # Update follower/following counts
-        instance.follower.following_count += 1
-        instance.follower.save()
-        
-        instance.following.followers_count += 1
-        instance.following.save()
-        
-        # Create notification
-        Notification.objects.create(
-            recipient=instance.following,
-            sender=instance.follower,
-            notification_type='follow',
-            title='New Follower',
-            message=f'{instance.follower.username} started following you',
-            data={'user_id': str(instance.follower.id)}
-        )
-        
-        # Record trust action
-        TrustAction.objects.create(
-            user=instance.follower,
-            action_type='follow',
-            score_change=0.5,
-            description='Followed a user'
-        )
+        counters.increment(User, instance.follower_id, 'following_count')
+        counters.increment(User, instance.following_id, 'followers_count')
+        publish('follow.created', follower_id=str(instance.follower_id), following_id=str(instance.following_id))
 
 @receiver(post_delete, sender=Follow)
 def handle_follow_deleted(sender, instance, **kwargs):
     # Update follower/following counts
-    instance.follower.following_count = max(0, instance.follower.following_count - 1)
-    instance.follower.save()
-    
-    instance.following.followers_count = max(0, instance.following.followers_count - 1)
-    instance.following.save()
+    counters.decrement(User, instance.follower_id, 'following_count')
+    counters.decrement(User, instance.following_id, 'followers_count')
 
 @receiver(post_save, sender=Post)
 def handle_post_created(sender, instance, created, **kwargs):
     if created:
         # Update user's post count
-        instance.author.posts_count += 1
-        instance.author.save()
-        
-        # Record trust action
-        TrustAction.objects.create(
-            user=instance.author,
-            action_type='post_like',
-            score_change=2.0,
-            description='Created a post'
-        )
+        counters.increment(User, instance.author_id, 'posts_count')
+        publish('post.created', post_id=str(instance.id))
 
 @receiver(post_save, sender=VideoLike)
 def handle_video_like(sender, instance, created, **kwargs):
     if created:
         # Update video like count
-        instance.video.likes_count += 1
-        instance.video.save()
-        
-        # Create notification
-        if instance.user != instance.video.author:
-            Notification.objects.create(
-                recipient=instance.video.author,
-                sender=instance.user,
-                notification_type='like',
-                title='Video Liked',
-                message=f'{instance.user.username} liked your video',
-                data={'video_id': str(instance.video.id)}
-            )
+        counters.increment(Video, instance.video_id, 'likes_count')
+        publish('video.liked', video_id=str(instance.video_id), user_id=str(instance.user_id))
+
+@receiver(post_delete, sender=VideoLike)
+def handle_video_unlike(sender, instance, **kwargs):
+    counters.decrement(Video, instance.video_id, 'likes_count')
+
+@receiver(post_save, sender=PostShare)
+def handle_post_share(sender, instance, created, **kwargs):
+    if created:
+        publish('post.shared', post_id=str(instance.post_id))
+
+@receiver(post_save, sender=VideoShare)
+def handle_video_share(sender, instance, created, **kwargs):
+    if created:
+        publish('video.shared', video_id=str(instance.video_id))
+
+@receiver(post_save, sender=VideoComment)
+def handle_video_comment_created(sender, instance, created, **kwargs):
+    if created:
+        publish('video_comment.created', video_id=str(instance.video_id))
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Video)
+@receiver(pre_save, sender=User)
+def handle_media_owner_saving(sender, instance, update_fields=None, **kwargs):
+    derivatives.remember(instance, update_fields)
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Video)
+@receiver(post_save, sender=Comment)
+def handle_searchable_saved(sender, instance, update_fields=None, **kwargs):
+    search_engine.index_object(instance, update_fields)
+    hashtag_extraction.sync(instance, update_fields)
+    derivatives.sync(instance, update_fields)
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=Video)
+@receiver(post_delete, sender=Comment)
+def handle_searchable_deleted(sender, instance, **kwargs):
+    search_engine.remove_object(instance)
+    hashtag_extraction.remove(instance)
+    derivatives.remove(instance)
+
+@receiver(m2m_changed, sender=Conversation.participants.through)
+def handle_participants_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action in ('post_add', 'post_remove'):
+        membership.invalidate(pk_set if reverse else [instance.id])
+    elif action == 'pre_clear' and reverse:
+        # The user's conversations are gone by post_clear
+        membership.invalidate(list(instance.conversations.values_list('id', flat=True)))
+    elif action == 'post_clear' and not reverse:
+        membership.invalidate([instance.id])
+    
+    # Keep one inbox entry per participant
+    if reverse:
+        # user.conversations.add(...): instance is the user, pk_set conversations
+        conversations = Conversation.objects.filter(id__in=pk_set or [])
+        if action == 'post_add':
+            for conversation in conversations:
+                inbox.add_participants(conversation, [instance.id])
+        elif action == 'post_remove':
+            for conversation in conversations:
+                inbox.remove_participants(conversation, [instance.id])
+        elif action == 'post_clear':
+            instance.inbox_entries.all().delete()
+    elif action == 'post_add':
+        inbox.add_participants(instance, pk_set)
+    elif action == 'post_remove':
+        inbox.remove_participants(instance, pk_set)
+    elif action == 'post_clear':
+        inbox.remove_participants(instance)
+
+@receiver(post_save, sender=User)
+def handle_user_saved(sender, instance, update_fields=None, **kwargs):
+    derivatives.sync(instance, update_fields)
+
+@receiver(post_delete, sender=User)
+def handle_user_deleted(sender, instance, **kwargs):
+    leaderboard.remove_user(instance.id)
+    derivatives.remove(instance)
 
 @receiver(post_save, sender=TrustAction)
 def update_trust_score(sender, instance, created, **kwargs):
     if created:
-        # Update user's trust score
-        trust_score, created_score = TrustScore.objects.get_or_create(user=instance.user)
-        
-        if instance.action_type in ['post_like', 'post_share', 'comment', 'follow']:
-            trust_score.activity_score += instance.score_change
-        elif instance.action_type == 'verification':
-            trust_score.verification_bonus += instance.score_change
-        elif instance.action_type in ['report_resolved']:
-            trust_score.community_score += instance.score_change
-        elif instance.action_type in ['spam_detected', 'scam_detected']:
-            trust_score.penalty_score += abs(instance.score_change)
-        
-        trust_score.calculate_final_score()
\ No newline at end of file
+        # Update user's trust score once the action is committed
+        transaction.on_commit(partial(engine.record_action, instance))
@@ -0,0 +1,22 @@
+from celery import shared_task
+from . import counters, events, trending, unique_viewers
+
+@shared_task
+def flush_counters():
+    counters.flush_counters()
+
+@shared_task
+def prune_viewer_sketches():
+    unique_viewers.prune_sketches()
+
+@shared_task
+def dispatch_outbox():
+    events.drain()
+
+@shared_task
+def purge_outbox():
+    events.purge_processed()
+
+@shared_task
+def snapshot_trending():
+    trending.snapshot_all()
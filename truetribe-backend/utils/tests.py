@@ -0,0 +1,27 @@
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from utils import events
+from utils.models import OutboxEvent
+
+
+class PurgeProcessedTests(TestCase):
+    def make_event(self, processed_days_ago=None):
+        event = OutboxEvent.objects.create(event_type='test', payload={})
+        if processed_days_ago is not None:
+            OutboxEvent.objects.filter(id=event.id).update(
+                processed_at=timezone.now() - timedelta(days=processed_days_ago)
+            )
+        return event
+
+    @override_settings(OUTBOX_RETENTION_DAYS=7)
+    def test_deletes_only_old_processed_events(self):
+        old = [self.make_event(processed_days_ago=8) for _ in range(5)]
+        recent = self.make_event(processed_days_ago=1)
+        pending = self.make_event()
+
+        self.assertEqual(events.purge_processed(batch_size=2), len(old))
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list('id', flat=True)),
+            {recent.id, pending.id},
+        )
@@ -0,0 +1,138 @@
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.utils import timezone
+from utils.models import TrendingBucket, TrendingSnapshot
+from utils.redis_client import get_redis
+
+SIGNAL_WEIGHTS = {
+    'view': 1.0,
+    'like': 3.0,
+    'comment': 4.0,
+    'share': 5.0,
+}
+
+# Only content that is visible to everyone makes it into a snapshot
+TARGETS = {
+    'post': ('posts.post', {'author__is_private': False}),
+    'video': ('videos.video', {'is_public': True}),
+}
+
+def hour_start(now=None):
+    now = now or timezone.now()
+    return now.replace(minute=0, second=0, microsecond=0)
+
+def window(now=None):
+    # Buckets that still count, newest first, paired with their decay factor
+    start = hour_start(now)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS
+    return [
+        (start - timedelta(hours=age), 0.5 ** (age / half_life))
+        for age in range(settings.TRENDING_WINDOW_HOURS)
+    ]
+
+class DatabaseTrendingStore:
+    def add(self, kind, scores):
+        hour = hour_start()
+        for target_id, amount in scores.items():
+            bucket = TrendingBucket.objects.filter(target_type=kind, target_id=target_id, hour=hour)
+            if bucket.update(score=F('score') + amount):
+                continue
+            try:
+                with transaction.atomic():
+                    TrendingBucket.objects.create(target_type=kind, target_id=target_id, hour=hour, score=amount)
+            except IntegrityError:
+                bucket.update(score=F('score') + amount)
+
+    def top(self, kind, limit):
+        buckets = window()
+        decay = Case(
+            *[When(hour=hour, then=Value(factor)) for hour, factor in buckets],
+            default=Value(0.0),
+            output_field=FloatField()
+        )
+        rows = TrendingBucket.objects.filter(
+            target_type=kind,
+            hour__gte=buckets[-1][0]
+        ).values('target_id').annotate(
+            trend=Sum(F('score') * decay, output_field=FloatField())
+        ).order_by('-trend')[:limit]
+        return [(str(row['target_id']), row['trend']) for row in rows]
+
+    def prune(self):
+        TrendingBucket.objects.filter(hour__lt=window()[-1][0]).delete()
+
+class RedisTrendingStore:
+    # One sorted set per kind and hour, combined with ZUNIONSTORE weights
+    def key(self, kind, hour):
+        return f'trending:{kind}:{int(hour.timestamp())}'
+
+    def add(self, kind, scores):
+        key = self.key(kind, hour_start())
+        pipe = get_redis().pipeline(transaction=False)
+        for target_id, amount in scores.items():
+            pipe.zincrby(key, amount, str(target_id))
+        pipe.expire(key, (settings.TRENDING_WINDOW_HOURS + 1) * 3600)
+        pipe.execute()
+
+    def top(self, kind, limit):
+        client = get_redis()
+        destination = f'trending:{kind}:combined'
+        client.zunionstore(destination, {self.key(kind, hour): factor for hour, factor in window()})
+        return client.zrevrange(destination, 0, limit - 1, withscores=True)
+
+    def prune(self):
+        # Hourly keys expire on their own
+        pass
+
+_store = None
+
+def get_trending_store():
+    global _store
+    if _store is None:
+        if settings.TRENDING_BACKEND == 'redis':
+            _store = RedisTrendingStore()
+        else:
+            _store = DatabaseTrendingStore()
+    return _store
+
+def record(kind, target_id, signal, count=1):
+    get_trending_store().add(kind, {target_id: SIGNAL_WEIGHTS[signal] * count})
+
+def record_counts(kind, signal, counts):
+    # counts: {target_id: number of events}
+    weight = SIGNAL_WEIGHTS[signal]
+    get_trending_store().add(kind, {target_id: weight * count for target_id, count in counts.items()})
+
+def take_snapshot(kind):
+    limit = settings.TRENDING_TOP_K
+    # Over-fetch so hidden or deleted items don't leave the list short
+    candidates = get_trending_store().top(kind, limit * 2)
+    label, visible = TARGETS[kind]
+    visible_ids = {
+        str(pk) for pk in apps.get_model(label).objects.filter(
+            id__in=[target_id for target_id, _ in candidates], **visible
+        ).values_list('id', flat=True)
+    }
+    items = [[target_id, score] for target_id, score in candidates if target_id in visible_ids][:limit]
+    snapshot, _ = TrendingSnapshot.objects.update_or_create(target_type=kind, defaults={'items': items})
+    return snapshot
+
+def snapshot_all():
+    for kind in TARGETS:
+        take_snapshot(kind)
+    get_trending_store().prune()
+
+def trending_ids(kind):
+    snapshot = TrendingSnapshot.objects.filter(target_type=kind).first()
+    if snapshot is None:
+        snapshot = take_snapshot(kind)
+    return [target_id for target_id, _ in snapshot.items]
+
+def trending_objects(queryset, kind):
+    # Objects in snapshot order, skipping anything deleted since it was taken
+    ids = trending_ids(kind)
+    objects = {str(pk): obj for pk, obj in queryset.in_bulk(ids).items()}
+    return [objects[target_id] for target_id in ids if target_id in objects]
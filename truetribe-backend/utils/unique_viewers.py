@@ -0,0 +1,121 @@
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from utils.hyperloglog import HyperLogLog
+from utils.models import ViewerSketch
+from utils.redis_client import get_redis
+
+def day_bucket(day):
+    return day.isoformat()
+
+def recent_buckets(days):
+    today = timezone.now().date()
+    return [day_bucket(today - timedelta(days=offset)) for offset in range(days)]
+
+class DatabaseSketchStore:
+    # Each batch is merged straight into the shared ViewerSketch rows. Video
+    # views arrive here already batched by the view buffer flush
+    def record_many(self, kind, items):
+        pending = defaultdict(set)
+        for target_id, viewer in items:
+            pending[str(target_id)].add(str(viewer))
+        today = day_bucket(timezone.now().date())
+        for target_id, viewers in pending.items():
+            with transaction.atomic():
+                for bucket in (ViewerSketch.TOTAL_BUCKET, today):
+                    sketch, _ = ViewerSketch.objects.select_for_update().get_or_create(
+                        target_type=kind,
+                        target_id=target_id,
+                        bucket=bucket,
+                        defaults={'registers': b''}
+                    )
+                    hll = HyperLogLog.from_bytes(sketch.registers)
+                    if hll.update(viewers):
+                        sketch.registers = hll.to_bytes()
+                        sketch.estimate = hll.count()
+                        sketch.save(update_fields=['registers', 'estimate', 'updated_at'])
+
+    def counts(self, kind, target_ids):
+        return dict(ViewerSketch.objects.filter(
+            target_type=kind,
+            target_id__in=target_ids,
+            bucket=ViewerSketch.TOTAL_BUCKET
+        ).values_list('target_id', 'estimate'))
+
+    def count_recent(self, kind, target_id, days):
+        hll = HyperLogLog()
+        for registers in ViewerSketch.objects.filter(
+            target_type=kind,
+            target_id=target_id,
+            bucket__in=recent_buckets(days)
+        ).values_list('registers', flat=True):
+            hll.merge(HyperLogLog.from_bytes(registers))
+        return hll.count()
+
+    def prune(self):
+        cutoff = day_bucket(timezone.now().date() - timedelta(days=settings.UNIQUE_VIEWER_RETENTION_DAYS))
+        ViewerSketch.objects.exclude(bucket=ViewerSketch.TOTAL_BUCKET).filter(bucket__lt=cutoff).delete()
+
+class RedisSketchStore:
+    # Uses native Redis HyperLogLogs (PFADD/PFCOUNT), so nothing needs flushing
+    def key(self, kind, target_id, bucket):
+        return f'hll:{kind}:{target_id}:{bucket}'
+
+    def record_many(self, kind, items):
+        today = day_bucket(timezone.now().date())
+        retention = settings.UNIQUE_VIEWER_RETENTION_DAYS * 86400
+        viewers = defaultdict(set)
+        for target_id, viewer in items:
+            viewers[str(target_id)].add(str(viewer))
+        pipe = get_redis().pipeline(transaction=False)
+        for target_id, values in viewers.items():
+            pipe.pfadd(self.key(kind, target_id, ViewerSketch.TOTAL_BUCKET), *values)
+            day_key = self.key(kind, target_id, today)
+            pipe.pfadd(day_key, *values)
+            pipe.expire(day_key, retention)
+        pipe.execute()
+
+    def counts(self, kind, target_ids):
+        target_ids = list(target_ids)
+        pipe = get_redis().pipeline(transaction=False)
+        for target_id in target_ids:
+            pipe.pfcount(self.key(kind, target_id, ViewerSketch.TOTAL_BUCKET))
+        return dict(zip(target_ids, pipe.execute()))
+
+    def count_recent(self, kind, target_id, days):
+        return get_redis().pfcount(*[self.key(kind, target_id, bucket) for bucket in recent_buckets(days)])
+
+    def prune(self):
+        # Daily keys expire on their own
+        pass
+
+_store = None
+
+def get_sketch_store():
+    global _store
+    if _store is None:
+        if settings.UNIQUE_VIEWER_BACKEND == 'redis':
+            _store = RedisSketchStore()
+        else:
+            _store = DatabaseSketchStore()
+    return _store
+
+def record(kind, target_id, viewer):
+    get_sketch_store().record_many(kind, [(target_id, viewer)])
+
+def record_many(kind, items):
+    get_sketch_store().record_many(kind, items)
+
+def unique_viewer_counts(kind, target_ids):
+    counts = get_sketch_store().counts(kind, target_ids)
+    return {target_id: counts.get(target_id, 0) for target_id in target_ids}
+
+def unique_viewer_count(kind, target_id, days=None):
+    if days:
+        return get_sketch_store().count_recent(kind, target_id, days)
+    return unique_viewer_counts(kind, [target_id])[target_id]
+
+def prune_sketches():
+    get_sketch_store().prune()
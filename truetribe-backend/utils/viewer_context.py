@@ -0,0 +1,202 @@
+from collections import defaultdict
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+from users.models import Follow, Block
+from users.presence import online_user_ids
+from posts.models import PostLike, PostShare, Comment, CommentLike
+from videos.models import VideoLike, VideoShare, VideoComment
+from media_management.derivatives import source_names, variant_urls
+from utils.unique_viewers import unique_viewer_counts
+
+RECENT_COMMENTS_LIMIT = 3
+
+# kind -> (like model, share model, comment model, comment kind, foreign key on those models)
+CONTENT_KINDS = {
+    'post': (PostLike, PostShare, Comment, 'comment', 'post_id'),
+    'video': (VideoLike, VideoShare, VideoComment, 'video_comment', 'video_id'),
+}
+
+# Content kinds with a unique-viewer sketch, see utils.unique_viewers
+SKETCHED_KINDS = {'video'}
+
+# kind -> (comment model, like model or None, foreign key on the like model)
+COMMENT_KINDS = {
+    'comment': (Comment, CommentLike, 'comment_id'),
+    'video_comment': (VideoComment, None, None),  # video comments cannot be liked yet
+}
+
+def get_viewer_context(context):
+    if 'viewer_context' not in context:
+        request = context.get('request')
+        viewer = getattr(request, 'user', None)
+        if viewer is not None and viewer.is_authenticated:
+            context['viewer_context'] = ViewerContext(viewer)
+        else:
+            context['viewer_context'] = None
+    return context['viewer_context']
+
+class ViewerContext:
+    """
+    Per-request cache of the viewer's relationship to the objects on a page.
+
+    Serializers prime it once per page so that liked/shared/following/blocked
+    flags and recent comments cost a constant number of queries.
+    """
+
+    def __init__(self, viewer):
+        self.viewer = viewer
+        self.primed = defaultdict(set)
+        self.following_ids = set()
+        self.blocked_ids = set()
+        self.online_ids = set()
+        self.liked_ids = defaultdict(set)
+        self.shared_ids = defaultdict(set)
+        self.recent_comments = defaultdict(dict)
+        self.replies_counts = defaultdict(dict)
+        self.unique_viewers = defaultdict(dict)
+        self.media_variants = {}
+
+    def is_primed(self, kind, pk):
+        return pk in self.primed[kind]
+
+    def is_following(self, user_id):
+        return user_id in self.following_ids
+
+    def is_blocked(self, user_id):
+        return user_id in self.blocked_ids
+
+    def is_online(self, user_id):
+        return user_id in self.online_ids
+
+    def is_liked(self, kind, pk):
+        return pk in self.liked_ids[kind]
+
+    def is_shared(self, kind, pk):
+        return pk in self.shared_ids[kind]
+
+    def get_recent_comments(self, kind, pk):
+        return self.recent_comments[kind].get(pk, [])
+
+    def get_replies_count(self, kind, pk):
+        return self.replies_counts[kind].get(pk, 0)
+
+    def get_unique_viewers(self, kind, pk):
+        return self.unique_viewers[kind].get(pk, 0)
+
+    def get_media_variants(self, name):
+        return self.media_variants.get(name, {})
+
+    def prime(self, kind, objects):
+        if kind == 'user':
+            self.prime_users(objects)
+        elif kind in CONTENT_KINDS:
+            self.prime_content(kind, objects)
+        elif kind in COMMENT_KINDS:
+            self.prime_comments(kind, objects)
+
+    def _claim(self, kind, objects):
+        # Return the ids not primed yet and mark them as primed
+        ids = {obj.pk for obj in objects} - self.primed[kind]
+        self.primed[kind] |= ids
+        return ids
+
+    def prime_users(self, users):
+        ids = self._claim('user', users)
+        if not ids:
+            return
+        self.following_ids.update(Follow.objects.filter(
+            follower=self.viewer, following_id__in=ids
+        ).values_list('following_id', flat=True))
+        self.blocked_ids.update(Block.objects.filter(
+            blocker=self.viewer, blocked_id__in=ids
+        ).values_list('blocked_id', flat=True))
+        self.online_ids.update(online_user_ids(ids))
+        self.prime_media([user for user in users if user.pk in ids])
+
+    def prime_content(self, kind, objects):
+        like_model, share_model, comment_model, comment_kind, key = CONTENT_KINDS[kind]
+        ids = self._claim(kind, objects)
+        comments = []
+        if ids:
+            lookup = {f'{key}__in': ids}
+            self.liked_ids[kind].update(like_model.objects.filter(
+                user=self.viewer, **lookup
+            ).values_list(key, flat=True))
+            self.shared_ids[kind].update(share_model.objects.filter(
+                user=self.viewer, **lookup
+            ).values_list(key, flat=True))
+
+            # Top-N newest top-level comments per object in a single query
+            comments = list(comment_model.objects.filter(parent=None, **lookup).annotate(
+                recent_rank=Window(
+                    RowNumber(),
+                    partition_by=[F(key)],
+                    order_by=[F('created_at').desc(), F('id').desc()],
+                )
+            ).filter(recent_rank__lte=RECENT_COMMENTS_LIMIT).select_related('author'))
+            comments.sort(key=lambda comment: (comment.created_at, comment.pk), reverse=True)
+            recent = self.recent_comments[kind]
+            for pk in ids:
+                recent[pk] = []
+            for comment in comments:
+                recent[getattr(comment, key)].append(comment)
+            self.prime_comments(comment_kind, comments)
+            if kind in SKETCHED_KINDS:
+                self.unique_viewers[kind].update(unique_viewer_counts(kind, list(ids)))
+            self.prime_media([obj for obj in objects if obj.pk in ids])
+
+        self.prime_users([obj.author for obj in objects])
+
+    def prime_media(self, objects):
+        # Resized variant URLs for every image on the page in one query
+        names = [name for obj in objects for name in source_names(obj) if name not in self.media_variants]
+        if names:
+            urls = variant_urls(names)
+            for name in names:
+                self.media_variants[name] = urls.get(name, {})
+
+    def prime_comments(self, kind, comments):
+        comment_model, like_model, key = COMMENT_KINDS[kind]
+        ids = self._claim(kind, comments)
+        if ids:
+            if like_model is not None:
+                self.liked_ids[kind].update(like_model.objects.filter(
+                    user=self.viewer, **{f'{key}__in': ids}
+                ).values_list(key, flat=True))
+            self.replies_counts[kind].update(comment_model.objects.filter(
+                parent_id__in=ids
+            ).values('parent_id').annotate(count=Count('id')).values_list('parent_id', 'count'))
+        self.prime_users([comment.author for comment in comments])
+
+class ViewerContextListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        viewer_context = get_viewer_context(self.context)
+        if viewer_context is not None:
+            self.child.prime_viewer_context(viewer_context, items)
+        return super().to_representation(items)
+
+class ViewerContextMixin:
+    viewer_context_kind = None
+
+    def prime_viewer_context(self, viewer_context, objects):
+        viewer_context.prime(self.viewer_context_kind, objects)
+
+    def viewer_context_for(self, obj):
+        # Single objects outside a primed list are primed on first access
+        viewer_context = get_viewer_context(self.context)
+        if viewer_context is not None and not viewer_context.is_primed(self.viewer_context_kind, obj.pk):
+            self.prime_viewer_context(viewer_context, [obj])
+        return viewer_context
+
+    def media_variants_for(self, obj, field):
+        # Variants appear once the background resize has finished
+        image = getattr(obj, field)
+        if not image:
+            return {}
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.get_media_variants(image.name)
+        return variant_urls([image.name]).get(image.name, {})
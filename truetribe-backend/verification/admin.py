@@ -12,7 +12,7 @@ class VerificationRequestAdmin(admin.ModelAdmin):
     actions = ['approve_requests', 'reject_requests']
     
     def approve_requests(self, request, queryset):
-        from trust_system.models import TrustScore
+        from trust_system.models import TrustAction
         
         for verification_request in queryset.filter(status='pending'):
             verification_request.status = 'approved'
@@ -28,14 +28,17 @@ class VerificationRequestAdmin(admin.ModelAdmin):
             )
             
             # Update trust score
-            trust_score, created = TrustScore.objects.get_or_create(user=verification_request.user)
-            trust_score.verification_bonus += 10.0
-            trust_score.calculate_final_score()
+            TrustAction.objects.create(
+                user=verification_request.user,
+                action_type='verification',
+                score_change=10.0,
+                description=f"Approved {verification_request.verification_type} verification"
+            )
             
             # Mark user as verified if identity verification
             if verification_request.verification_type == 'identity':
                 verification_request.user.is_verified = True
-                verification_request.user.save()
+                verification_request.user.save(update_fields=['is_verified'])
         
         self.message_user(request, f"Approved {queryset.count()} verification requests")
     
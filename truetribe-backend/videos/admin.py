@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Video, VideoLike, VideoComment, VideoView, VideoShare
+from .models import Video, VideoLike, VideoComment, VideoView, VideoShare, UploadSession
 
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
@@ -20,4 +20,11 @@ class VideoViewAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
 
 admin.site.register(VideoLike)
-admin.site.register(VideoShare)
\ No newline at end of file
+admin.site.register(VideoShare)
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'user', 'offset', 'upload_length', 'status', 'updated_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['filename', 'user__username']
+    readonly_fields = ['offset', 'video', 'created_at', 'updated_at']
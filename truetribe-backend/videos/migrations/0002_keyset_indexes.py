@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['author', '-created_at', '-id'], name='videos_vide_author__dffd4c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='videocomment',
+            index=models.Index(fields=['video', '-created_at', '-id'], name='videos_vide_video_i_5b5335_idx'),
+        ),
+    ]
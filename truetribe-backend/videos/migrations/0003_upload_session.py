@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:53
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('videos', '0002_keyset_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('upload_length', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('description', models.TextField(blank=True, max_length=1000)),
+                ('is_public', models.BooleanField(default=True)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('complete', 'Complete')], default='uploading', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+                ('video', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='videos.video')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='videos_uplo_status_0f4957_idx')],
+            },
+        ),
+    ]
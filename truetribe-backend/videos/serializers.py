@@ -1,17 +1,25 @@
+import os
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Video, VideoComment, VideoLike
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from .models import Video, VideoComment, UploadSession
 from users.serializers import UserSerializer
+from utils.viewer_context import ViewerContextListSerializer, ViewerContextMixin
+from utils.unique_viewers import unique_viewer_count
 
 User = get_user_model()
 
-class VideoCommentSerializer(serializers.ModelSerializer):
+class VideoCommentSerializer(ViewerContextMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
     replies_count = serializers.SerializerMethodField()
+    viewer_context_kind = 'video_comment'
     
     class Meta:
         model = VideoComment
+        list_serializer_class = ViewerContextListSerializer
         fields = [
             'id', 'author', 'content', 'likes_count', 'created_at',
             'updated_at', 'is_liked', 'replies_count', 'parent'
@@ -19,27 +27,34 @@ class VideoCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'likes_count']
     
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.likes.filter(user=request.user).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_liked('video_comment', obj.id)
         return False
     
     def get_replies_count(self, obj):
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.get_replies_count('video_comment', obj.id)
         return obj.replies.count()
 
-class VideoSerializer(serializers.ModelSerializer):
+class VideoSerializer(ViewerContextMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     is_liked = serializers.SerializerMethodField()
     is_shared = serializers.SerializerMethodField()
     recent_comments = serializers.SerializerMethodField()
+    unique_viewers = serializers.SerializerMethodField()
+    thumbnail_variants = serializers.SerializerMethodField()
+    viewer_context_kind = 'video'
     
     class Meta:
         model = Video
+        list_serializer_class = ViewerContextListSerializer
         fields = [
             'id', 'author', 'title', 'description', 'video_file', 'thumbnail',
-            'duration', 'views_count', 'likes_count', 'comments_count',
+            'thumbnail_variants', 'duration', 'views_count', 'likes_count', 'comments_count',
             'shares_count', 'is_public', 'created_at', 'updated_at',
-            'is_liked', 'is_shared', 'recent_comments'
+            'is_liked', 'is_shared', 'recent_comments', 'unique_viewers'
         ]
         read_only_fields = [
             'id', 'created_at', 'updated_at', 'views_count',
@@ -47,20 +62,33 @@ class VideoSerializer(serializers.ModelSerializer):
         ]
     
     def get_is_liked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return VideoLike.objects.filter(user=request.user, video=obj).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_liked('video', obj.id)
         return False
     
     def get_is_shared(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return obj.shares.filter(user=request.user).exists()
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.is_shared('video', obj.id)
         return False
     
     def get_recent_comments(self, obj):
-        recent_comments = obj.comments.filter(parent=None)[:3]
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            recent_comments = viewer_context.get_recent_comments('video', obj.id)
+        else:
+            recent_comments = obj.comments.filter(parent=None)[:3]
         return VideoCommentSerializer(recent_comments, many=True, context=self.context).data
+    
+    def get_unique_viewers(self, obj):
+        viewer_context = self.viewer_context_for(obj)
+        if viewer_context is not None:
+            return viewer_context.get_unique_viewers('video', obj.id)
+        return unique_viewer_count('video', obj.id)
+    
+    def get_thumbnail_variants(self, obj):
+        return self.media_variants_for(obj, 'thumbnail')
 
 class VideoCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,4 +97,28 @@ class VideoCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data['author'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id', 'filename', 'upload_length', 'offset', 'chunk_size', 'title',
+            'description', 'is_public', 'status', 'video', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'offset', 'chunk_size', 'status', 'video', 'created_at', 'updated_at']
+    
+    def validate_filename(self, value):
+        # Rejected now rather than when the last chunk arrives
+        try:
+            name = default_storage.get_valid_name(os.path.basename(value))
+        except SuspiciousFileOperation:
+            name = ''
+        if not name:
+            raise serializers.ValidationError('Filename must name a file')
+        return name
+    
+    def validate_upload_length(self, value):
+        if value <= 0 or value > settings.VIDEO_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(f'Upload length must be between 1 and {settings.VIDEO_UPLOAD_MAX_SIZE} bytes')
+        return value
@@ -0,0 +1,10 @@
+from celery import shared_task
+from . import uploads, view_counter
+
+@shared_task
+def flush_video_views():
+    view_counter.flush_views()
+
+@shared_task
+def expire_upload_sessions():
+    uploads.expire_sessions()
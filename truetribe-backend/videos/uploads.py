@@ -0,0 +1,171 @@
+import base64
+import binascii
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import UploadSession, Video
+
+logger = logging.getLogger(__name__)
+
+READ_BLOCK_SIZE = 64 * 1024
+CHECKSUM_ALGORITHMS = ('sha256', 'sha1', 'md5')
+
+class UploadError(Exception):
+    status = 400
+
+class OffsetConflict(UploadError):
+    status = 409
+
+class ChecksumMismatch(UploadError):
+    status = 460  # tus checksum extension
+
+class FinalizeFailed(UploadError):
+    status = 500
+
+class PartialFile(File):
+    # Lets FileSystemStorage move the finished file instead of copying it
+    def temporary_file_path(self):
+        return self.file.name
+
+def session_path(session):
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.id}.part')
+
+def chunk_path(session):
+    # Each request stages its chunk separately until it owns the offset
+    return os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.id}.{uuid.uuid4().hex}.chunk')
+
+def create_session(user, filename, upload_length, title='', description='', is_public=True):
+    session = UploadSession.objects.create(
+        user=user,
+        filename=os.path.basename(filename),
+        upload_length=upload_length,
+        chunk_size=settings.UPLOAD_CHUNK_SIZE,
+        title=title,
+        description=description,
+        is_public=is_public
+    )
+    os.makedirs(settings.UPLOAD_SESSION_DIR, exist_ok=True)
+    open(session_path(session), 'wb').close()
+    return session
+
+def parse_checksum(header):
+    # tus Upload-Checksum: "<algorithm> <base64 digest>"
+    try:
+        algorithm, encoded = header.split(' ', 1)
+        digest = base64.b64decode(encoded.strip(), validate=True)
+    except (AttributeError, ValueError, binascii.Error):
+        raise UploadError('Upload-Checksum must be "<algorithm> <base64 digest>"')
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError(f"Checksum algorithm must be one of {', '.join(CHECKSUM_ALGORITHMS)}")
+    return algorithm, digest
+
+def write_chunk(session, offset, length, stream, checksum):
+    """
+    Write one chunk from stream to the session file at offset.
+
+    Every chunk is chunk_size bytes except the last. The chunk is staged in
+    its own file and only copied into the session file, with the session row
+    locked, once it is complete, its checksum verified and the offset still
+    matches, so a stale or retried request can never overwrite written bytes.
+    """
+    if session.status != 'uploading':
+        raise OffsetConflict('Upload is already complete')
+    if session.offset == session.upload_length:
+        # Every byte arrived but the video could not be created; an empty
+        # PATCH at the final offset retries it
+        if offset != session.offset or length:
+            raise OffsetConflict(f'Upload-Offset must be {session.offset} with an empty body')
+        finish(session)
+        return session
+    if offset != session.offset:
+        raise OffsetConflict(f'Upload-Offset must be {session.offset}')
+    expected = min(session.chunk_size, session.upload_length - offset)
+    if length != expected:
+        raise UploadError(f'Chunk must be {expected} bytes')
+    algorithm, digest = parse_checksum(checksum)
+    
+    staged = chunk_path(session)
+    try:
+        hasher = hashlib.new(algorithm)
+        remaining = length
+        with open(staged, 'wb') as f:
+            while remaining:
+                block = stream.read(min(READ_BLOCK_SIZE, remaining))
+                if not block:
+                    raise UploadError('Chunk ended early')
+                hasher.update(block)
+                f.write(block)
+                remaining -= len(block)
+        if hasher.digest() != digest:
+            raise ChecksumMismatch('Checksum mismatch')
+        
+        with transaction.atomic():
+            # Guards against two requests writing the same chunk
+            if not UploadSession.objects.select_for_update().filter(id=session.id, offset=offset).exists():
+                raise OffsetConflict('Chunk was already written')
+            with open(staged, 'rb') as src, open(session_path(session), 'r+b') as dst:
+                dst.seek(offset)
+                shutil.copyfileobj(src, dst, READ_BLOCK_SIZE)
+            UploadSession.objects.filter(id=session.id).update(
+                offset=F('offset') + length,
+                updated_at=timezone.now()
+            )
+    finally:
+        if os.path.exists(staged):
+            os.remove(staged)
+    session.offset = offset + length
+    if session.offset == session.upload_length:
+        finish(session)
+    return session
+
+def finish(session):
+    try:
+        return finalize(session)
+    except (OSError, SuspiciousFileOperation):
+        logger.exception('Failed to finalize upload session %s', session.id)
+        raise FinalizeFailed('Upload could not be stored; retry with an empty PATCH at the final offset')
+
+def finalize(session):
+    with transaction.atomic():
+        # Concurrent retries of the final PATCH create the video only once
+        if not UploadSession.objects.select_for_update().filter(id=session.id, status='uploading').exists():
+            raise OffsetConflict('Upload is already complete')
+        video = Video(
+            author_id=session.user_id,
+            title=session.title,
+            description=session.description,
+            is_public=session.is_public
+        )
+        with open(session_path(session), 'rb') as f:
+            video.video_file.save(session.filename, PartialFile(f), save=False)
+        video.save()
+        session.video = video
+        session.status = 'complete'
+        session.save(update_fields=['video', 'status', 'updated_at'])
+    if os.path.exists(session_path(session)):
+        # Left behind by storages that copy rather than move
+        os.remove(session_path(session))
+    return video
+
+def delete_session(session):
+    if os.path.exists(session_path(session)):
+        os.remove(session_path(session))
+    # Chunks left behind by requests that died mid-write
+    for staged in glob.glob(os.path.join(settings.UPLOAD_SESSION_DIR, f'{session.id}.*.chunk')):
+        os.remove(staged)
+    session.delete()
+
+def expire_sessions():
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    for session in UploadSession.objects.filter(status='uploading', updated_at__lt=cutoff).iterator():
+        delete_session(session)
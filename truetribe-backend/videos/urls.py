@@ -4,6 +4,9 @@ from . import views
 urlpatterns = [
     path('', views.VideoCreateView.as_view(), name='video-create'),
     path('feed/', views.VideoListView.as_view(), name='video-feed'),
+    path('trending/', views.TrendingVideosView.as_view(), name='trending-videos'),
+    path('uploads/', views.UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('uploads/<uuid:session_id>/', views.upload_session, name='upload-session'),
     path('<uuid:pk>/', views.VideoDetailView.as_view(), name='video-detail'),
     path('<uuid:video_id>/like/', views.like_video, name='like-video'),
     path('<uuid:video_id>/comments/', views.VideoCommentListCreateView.as_view(), name='video-comments'),
@@ -0,0 +1,216 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+import redis
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from utils.counters import apply_deltas
+from utils import trending
+from utils.redis_client import get_redis
+from utils.unique_viewers import record_many
+from .models import Video, VideoView
+
+REDIS_PENDING_KEY = 'video_views:pending'
+REDIS_FLUSHING_KEY = 'video_views:flushing'
+REDIS_FLUSH_LOCK_KEY = 'video_views:flush_lock'
+FLUSH_BATCH_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+# Raise the watch time of a view that is still pending; 0 if it was flushed already
+WATCH_SCRIPT = """
+local item = redis.call('HGET', KEYS[1], ARGV[1])
+if not item then
+    return 0
+end
+local view = cjson.decode(item)
+local watched = tonumber(ARGV[2])
+if watched > view[4] then
+    view[4] = watched
+    redis.call('HSET', KEYS[1], ARGV[1], cjson.encode(view))
+end
+return 1
+"""
+
+# Extend (ARGV[2] ms) or, without ARGV[2], release the flush lock if we still hold it
+LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return redis.call('DEL', KEYS[1])
+"""
+
+def dedup_key(video_id, user_id, ip_address, now):
+    window = int(now // settings.VIDEO_VIEW_DEDUP_WINDOW)
+    viewer = f'u{user_id}' if user_id else f'ip{ip_address}'
+    return f'video_views:seen:{viewer}:{video_id}:{window}'
+
+def write_views(views):
+    # views: iterable of (video_id, user_id, ip_address, watched_duration)
+    views = list(views)
+    if not views:
+        return
+    per_video = Counter(video_id for video_id, _, _, _ in views)
+    # Rows, sketches and counters land together, so a failed batch can be replayed whole
+    with transaction.atomic():
+        VideoView.objects.bulk_create([
+            VideoView(video_id=video_id, user_id=user_id, ip_address=ip_address, watched_duration=watched_duration)
+            for video_id, user_id, ip_address, watched_duration in views
+        ], batch_size=FLUSH_BATCH_SIZE)
+        record_many('video', [
+            (video_id, user_id or f'ip:{ip_address}')
+            for video_id, user_id, ip_address, _ in views
+        ])
+        apply_deltas({
+            (Video._meta.label_lower, 'views_count', video_id): count
+            for video_id, count in per_video.items()
+        })
+    trending.record_counts('video', 'view', per_video)
+
+def write_watch_time(video_id, user_id, ip_address, watched_duration):
+    # The view has been flushed already; extend the latest row
+    latest = VideoView.objects.filter(
+        video_id=video_id, user_id=user_id, ip_address=ip_address
+    ).order_by('-created_at').values('id')[:1]
+    VideoView.objects.filter(id__in=latest).update(
+        watched_duration=Greatest(F('watched_duration'), watched_duration)
+    )
+
+class LocalViewBuffer:
+    """
+    Per-process accumulator for development without Redis.
+
+    A daemon thread flushes it every VIDEO_VIEW_FLUSH_INTERVAL, so nothing is
+    written on the request path, but views still pending when the process
+    exits are lost.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.seen = {}
+        self.pending = {}
+        self.thread = None
+
+    def record(self, video_id, user_id, ip_address):
+        now = time.time()
+        key = dedup_key(video_id, user_id, ip_address, now)
+        with self.lock:
+            if key in self.seen:
+                return False
+            self.seen[key] = now + settings.VIDEO_VIEW_DEDUP_WINDOW
+            self.pending[key] = [video_id, user_id, ip_address, 0]
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='video-view-flusher', daemon=True)
+                self.thread.start()
+        return True
+
+    def watch(self, video_id, user_id, ip_address, watched_duration):
+        key = dedup_key(video_id, user_id, ip_address, time.time())
+        with self.lock:
+            view = self.pending.get(key)
+            if view is not None:
+                view[3] = max(view[3], watched_duration)
+                return
+        write_watch_time(video_id, user_id, ip_address, watched_duration)
+
+    def run(self):
+        while True:
+            time.sleep(settings.VIDEO_VIEW_FLUSH_INTERVAL)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush video views')
+
+    def flush(self):
+        now = time.time()
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.seen = {key: expires for key, expires in self.seen.items() if expires > now}
+        write_views(pending.values())
+
+class RedisViewBuffer:
+    # Shared accumulator, drained by the flush_video_views task
+    def __init__(self):
+        self.watch_script = None
+        self.lock_script = None
+
+    def record(self, video_id, user_id, ip_address):
+        client = get_redis()
+        key = dedup_key(video_id, user_id, ip_address, time.time())
+        if not client.set(key, 1, nx=True, ex=settings.VIDEO_VIEW_DEDUP_WINDOW):
+            return False
+        client.hset(REDIS_PENDING_KEY, key, json.dumps([
+            str(video_id), str(user_id) if user_id else None, ip_address, 0
+        ]))
+        return True
+
+    def watch(self, video_id, user_id, ip_address, watched_duration):
+        if self.watch_script is None:
+            self.watch_script = get_redis().register_script(WATCH_SCRIPT)
+        key = dedup_key(video_id, user_id, ip_address, time.time())
+        if not self.watch_script(keys=[REDIS_PENDING_KEY], args=[key, watched_duration]):
+            # A view caught mid-flush has no row yet; the player's next report extends it
+            write_watch_time(video_id, user_id, ip_address, watched_duration)
+
+    def flush(self):
+        client = get_redis()
+        if self.lock_script is None:
+            self.lock_script = client.register_script(LOCK_SCRIPT)
+        # One flush at a time, or overlapping runs would write the same batch twice
+        token = uuid.uuid4().hex
+        timeout = settings.VIDEO_VIEW_FLUSH_LOCK_TIMEOUT * 1000
+        if not client.set(REDIS_FLUSH_LOCK_KEY, token, nx=True, px=timeout):
+            return
+        try:
+            self.drain(client, token, timeout)
+        finally:
+            self.lock_script(keys=[REDIS_FLUSH_LOCK_KEY], args=[token])
+
+    def drain(self, client, token, timeout):
+        # A batch left behind by a failed flush is written before new views are taken
+        if not client.exists(REDIS_FLUSHING_KEY):
+            try:
+                client.rename(REDIS_PENDING_KEY, REDIS_FLUSHING_KEY)
+            except redis.ResponseError:
+                # Nothing pending
+                return
+        pending = list(client.hgetall(REDIS_FLUSHING_KEY).items())
+        for start in range(0, len(pending), FLUSH_BATCH_SIZE):
+            if not self.lock_script(keys=[REDIS_FLUSH_LOCK_KEY], args=[token, timeout]):
+                # The lock expired and another flush may own the batch now
+                logger.warning('Lost the video view flush lock; stopping')
+                return
+            batch = pending[start:start + FLUSH_BATCH_SIZE]
+            write_views(json.loads(item) for _, item in batch)
+            client.hdel(REDIS_FLUSHING_KEY, *[key for key, _ in batch])
+        client.delete(REDIS_FLUSHING_KEY)
+
+_buffer = None
+
+def get_view_buffer():
+    global _buffer
+    if _buffer is None:
+        if settings.VIDEO_VIEW_BACKEND == 'redis':
+            _buffer = RedisViewBuffer()
+        else:
+            _buffer = LocalViewBuffer()
+    return _buffer
+
+def record_view(video, user, ip_address):
+    user_id = user.id if user is not None and user.is_authenticated else None
+    return get_view_buffer().record(video.id, user_id, ip_address)
+
+def record_watch_time(video, user, ip_address, watched_duration):
+    get_view_buffer().watch(video.id, user.id, ip_address, watched_duration)
+
+def flush_views():
+    get_view_buffer().flush()
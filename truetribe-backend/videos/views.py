@@ -2,14 +2,21 @@ from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, F
-from .models import Video, VideoComment, VideoLike, VideoView, VideoShare
-from .serializers import VideoSerializer, VideoCreateSerializer, VideoCommentSerializer
+from django.urls import reverse
+from django.db.models import Q
+from .models import Video, VideoComment, VideoLike, VideoShare, UploadSession
+from .serializers import VideoSerializer, VideoCreateSerializer, VideoCommentSerializer, UploadSessionSerializer
 from users.models import Follow
+from utils.pagination import KeysetPagination
+from utils import counters
+from .view_counter import record_view, record_watch_time
+from . import uploads
+from utils.trending import trending_objects
 
 class VideoListView(generics.ListAPIView):
     serializer_class = VideoSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         user = self.request.user
@@ -17,13 +24,69 @@ class VideoListView(generics.ListAPIView):
         queryset = Video.objects.filter(
             Q(author__in=following_users) | Q(author=user),
             is_public=True
-        ).select_related('author').prefetch_related('likes', 'comments')
+        ).select_related('author')
         return queryset
 
 class VideoCreateView(generics.CreateAPIView):
     serializer_class = VideoCreateSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+class UploadSessionCreateView(generics.CreateAPIView):
+    # Starts a resumable upload for videos too large for VideoCreateView
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        serializer.instance = uploads.create_session(
+            self.request.user,
+            data['filename'],
+            data['upload_length'],
+            title=data.get('title', ''),
+            description=data.get('description', ''),
+            is_public=data.get('is_public', True)
+        )
+    
+    def get_success_headers(self, data):
+        return {'Location': reverse('upload-session', args=[data['id']])}
+
+def upload_headers(session):
+    return {
+        'Upload-Offset': str(session.offset),
+        'Upload-Length': str(session.upload_length),
+        'Cache-Control': 'no-store',
+    }
+
+@api_view(['GET', 'HEAD', 'PATCH', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def upload_session(request, session_id):
+    session = get_object_or_404(UploadSession, id=session_id, user=request.user)
+    
+    if request.method == 'HEAD':
+        return Response(status=status.HTTP_200_OK, headers=upload_headers(session))
+    if request.method == 'GET':
+        return Response(UploadSessionSerializer(session).data, headers=upload_headers(session))
+    if request.method == 'DELETE':
+        if session.status == 'complete':
+            return Response({'error': 'Upload is already complete'}, status=status.HTTP_409_CONFLICT)
+        uploads.delete_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    # PATCH: the body is streamed to disk, never parsed into request.data
+    if request.content_type != 'application/offset+octet-stream':
+        return Response({'error': 'Content-Type must be application/offset+octet-stream'}, status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+    try:
+        offset = int(request.headers['Upload-Offset'])
+        # A bodyless PATCH (retrying a failed finish) may omit Content-Length
+        length = int(request.headers.get('Content-Length') or 0)
+    except (KeyError, ValueError):
+        return Response({'error': 'Upload-Offset is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        uploads.write_chunk(session, offset, length, request.stream, request.headers.get('Upload-Checksum'))
+    except uploads.UploadError as e:
+        return Response({'error': str(e)}, status=e.status, headers=upload_headers(session))
+    return Response(status=status.HTTP_204_NO_CONTENT, headers=upload_headers(session))
+
 class VideoDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = VideoSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -33,16 +96,8 @@ class VideoDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Record video view
-        ip_address = request.META.get('REMOTE_ADDR')
-        VideoView.objects.get_or_create(
-            user=request.user if request.user.is_authenticated else None,
-            video=instance,
-            ip_address=ip_address,
-            defaults={'watched_duration': 0}
-        )
-        # Increment view count
-        Video.objects.filter(id=instance.id).update(views_count=F('views_count') + 1)
+        # Views are buffered and deduplicated, then written in bulk by flush_video_views
+        record_view(instance, request.user, request.META.get('REMOTE_ADDR'))
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
@@ -62,7 +117,8 @@ class TrendingVideosView(generics.ListAPIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
-        return Video.objects.filter(is_public=True).order_by('-views_count', '-likes_count')[:50]
+        # Ranked by decayed recent engagement, precomputed by snapshot_trending
+        return trending_objects(Video.objects.select_related('author'), 'video')
 
 class UserVideosView(generics.ListAPIView):
     serializer_class = VideoSerializer
@@ -81,14 +137,11 @@ def like_video(request, video_id):
     video = get_object_or_404(Video, id=video_id)
     like, created = VideoLike.objects.get_or_create(user=request.user, video=video)
     
+    # likes_count is maintained by the VideoLike signals
     if created:
-        video.likes_count += 1
-        video.save()
         return Response({'message': 'Video liked', 'liked': True})
     else:
         like.delete()
-        video.likes_count -= 1
-        video.save()
         return Response({'message': 'Video unliked', 'liked': False})
 
 @api_view(['POST'])
@@ -98,8 +151,7 @@ def share_video(request, video_id):
     share, created = VideoShare.objects.get_or_create(user=request.user, video=video)
     
     if created:
-        video.shares_count += 1
-        video.save()
+        counters.increment(Video, video.id, 'shares_count')
         return Response({'message': 'Video shared'})
     else:
         return Response({'error': 'Video already shared'}, status=status.HTTP_400_BAD_REQUEST)
@@ -107,6 +159,7 @@ def share_video(request, video_id):
 class VideoCommentListCreateView(generics.ListCreateAPIView):
     serializer_class = VideoCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         video_id = self.kwargs['video_id']
@@ -115,26 +168,19 @@ class VideoCommentListCreateView(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         video_id = self.kwargs['video_id']
         video = get_object_or_404(Video, id=video_id)
-        comment = serializer.save(author=self.request.user, video=video)
-        video.comments_count += 1
-        video.save()
+        serializer.save(author=self.request.user, video=video)
+        counters.increment(Video, video.id, 'comments_count')
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def update_watch_time(request, video_id):
     video = get_object_or_404(Video, id=video_id)
-    watched_duration = request.data.get('watched_duration', 0)
-    ip_address = request.META.get('REMOTE_ADDR')
-    
-    video_view, created = VideoView.objects.get_or_create(
-        user=request.user,
-        video=video,
-        ip_address=ip_address,
-        defaults={'watched_duration': watched_duration}
-    )
-    
-    if not created:
-        video_view.watched_duration = max(video_view.watched_duration, watched_duration)
-        video_view.save()
+    try:
+        watched_duration = max(int(request.data.get('watched_duration', 0)), 0)
+    except (TypeError, ValueError):
+        return Response({'error': 'watched_duration must be a number of seconds'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    # Extends the viewer's latest view, whether it is still buffered or already written
+    record_watch_time(video, request.user, request.META.get('REMOTE_ADDR'), watched_duration)
     
     return Response({'message': 'Watch time updated'})
\ No newline at end of file